@@ -0,0 +1,73 @@
+# Synthetic cohorts for the benchmarks
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from utils.config import NIVEL_MAXIMO  # noqa: E402
+from utils.file_manager import ESQUEMA_PROJETOS, skill_columns  # noqa: E402
+
+# Arquivo de exemplo de onde vêm os nomes das habilidades, para que as coortes tenham o mesmo esquema
+EXEMPLO_PROJETOS = os.path.join(os.path.dirname(__file__), "..", "data", "projetos_exemplo_completo.csv")
+
+CURSOS = ["Computação", "Engenharia", "Administração", "Matemática"]
+
+# Probabilidade de um aluno tentar 0, 1 ou 2 projetos
+PROJETOS_TENTADOS = (0.02, 0.5, 0.48)
+
+
+def skill_names():
+    """Habilidades do CSV de projetos de exemplo, na ordem do arquivo."""
+    return skill_columns(pd.read_csv(EXEMPLO_PROJETOS, nrows=0).columns, ESQUEMA_PROJETOS)
+
+
+def _names(rng, n, prefixo):
+    """n nomes distintos: uma palavra aleatória seguida de um número, como '<prefixo> Kqzd 17'."""
+    letras = rng.integers(ord("a"), ord("z") + 1, (n, 5), dtype=np.uint8).view("S1").reshape(n, 5)
+    palavras = np.char.capitalize(letras.view("S5").ravel().astype(str))
+    return [f"{prefixo} {palavra} {i}" for i, palavra in enumerate(palavras)]
+
+
+def generate_cohort(n_alunos, n_projetos, fracao_fixados=0.02, fracao_presencial=0.4, seed=0):
+    """
+    Gera (alunos_df, projetos_df) com o mesmo esquema dos CSVs de exemplo, no tamanho pedido.
+
+    - Projetos Tentados segue PROJETOS_TENTADOS; habilidades vão de 0 a NIVEL_MAXIMO
+    - fracao_fixados: fração dos alunos (entre os que tentam algum projeto) com 'Projeto 1' pré-alocado;
+      as pré-alocações são distribuídas em rodízio entre os projetos do grupo de comparecimento do aluno,
+      então nenhum projeto recebe mais do que o necessário e a partição "presencial" continua válida
+    - fracao_presencial: fração dos projetos presenciais (e dos alunos que podem comparecer)
+    """
+    rng = np.random.default_rng(seed)
+    habilidades = skill_names()
+
+    n_presenciais = min(max(1, round(fracao_presencial * n_projetos)), n_projetos - 1)
+    projetos = pd.DataFrame({
+        "Codigo do Projeto": [f"P{j:05d}" for j in range(n_projetos)],
+        "Nome do Projeto": _names(rng, n_projetos, "Projeto"),
+        "Presencial": np.where(rng.permutation(n_projetos) < n_presenciais, "Sim", "Não"),
+    })
+    projetos[habilidades] = rng.integers(0, NIVEL_MAXIMO + 1, (n_projetos, len(habilidades)), dtype=np.uint8)
+
+    alunos = pd.DataFrame({
+        "Nome do Aluno": _names(rng, n_alunos, "Aluno"),
+        "RA": 100_000 + rng.permutation(max(n_alunos * 3, 900_000))[:n_alunos],
+        "Curso": rng.choice(CURSOS, n_alunos),
+        "Projetos Tentados": rng.choice(len(PROJETOS_TENTADOS), n_alunos, p=PROJETOS_TENTADOS).astype(np.uint8),
+        "Pode Comparecer": np.where(rng.random(n_alunos) < n_presenciais / n_projetos, "Sim", "Não"),
+    })
+    alunos[habilidades] = rng.integers(0, NIVEL_MAXIMO + 1, (n_alunos, len(habilidades)), dtype=np.uint8)
+
+    fixados = np.full(n_alunos, "", dtype=object)
+    candidatos = np.flatnonzero((alunos["Projetos Tentados"] > 0).to_numpy())
+    escolhidos = rng.permutation(candidatos)[: round(fracao_fixados * len(candidatos))]
+    for grupo in ("Sim", "Não"):
+        alunos_grupo = escolhidos[alunos["Pode Comparecer"].to_numpy()[escolhidos] == grupo]
+        nomes_grupo = projetos.loc[projetos["Presencial"] == grupo, "Nome do Projeto"].to_numpy()
+        fixados[alunos_grupo] = nomes_grupo[np.arange(len(alunos_grupo)) % len(nomes_grupo)]
+    alunos["Projeto 1"] = fixados
+    alunos["Projeto 2"] = ""
+    return alunos, projetos
@@ -0,0 +1,179 @@
+# Benchmarks of solve_allocation over synthetic cohorts
+import argparse
+import datetime
+import os
+import subprocess
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from cohort import generate_cohort  # noqa: E402
+from core.allocation_solver import solve_allocation  # noqa: E402
+from core.report import RunReport  # noqa: E402
+from utils.config import SolverConfig  # noqa: E402
+
+RESULTADOS = os.path.join(os.path.dirname(__file__), "resultados.csv")
+
+COLUNAS = [
+    "commit", "data", "alunos", "projetos", "engine", "repeticao", "fase",
+    "segundos", "pico_rss_mb", "objetivo", "gap", "erro",
+]
+
+# Tamanhos padrão (alunos x projetos); 100000x2000 e afins podem ser pedidos com --tamanhos
+TAMANHOS = ["1000x20", "10000x200"]
+
+ENGINES = ("flow", "heuristic", "milp")
+
+
+def current_commit():
+    """Commit do código medido (com "-dirty" se houver alterações não commitadas)."""
+    try:
+        saida = subprocess.run(
+            ["git", "describe", "--always", "--dirty"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return "desconhecido"
+    return saida.stdout.strip()
+
+
+def parse_size(texto):
+    """'10000x200' -> (10000, 200)."""
+    try:
+        n_alunos, n_projetos = (int(parte) for parte in texto.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Tamanho inválido: '{texto}' (use ALUNOSxPROJETOS, ex.: 1000x20)")
+    if n_alunos < 1 or n_projetos < 2:
+        raise argparse.ArgumentTypeError(f"Tamanho inválido: '{texto}' (pelo menos 1 aluno e 2 projetos)")
+    return n_alunos, n_projetos
+
+
+def run_case(alunos, projetos, engine, solver_config, repeticao, commit, data):
+    """Resolve uma vez e devolve as linhas de resultado: uma por fase e uma "total"."""
+    base = {
+        "commit": commit, "data": data, "alunos": len(alunos), "projetos": len(projetos),
+        "engine": engine, "repeticao": repeticao,
+    }
+    relatorio = RunReport()
+    inicio = time.perf_counter()
+    try:
+        resultado = solve_allocation(alunos, projetos, engine=engine, solver_config=solver_config, report=relatorio)
+    except (ValueError, MemoryError) as e:
+        total = {"objetivo": None, "gap": None, "erro": f"{type(e).__name__}: {e}"}
+    else:
+        total = {"objetivo": resultado.attrs["objetivo"], "gap": resultado.attrs["gap"], "erro": ""}
+    segundos = time.perf_counter() - inicio
+
+    linhas = [
+        {**base, "fase": fase["nome"], "segundos": fase["segundos"], "pico_rss_mb": fase["pico_rss_mb"]}
+        for fase in relatorio.fases
+    ]
+    linhas.append({
+        **base, "fase": "total", "segundos": round(segundos, 4),
+        "pico_rss_mb": max((fase["pico_rss_mb"] or 0 for fase in relatorio.fases), default=None), **total,
+    })
+    return [{coluna: linha.get(coluna) for coluna in COLUNAS} for linha in linhas]
+
+
+def save_results(linhas, caminho):
+    """Acrescenta as linhas ao CSV de resultados (criando-o com cabeçalho se não existir)."""
+    novo = not os.path.exists(caminho)
+    pd.DataFrame(linhas, columns=COLUNAS).to_csv(caminho, mode="a", header=novo, index=False)
+
+
+def compare(caminho, commit, referencia=None):
+    """
+    Tabela com a mediana dos segundos de cada (tamanho, engine, fase) no commit e na referência.
+
+    Sem referência, usa o último commit anterior presente no arquivo de resultados.
+    """
+    resultados = pd.read_csv(caminho, dtype={"commit": str})
+    anteriores = [c for c in pd.unique(resultados["commit"]) if c != commit]
+    if referencia is None:
+        if not anteriores:
+            return None
+        referencia = anteriores[-1]
+
+    chave = ["alunos", "projetos", "engine", "fase"]
+    medianas = [
+        resultados[resultados["commit"] == c].groupby(chave, sort=False)["segundos"].median().rename(c)
+        for c in (referencia, commit)
+    ]
+    tabela = pd.concat(medianas, axis=1).dropna()
+    tabela["razao"] = (tabela[commit] / tabela[referencia]).round(2)
+    return tabela.reset_index()
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Mede o tempo de cada fase de solve_allocation em coortes sintéticas.")
+    parser.add_argument(
+        "--tamanhos", nargs="+", type=parse_size, default=[parse_size(t) for t in TAMANHOS],
+        metavar="ALUNOSxPROJETOS", help=f"tamanhos das coortes (padrão: {' '.join(TAMANHOS)})",
+    )
+    parser.add_argument("--engines", nargs="+", choices=ENGINES, default=list(ENGINES))
+    parser.add_argument("--repeticoes", type=int, default=3, help="execuções por caso (padrão: %(default)s)")
+    parser.add_argument("--fixados", type=float, default=0.02, help="fração de alunos pré-alocados")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--max-milp", type=int, default=2000,
+        help="a engine milp só roda em coortes com até esse número de alunos (padrão: %(default)s)",
+    )
+    parser.add_argument("--tempo-limite", type=float, help="segundos; para as engines milp e heurística")
+    parser.add_argument("--top-k", type=int, help="poda do modelo MILP (ver SolverConfig.top_k)")
+    parser.add_argument("--saida", default=RESULTADOS, help="CSV onde os resultados são acrescentados")
+    parser.add_argument(
+        "--comparar", nargs="?", const="", metavar="COMMIT",
+        help="ao final, compara com os resultados de COMMIT (padrão: o último commit anterior no arquivo)",
+    )
+    parser.add_argument("--gerar", metavar="PASTA", help="só grava as coortes em CSV nesta pasta, sem medir")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    if args.gerar:
+        os.makedirs(args.gerar, exist_ok=True)
+        for n_alunos, n_projetos in args.tamanhos:
+            alunos, projetos = generate_cohort(n_alunos, n_projetos, args.fixados, seed=args.seed)
+            alunos.to_csv(os.path.join(args.gerar, f"alunos_{n_alunos}x{n_projetos}.csv"), index=False)
+            projetos.to_csv(os.path.join(args.gerar, f"projetos_{n_alunos}x{n_projetos}.csv"), index=False)
+        return 0
+
+    commit = current_commit()
+    data = datetime.datetime.now().isoformat(timespec="seconds")
+    config = SolverConfig(msg=False, time_limit=args.tempo_limite, top_k=args.top_k)
+
+    for n_alunos, n_projetos in args.tamanhos:
+        alunos, projetos = generate_cohort(n_alunos, n_projetos, args.fixados, seed=args.seed)
+        for engine in args.engines:
+            if engine == "milp" and n_alunos > args.max_milp:
+                print(f"{n_alunos}x{n_projetos} {engine}: ignorado (mais de {args.max_milp} alunos)")
+                continue
+            for repeticao in range(args.repeticoes):
+                linhas = run_case(alunos, projetos, engine, config, repeticao, commit, data)
+                save_results(linhas, args.saida)
+                total = linhas[-1]
+                print(
+                    f"{n_alunos}x{n_projetos} {engine} #{repeticao}: {total['segundos']:.3f} s"
+                    + (f" - {total['erro']}" if total["erro"] else f", objetivo {total['objetivo']:.2f}")
+                )
+
+    if args.comparar is not None:
+        tabela = compare(args.saida, commit, args.comparar or None)
+        if tabela is None:
+            print("Nenhum commit anterior no arquivo de resultados para comparar.")
+        else:
+            print(tabela.to_string(index=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
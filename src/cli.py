@@ -0,0 +1,208 @@
+import argparse
+import json
+import sys
+import time
+
+from core.report import RunReport, setup_logging
+from core.similarity import METRICAS
+from utils.config import CACHE_DIR, LOG_LEVEL, SOLVER_BACKENDS, SolverConfig
+
+# Engines aceitas por solve_allocation
+ENGINES = ("milp", "flow", "heuristic")
+
+# Opções que --cenarios não usa (os parâmetros vêm do JSON e a saída é a tabela de comparação)
+IGNORADAS_EM_CENARIOS = {
+    "particao": "--particao",
+    "comparar_particao": "--comparar-particao",
+    "relatorio": "-r/--relatorio",
+    "listas": "--listas",
+    "metrica": "--metrica",
+    "tolerancia": "--tolerancia",
+    "sem_fixar": "--sem-fixar",
+}
+
+# Opções do solver e as engines que as usam (nas outras, elas seriam ignoradas)
+OPCOES_SOLVER = {
+    "backend": ("--backend", ("milp",)),
+    "threads": ("--threads", ("milp",)),
+    "tempo_limite": ("--tempo-limite", ("milp", "heuristic")),
+    "gap": ("--gap", ("milp",)),
+    "top_k": ("--top-k", ("milp",)),
+    "solucao_inicial": ("--solucao-inicial", ("milp",)),
+    "log_solver": ("--log-solver", ("milp",)),
+}
+
+
+def build_parser():
+    """Argumentos da linha de comando."""
+    parser = argparse.ArgumentParser(
+        description="Aloca alunos em projetos sem abrir a interface gráfica.",
+    )
+    parser.add_argument("alunos", help="CSV de alunos")
+    parser.add_argument("projetos", help="CSV de projetos")
+    parser.add_argument("-o", "--saida", default="alocacao_final.csv", help="CSV da alocação (padrão: %(default)s)")
+    parser.add_argument("-r", "--relatorio", help="grava o relatório da execução em JSON neste caminho")
+    parser.add_argument(
+        "--listas",
+        metavar="PASTA",
+        help="grava também, nesta pasta, a alocação e as listas por projeto e por curso (CSV e binário)",
+    )
+
+    alocacao = parser.add_argument_group("alocação")
+    alocacao.add_argument(
+        "--engine", choices=ENGINES, default="milp", help="método de resolução (padrão: %(default)s)"
+    )
+    alocacao.add_argument(
+        "--metrica", choices=METRICAS, help="métrica de compatibilidade (padrão: dot)"
+    )
+    alocacao.add_argument(
+        "--tolerancia", type=float, help="folga da carga de cada projeto em torno da média (padrão: 0.2)"
+    )
+    alocacao.add_argument(
+        "--sem-fixar", action="store_true", help="ignora as pré-alocações de 'Projeto 1'/'Projeto 2'"
+    )
+    alocacao.add_argument(
+        "--particao",
+        choices=("presencial", "curso"),
+        help="resolve separadamente, em paralelo, cada grupo de alunos e projetos; restringe o modelo: cada aluno "
+        "só recebe projetos do próprio grupo (presencial: quem pode comparecer só recebe projetos presenciais)",
+    )
+    alocacao.add_argument(
+        "--comparar-particao",
+        action="store_true",
+        help="com --particao, resolve também a alocação inteira e informa a perda de objetivo da partição",
+    )
+    alocacao.add_argument(
+        "--cenarios",
+        metavar="JSON",
+        help="arquivo com listas de valores por parâmetro (tolerancia, metrica, pesos, fixar); resolve todas as "
+        "combinações em paralelo e grava em --saida a tabela de comparação em vez da alocação",
+    )
+
+    solver = parser.add_argument_group("solver (engine milp)")
+    solver.add_argument("--backend", type=str.upper, choices=SOLVER_BACKENDS, help="padrão: CBC")
+    solver.add_argument("--threads", type=int)
+    solver.add_argument("--tempo-limite", type=float, help="segundos; vale também para a engine heurística")
+    solver.add_argument("--gap", type=float, help="gap relativo em que o solver pode parar (ex.: 0.01)")
+    solver.add_argument("--top-k", type=int, help="poda o modelo aos top-k projetos de cada aluno")
+    solver.add_argument("--solucao-inicial", help="CSV de uma alocação anterior usada como solução inicial")
+    solver.add_argument("--log-solver", action="store_true", help="exibe o log do solver")
+
+    diagnostico = parser.add_argument_group("diagnóstico")
+    diagnostico.add_argument("--log", default=LOG_LEVEL, help="nível do log (padrão: %(default)s)")
+    diagnostico.add_argument("--memoria", action="store_true", help="mede a memória alocada em cada fase")
+    diagnostico.add_argument(
+        "--diagnostico", type=int, default=0, metavar="K", help="guarda os top-K projetos de cada aluno no relatório"
+    )
+    diagnostico.add_argument("--sem-cache", action="store_true", help="não usa o cache binário dos CSVs")
+    return parser
+
+
+def _given_options(args, opcoes):
+    """
+    Nomes das opções de `opcoes` (destino -> nome) informadas na linha de comando. A comparação é com
+    "is", e não com "in": --tolerancia 0 também é uma opção informada.
+    """
+    valores = {opcao: getattr(args, destino) for destino, opcao in opcoes.items()}
+    return [opcao for opcao, valor in valores.items() if valor is not None and valor is not False]
+
+
+def check_arguments(parser, args):
+    """Rejeita (com parser.error) combinações de opções em que alguma delas seria ignorada."""
+    if args.cenarios:
+        ignoradas = _given_options(args, IGNORADAS_EM_CENARIOS)
+        if ignoradas:
+            parser.error(f"--cenarios não usa {', '.join(ignoradas)}; ponha os parâmetros no JSON dos cenários")
+    if args.comparar_particao and not args.particao:
+        parser.error("--comparar-particao exige --particao")
+
+    sem_uso = {destino: opcao for destino, (opcao, engines) in OPCOES_SOLVER.items() if args.engine not in engines}
+    ignoradas = _given_options(args, sem_uso)
+    if ignoradas:
+        parser.error(f"a engine {args.engine} não usa {', '.join(ignoradas)}")
+
+
+def main(argv=None):
+    """Executa uma alocação a partir dos argumentos e retorna o código de saída do processo."""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    check_arguments(parser, args)
+    setup_logging(args.log.upper())
+
+    # pandas (e, na engine milp, o PuLP) só são carregados depois de validar os argumentos
+    from core.allocation_solver import solve_allocation
+    from core.export import export_allocation
+    from core.partition import solve_partitioned
+    from core.scenarios import run_scenarios, scenario_grid
+    from utils.file_manager import load_alunos_csv, load_projetos_csv
+
+    config = SolverConfig(
+        backend=args.backend or "CBC",
+        threads=args.threads,
+        time_limit=args.tempo_limite,
+        gap_rel=args.gap,
+        warm_start=args.solucao_inicial,
+        msg=args.log_solver,
+        top_k=args.top_k,
+    )
+    relatorio = RunReport(rastrear_memoria=args.memoria, top_k_diagnostico=args.diagnostico)
+    cache_dir = None if args.sem_cache else CACHE_DIR
+
+    inicio = time.perf_counter()
+    try:
+        with relatorio.phase("leitura"):
+            alunos = load_alunos_csv(args.alunos, cache_dir=cache_dir)
+            projetos = load_projetos_csv(args.projetos, cache_dir=cache_dir)
+
+        if args.cenarios:
+            with open(args.cenarios, encoding="utf-8") as arquivo:
+                grade = scenario_grid(**json.load(arquivo))
+            config.msg = False
+            tabela = run_scenarios(alunos, projetos, grade, engine=args.engine, solver_config=config)
+            tabela.to_csv(args.saida, index=False)
+            print(tabela.to_string(index=False))
+            return 0
+
+        opcoes = dict(
+            engine=args.engine,
+            solver_config=config,
+            metric=args.metrica or "dot",
+            report=relatorio,
+            tolerancia=0.2 if args.tolerancia is None else args.tolerancia,
+            fixar=not args.sem_fixar,
+        )
+        if args.particao and args.comparar_particao:
+            resultado = solve_partitioned(alunos, projetos, args.particao, comparar=True, **opcoes)
+        else:
+            resultado = solve_allocation(alunos, projetos, particao=args.particao, **opcoes)
+        resultado.to_csv(args.saida, index=False)
+        if args.listas:
+            with relatorio.phase("exportacao"):
+                arquivos = export_allocation(resultado, args.listas)
+            relatorio.record(arquivos_exportados=len(arquivos))
+        relatorio.record(segundos_total=round(time.perf_counter() - inicio, 4))
+        if args.relatorio:
+            relatorio.save(args.relatorio)
+    except (OSError, ValueError) as e:
+        print(f"Erro: {e}", file=sys.stderr)
+        if args.relatorio and relatorio.fases:
+            # O relatório traz o que foi medido até o erro, inclusive os conflitos de viabilidade
+            relatorio.save(args.relatorio)
+        return 1
+
+    print(
+        f"Objetivo: {resultado.attrs['objetivo']:.2f} (gap {100 * resultado.attrs['gap']:.2f}%) "
+        f"- {len(resultado)} alunos alocados em {args.saida}"
+    )
+    if "particao" in resultado.attrs:
+        print(f"Partição {resultado.attrs['particao']}: {resultado.attrs['restricao_particao']}")
+    if "perda_particao" in resultado.attrs:
+        print(
+            f"Sem partição: {resultado.attrs['objetivo_monolitico']:.2f} "
+            f"(perda de {resultado.attrs['perda_particao']:.2f})"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,68 @@
+import os
+
+from core.allocation_solver import ENGINES_COM_PARCIAIS, solve_allocation
+from core.report import setup_logging
+
+
+def sends_partials(opcoes):
+    """
+    Se a execução com estas opções envia soluções intermediárias: só quando opcoes["parciais"] pede e a
+    engine está em ENGINES_COM_PARCIAIS, sem partição (a gulosa inicial do MILP tem custo próprio).
+    """
+    return (
+        bool(opcoes.get("parciais"))
+        and opcoes.get("engine", "milp") in ENGINES_COM_PARCIAIS
+        and opcoes.get("particao") is None
+    )
+
+
+def allocation_process_main(fila, alunos_df, projetos_df, opcoes):
+    """
+    Ponto de entrada do processo filho que executa solve_allocation fora da interface.
+
+    opcoes são os argumentos de solve_allocation, mais "parciais" (ver sends_partials).
+
+    Envia pela fila mensagens (tipo, valor): ("fase", nome) ao início de cada fase, ("parcial", alunos_info)
+    a cada solução intermediária (ver on_incumbent em solve_allocation), ("resultado", alunos_info) ao
+    terminar ou ("erro", mensagem) se a alocação falhar. O processo abre um grupo próprio para que o
+    cancelamento consiga encerrar também o solver que o PuLP executa como subprocesso.
+
+    A matriz de compatibilidade é atualizada aqui, e não na interface: se opcoes traz "compatibility"
+    (CompatibilityMatrix), ela volta como ("matriz", compatibility) assim que a fase "matriz" termina,
+    para que a próxima execução recalcule só o que mudar depois desta.
+    """
+    if hasattr(os, "setsid"):
+        os.setsid()
+    # O processo é criado com "spawn" e não herda a configuração de logging da interface
+    setup_logging()
+
+    parciais = sends_partials(opcoes)
+    opcoes = {chave: valor for chave, valor in opcoes.items() if chave != "parciais"}
+    compatibility = opcoes.get("compatibility")
+    pendente = compatibility is not None
+    fases = []
+
+    def send_matrix():
+        nonlocal pendente
+        if pendente and "matriz" in fases:
+            pendente = False
+            fila.put(("matriz", compatibility))
+
+    def progress(fase):
+        send_matrix()
+        fases.append(fase)
+        fila.put(("fase", fase))
+
+    def on_incumbent(parcial, objetivo, limite):
+        send_matrix()
+        fila.put(("parcial", parcial))
+
+    try:
+        resultado = solve_allocation(
+            alunos_df, projetos_df, progress=progress, on_incumbent=on_incumbent if parciais else None, **opcoes
+        )
+    except Exception as e:
+        fila.put(("erro", str(e)))
+    else:
+        send_matrix()
+        fila.put(("resultado", resultado))
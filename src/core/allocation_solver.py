@@ -1,99 +1,623 @@
-from pulp import LpProblem, LpVariable, lpSum, LpStatus, LpMaximize
+from dataclasses import asdict
+
+import numpy as np
 import pandas as pd
+from core.candidates import congested_students, top_k_pairs
+from core.compatibility import CompatibilityMatrix, aligned_skills
+from core.feasibility import InfeasibleAllocationError, check_feasibility
+from core.flow_solver import solve_flow
+from core.heuristic_solver import solve_heuristic, upper_bound
+from core.report import RunReport, logger, top_matches
+from utils.config import HEURISTIC_TIME_LIMIT, SOLVER_BACKENDS, SolverConfig
+from utils.file_manager import ESQUEMA_ALUNOS, ESQUEMA_PROJETOS, info_columns
+
+COLUNAS_PROJETO = ["Projeto 1", "Projeto 2"]
+
+# Fases de solve_allocation, na ordem em que são reportadas ao callback de progresso
+FASES = ("preprocessamento", "matriz", "modelo", "resolucao", "extracao")
+
+# Engines que enviam soluções intermediárias a on_incumbent (sem partição)
+ENGINES_COM_PARCIAIS = ("milp", "heuristic")
+
+def split_info(alunos_df, projetos_df):
+    """
+    Separa as colunas de informação (nome, RA, curso, ..., 'Projeto 1'/'Projeto 2') dos alunos e dos
+    projetos, pelo nome da coluna. Só essas colunas são copiadas; 'Projeto 1'/'Projeto 2' são criadas
+    vazias se não existirem.
+    """
+    alunos_info = alunos_df[info_columns(alunos_df.columns, ESQUEMA_ALUNOS)].copy()
+    for col in COLUNAS_PROJETO:
+        if col not in alunos_info.columns:
+            alunos_info[col] = ""
+    projetos_info = projetos_df[info_columns(projetos_df.columns, ESQUEMA_PROJETOS)].copy()
+    return alunos_info, projetos_info
 
 def preprocess_data(alunos_df, projetos_df):
     """
     Pré-processa os dados a partir de DataFrames já existentes, separando em informações e dados numéricos.
+
+    As habilidades de alunos e projetos são casadas pelo nome da coluna (ver aligned_skills), então os
+    dois arquivos não precisam listá-las na mesma ordem.
+    """
+    habilidades = aligned_skills(alunos_df, projetos_df)
+    alunos_info, projetos_info = split_info(alunos_df, projetos_df)
+    return alunos_df[habilidades], projetos_df[habilidades], alunos_info, projetos_info
+
+def pinned_pairs(alunos_info, projetos, strict=True):
     """
-    # Separar alunos_info
-    alunos_info = alunos_df.iloc[:, [0, 1, 2, 3, 4, -2, -1]].copy()
-    alunos_data = alunos_df.drop(columns=alunos_info.columns).copy()
+    Converte as colunas 'Projeto 1'/'Projeto 2' em arrays (aluno, coluna do projeto) das pré-alocações.
+
+    Usa um dicionário nome -> coluna calculado uma única vez, em vez de procurar o nome na lista de projetos
+    para cada aluno. Com strict=False, nomes que não estão na lista de projetos são ignorados.
+    """
+    coluna_do_projeto = {nome: j for j, nome in enumerate(projetos)}
+    linhas, colunas = [], []
+
+    for col in COLUNAS_PROJETO:
+        if col not in alunos_info.columns:
+            continue
+        nomes = alunos_info[col]
+        preenchidos = nomes.notna() & (nomes.astype(str).str.strip() != "")
+        posicoes = np.flatnonzero(preenchidos.to_numpy())
+        if len(posicoes) == 0:
+            continue
+
+        indices = nomes.iloc[posicoes].map(coluna_do_projeto)
+        faltando = indices.isna().to_numpy()
+        if faltando.any() and not strict:
+            posicoes, indices = posicoes[~faltando], indices[~faltando]
+        elif faltando.any():
+            k = posicoes[np.argmax(faltando)]
+            raise ValueError(
+                f"O projeto '{nomes.iloc[k]}' do aluno {alunos_info.index[k]} não existe na lista de projetos."
+            )
 
-    # Separar projetos_info
-    projetos_info = projetos_df.iloc[:, [0, 1, 2]].copy()
-    projetos_data = projetos_df.drop(columns=projetos_info.columns).copy()
+        linhas.append(posicoes)
+        colunas.append(indices.to_numpy(dtype=np.int64))
 
-    return alunos_data, projetos_data, alunos_info, projetos_info
+    if not linhas:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    return np.concatenate(linhas), np.concatenate(colunas)
 
-def solve_allocation(alunos_df, projetos_df):
+def remaining_slots(projetos_tentados, fixados, nomes_alunos=None):
     """
-    Resolve a alocação dos alunos aos projetos considerando compatibilidade e pré-alocação.
+    Calcula quantos projetos ainda faltam para cada aluno depois das pré-alocações.
     """
-    alunos_data, projetos_data, alunos_info, projetos_info = preprocess_data(alunos_df, projetos_df)
+    projetos_tentados = np.asarray(projetos_tentados, dtype=np.int64)
+    restantes = projetos_tentados - np.bincount(fixados[0], minlength=len(projetos_tentados))
 
-    projetos = projetos_info.iloc[:, 1].values  # Códigos dos projetos
-    alunos = alunos_info.index
+    if (restantes < 0).any():
+        k = int(np.argmax(restantes < 0))
+        i = k if nomes_alunos is None else list(nomes_alunos)[k]
+        raise ValueError(f"Aluno {i} tem mais projetos pré-alocados do que tentados.")
 
-    # Matriz de compatibilidade: produto escalar entre habilidades do aluno e requisitos do projeto
-    compatibilidade = alunos_data.values @ projetos_data.values.T
+    return restantes
 
-    model = LpProblem("AlocacaoDeProjetos", LpMaximize)
+def load_window(projetos_tentados, n_projetos, tolerancia=0.2):
+    """
+    Janela de carga dos projetos: a média de alocações por projeto, com a tolerância dada para mais e para menos.
+    """
+    media_esperada = np.sum(projetos_tentados) / n_projetos
+    margem = tolerancia * media_esperada
+    return media_esperada - margem, media_esperada + margem
+
+def build_model(
+    compatibilidade, projetos_tentados, fixados, limite_inferior, limite_superior, nomes_alunos=None, pares=None
+):
+    """
+    Monta o modelo PuLP da alocação a partir de arrays NumPy, sem percorrer pares (aluno, projeto) em geradores.
+
+    - compatibilidade: matriz N x P com a pontuação de cada par
+    - projetos_tentados: array com a quantidade de projetos de cada aluno
+    - fixados: tupla (linhas, colunas) com as pré-alocações, como devolvido por pinned_pairs
+    - limite_inferior / limite_superior: carga mínima e máxima de cada projeto
+    - pares: tupla (linhas, colunas) com os únicos pares que viram variáveis, em ordem aluno-major e sem
+      repetição (ver core.candidates.top_k_pairs); None = todos os N x P pares. Deve conter os fixados.
 
-    x = LpVariable.dicts("x", ((i, j) for i in alunos for j in range(len(projetos))), cat="Binary")
+    Retorna o modelo, a lista de variáveis e os arrays (linhas, colunas) que dizem a qual par cada
+    variável corresponde. As variáveis seguem a ordem aluno-major, como no modelo original.
+    """
+    # O PuLP só é importado quando um modelo é montado, para não pesar na abertura da CLI e das engines sem MILP
+    from pulp import LpProblem, LpVariable, LpAffineExpression, LpConstraint, LpMaximize, LpBinary
+    from pulp import LpConstraintEQ, LpConstraintGE, LpConstraintLE
+
+    n_alunos, n_projetos = compatibilidade.shape
+    if nomes_alunos is None:
+        nomes_alunos = range(n_alunos)
+    nomes_alunos = list(nomes_alunos)
+
+    # Um índice por par, em ordem aluno-major
+    if pares is None:
+        linhas = np.repeat(np.arange(n_alunos), n_projetos)
+        colunas = np.tile(np.arange(n_projetos), n_alunos)
+    else:
+        linhas, colunas = (np.asarray(v, dtype=np.int64) for v in pares)
+    codigos = linhas * n_projetos + colunas
+
+    variaveis = [
+        LpVariable(f"x_({nomes_alunos[i]},_{j})", cat=LpBinary)
+        for i, j in zip(linhas.tolist(), colunas.tolist())
+    ]
+
+    model = LpProblem("AlocacaoDeProjetos", LpMaximize)
 
     # Função objetivo: maximizar a compatibilidade total
-    model += lpSum(x[(i, j)] * compatibilidade[i, j] for i in alunos for j in range(len(projetos)))
-
-    # Cálculo da média com base no total de alocações
-    total_de_alocacoes = alunos_info["Projetos Tentados"].sum()
-    media_esperada = total_de_alocacoes / len(projetos)
-    margem = 0.2 * media_esperada  # tolerância de 20%
-
-    for i in alunos:
-        projetos_alocados = []
-        for col in ["Projeto 1", "Projeto 2"]:
-            projeto_nome = alunos_info.at[i, col]
-            if pd.notna(projeto_nome) and projeto_nome.strip() != "":
-                if projeto_nome in projetos:
-                    j = list(projetos).index(projeto_nome)
-                    model += x[(i, j)] == 1
-                    projetos_alocados.append(j)
-                else:
-                    raise ValueError(f"O projeto '{projeto_nome}' do aluno {i} não existe na lista de projetos.")
-
-        projetos_tentados = alunos_info.loc[i, "Projetos Tentados"]
-        restantes = projetos_tentados - len(projetos_alocados)
-
-        if restantes < 0:
-            raise ValueError(f"Aluno {i} tem mais projetos pré-alocados do que tentados.")
-
-        model += lpSum(
-            x[(i, j)] for j in range(len(projetos)) if j not in projetos_alocados
-        ) == restantes
-
-    for j in range(len(projetos)):
-        alunos_por_projeto = lpSum(x[(i, j)] for i in alunos)
-        model += alunos_por_projeto >= media_esperada - margem
-        model += alunos_por_projeto <= media_esperada + margem
-
-    # Resolver o problema
-    status = model.solve()
-
-    if LpStatus[status] != "Optimal":
-        raise ValueError("Não foi possível encontrar uma solução ótima para a alocação.")
-
-    # Atualizar alunos_info com os projetos alocados
-    for i in alunos:
-        alocados = [projetos[j] for j in range(len(projetos)) if x[(i, j)].varValue == 1]
-        for k, col in enumerate(["Projeto 1", "Projeto 2"]):
-            if k < len(alocados):
-                alunos_info.at[i, col] = alocados[k]
-
-    # DEBUG: Quantidade de alunos alocados por projeto
-    print("\nDEBUG: Quantidade de alunos alocados por projeto:")
-    for j in range(len(projetos)):
-        alunos_no_projeto = sum(x[(i, j)].varValue for i in alunos)
-        print(f"Projeto {projetos[j]}: {alunos_no_projeto:.0f} alunos alocados")
-
-    # DEBUG: Compatibilidade dos primeiros alunos
-    print("\nDEBUG: Compatibilidade dos primeiros alunos (Top 3 projetos):")
-    for i in alunos:  
-        scores = [(projetos[j], compatibilidade[i, j]) for j in range(len(projetos))]
-        scores.sort(key=lambda x: x[1], reverse=True)
-        top3 = scores[:3]
-        alocados = [alunos_info.at[i, col] for col in ["Projeto 1", "Projeto 2"] if pd.notna(alunos_info.at[i, col])]
-        print(f"Aluno {i}:")
-        print(f"  Top 3 compatíveis: {[f'{proj} ({score:.1f})' for proj, score in top3]}")
-        print(f"  Projetos alocados: {alocados}")
+    model.setObjective(LpAffineExpression(zip(variaveis, compatibilidade[linhas, colunas].tolist())))
+
+    # Pares pré-alocados ficam fora da restrição de "restantes" do aluno
+    linhas_fixadas, colunas_fixadas = fixados
+    codigos_fixados = linhas_fixadas * n_projetos + colunas_fixadas
+    posicoes_fixadas = np.minimum(np.searchsorted(codigos, codigos_fixados), max(len(codigos) - 1, 0))
+    if len(codigos_fixados) and (len(codigos) == 0 or (codigos[posicoes_fixadas] != codigos_fixados).any()):
+        raise ValueError("Os pares do modelo não incluem todas as pré-alocações.")
+    fixado = np.zeros(len(codigos), dtype=bool)
+    fixado[posicoes_fixadas] = True
+    restantes = remaining_slots(projetos_tentados, fixados, nomes_alunos)
+
+    livres = np.flatnonzero(~fixado)
+    inicio_livres = np.searchsorted(linhas[livres], np.arange(n_alunos + 1))
+
+    ordem_fixados = np.argsort(linhas_fixadas, kind="stable")
+    linhas_fixadas = linhas_fixadas[ordem_fixados]
+    pares_fixados = posicoes_fixadas[ordem_fixados].tolist()
+    inicio_fixados = np.searchsorted(linhas_fixadas, np.arange(n_alunos + 1)).tolist()
+
+    livres = livres.tolist()
+    inicio_livres = inicio_livres.tolist()
+    restantes = restantes.tolist()
+
+    # Restrições por aluno: pré-alocações fixadas e total de projetos tentados
+    for i in range(n_alunos):
+        for k in pares_fixados[inicio_fixados[i]:inicio_fixados[i + 1]]:
+            model.addConstraint(LpConstraint(LpAffineExpression([(variaveis[k], 1)]), LpConstraintEQ, rhs=1))
+
+        termos = [(variaveis[k], 1) for k in livres[inicio_livres[i]:inicio_livres[i + 1]]]
+        model.addConstraint(LpConstraint(LpAffineExpression(termos), LpConstraintEQ, rhs=restantes[i]))
+
+    # Restrições por projeto: carga dentro da janela [limite_inferior, limite_superior]
+    ordem = np.argsort(colunas, kind="stable")
+    inicio_projetos = np.searchsorted(colunas[ordem], np.arange(n_projetos + 1)).tolist()
+    ordem = ordem.tolist()
+
+    for j in range(n_projetos):
+        alunos_por_projeto = LpAffineExpression(
+            [(variaveis[k], 1) for k in ordem[inicio_projetos[j]:inicio_projetos[j + 1]]]
+        )
+        model.addConstraint(LpConstraint(alunos_por_projeto, LpConstraintGE, rhs=limite_inferior))
+        model.addConstraint(LpConstraint(alunos_por_projeto, LpConstraintLE, rhs=limite_superior))
+
+    return model, variaveis, (linhas, colunas)
+
+def warm_start_pairs(alunos_info, anterior, projetos):
+    """
+    Converte uma alocação anterior nos pares (aluno, coluna do projeto) usados como solução inicial.
+
+    As linhas são casadas pelo RA quando as duas tabelas o têm e, caso contrário, pela posição.
+    Projetos que não existem mais são ignorados.
+    """
+    if isinstance(anterior, str):
+        anterior = pd.read_csv(anterior)
+
+    if "RA" in alunos_info.columns and "RA" in anterior.columns:
+        anterior = anterior.drop_duplicates("RA").set_index("RA")
+        alinhado = anterior.reindex(alunos_info["RA"].to_numpy())
+    else:
+        alinhado = anterior.iloc[:len(alunos_info)]
+
+    alinhado = alinhado.reindex(columns=COLUNAS_PROJETO).reset_index(drop=True)
+    return pinned_pairs(alinhado, projetos, strict=False)
+
+def assignment_from_pairs(linhas, colunas, n_alunos, n_projetos):
+    """Matriz N x P booleana da alocação a partir dos pares (aluno, projeto) escolhidos."""
+    atribuicao = np.zeros((n_alunos, n_projetos), dtype=bool)
+    atribuicao[linhas, colunas] = True
+    return atribuicao
+
+def write_assignment(alunos_info, atribuicao, projetos):
+    """
+    Preenche 'Projeto 1'/'Projeto 2' a partir da matriz de atribuição, com uma escrita por coluna.
+
+    O k-ésimo projeto alocado do aluno (na ordem da lista de projetos) vai para a k-ésima coluna; as
+    colunas além do número de projetos alocados ficam vazias (as pré-alocações fazem parte da atribuição,
+    então nenhuma se perde).
+    """
+    linhas, colunas = np.nonzero(atribuicao)
+    posicao = np.arange(len(linhas)) - np.searchsorted(linhas, linhas)
+    projetos = np.asarray(projetos, dtype=object)
+
+    for k, col in enumerate(COLUNAS_PROJETO):
+        escolhidos = posicao == k
+        valores = np.full(len(alunos_info), "", dtype=object)
+        valores[linhas[escolhidos]] = projetos[colunas[escolhidos]]
+        alunos_info[col] = valores
+
+def incumbent_highs(on_solution, **opcoes):
+    """
+    HiGHS pela interface Python (highspy) que repassa cada solução inteira melhor que encontra a
+    on_solution(valores, limite_superior) e passa ao HiGHS os valores iniciais das variáveis, se houver.
+
+    valores vem na ordem das colunas do HiGHS (a coluna de cada variável do PuLP fica em variavel.index);
+    limite_superior é o limite do objetivo (maximizado) provado pelo HiGHS até ali.
+    """
+    from pulp import HiGHS
+
+    class IncumbentHiGHS(HiGHS):
+        def callSolver(self, lp):
+            iniciais = [(v.index, v.varValue) for v in lp.variables() if v.varValue is not None]
+            if iniciais:
+                colunas, valores = map(np.array, zip(*iniciais))
+                lp.solverModel.setSolution(len(colunas), colunas.astype(np.int32), valores.astype(np.float64))
+            # O PuLP passa ao HiGHS o objetivo com o sinal trocado (o HiGHS minimiza)
+            lp.solverModel.cbMipImprovingSolution.subscribe(
+                lambda evento: on_solution(
+                    np.asarray(evento.data_out.mip_solution), -evento.data_out.mip_dual_bound
+                )
+            )
+            super().callSolver(lp)
+
+    return IncumbentHiGHS(**opcoes)
+
+
+def make_solver(config, warm_start=None, on_solution=None):
+    """
+    Cria o solver do PuLP correspondente à configuração.
+
+    warm_start diz se o modelo tem solução inicial; None = só se config.warm_start foi informado.
+    A interface Python do HiGHS (highspy) não aceita solução inicial: com warm_start, o HiGHS roda pelo
+    executável (HiGHS_CMD) se ele estiver instalado e, senão, pela interface Python sem a solução
+    inicial, com um aviso no log. O GLPK também a ignora.
+
+    on_solution (ver incumbent_highs) só é usado pelo backend HIGHS, que então roda pela interface
+    Python, recebendo a solução inicial por ela; o CBC e o GLPK não expõem as soluções intermediárias.
+    """
+    from pulp import PULP_CBC_CMD, HiGHS, HiGHS_CMD, GLPK_CMD
+
+    backend = config.backend.upper()
+    if backend not in SOLVER_BACKENDS:
+        raise ValueError(f"Backend de solver desconhecido: '{config.backend}'.")
+
+    if warm_start is None:
+        warm_start = config.warm_start is not None
+    opcoes = dict(msg=config.msg, timeLimit=config.time_limit)
+    if backend == "CBC":
+        solver = PULP_CBC_CMD(
+            threads=config.threads, gapRel=config.gap_rel, warmStart=warm_start, **opcoes
+        )
+    elif backend == "HIGHS" and on_solution is not None and HiGHS().available():
+        solver = incumbent_highs(on_solution, threads=config.threads, gapRel=config.gap_rel, **opcoes)
+    elif backend == "HIGHS":
+        executavel = HiGHS_CMD(threads=config.threads, gapRel=config.gap_rel, warmStart=warm_start, **opcoes)
+        solver = HiGHS(threads=config.threads, gapRel=config.gap_rel, **opcoes)
+        if not solver.available() or (warm_start and executavel.available()):
+            solver = executavel
+        elif warm_start:
+            logger.warning("O HiGHS pela interface Python não aceita solução inicial; ela será ignorada.")
+    else:
+        # GLPK não tem opção de threads nem de solução inicial
+        solver = GLPK_CMD(options=["--mipgap", str(config.gap_rel)] if config.gap_rel else None, **opcoes)
+
+    if not solver.available():
+        raise ValueError(f"O solver {config.backend} não está instalado.")
+    return solver
+
+def set_initial_values(variaveis, pares, inicial, n_projetos):
+    """
+    Define a solução inicial do modelo: 1 nas variáveis dos pares de `inicial`, 0 nas demais.
+
+    pares é a tupla (linhas, colunas) devolvida por build_model, em ordem aluno-major.
+    """
+    linhas, colunas = pares
+    codigos = linhas * n_projetos + colunas
+    codigos_iniciais = inicial[0] * n_projetos + inicial[1]
+    posicoes = np.searchsorted(codigos, codigos_iniciais)
+    existentes = posicoes < len(codigos)
+    existentes[existentes] = codigos[posicoes[existentes]] == codigos_iniciais[existentes]
+
+    valores = np.zeros(len(variaveis), dtype=np.int64)
+    valores[posicoes[existentes]] = 1
+    for variavel, valor in zip(variaveis, valores.tolist()):
+        variavel.setInitialValue(valor)
+
+def solve_allocation(
+    alunos_df,
+    projetos_df,
+    engine="milp",
+    solver_config=None,
+    progress=None,
+    compatibility=None,
+    metric="dot",
+    report=None,
+    return_assignment=False,
+    tolerancia=0.2,
+    fixar=True,
+    pesos=None,
+    particao=None,
+    on_incumbent=None,
+):
+    """
+    Resolve a alocação dos alunos aos projetos considerando compatibilidade e pré-alocação.
+
+    engine escolhe o método de resolução:
+    - "milp": modelo binário resolvido pelo PuLP (CBC)
+    - "flow": fluxo de custo mínimo dedicado (mesmo ótimo, sem branch-and-bound)
+    - "heuristic": gulosa + busca local com orçamento de tempo; devolve a melhor solução viável encontrada
+
+    solver_config (utils.config.SolverConfig) escolhe backend, threads, tempo limite, gap e solução inicial
+    do MILP; o tempo limite também vale para a engine heurística. Com solver_config.top_k, o MILP só
+    recebe os pares candidatos de core.candidates.top_k_pairs e, se ficar inviável, o k dos alunos
+    envolvidos é dobrado até haver solução; o objetivo pode então ficar um pouco abaixo do ótimo.
+
+    progress, se informado, é chamado com o nome de cada fase (ver FASES) quando ela começa.
+
+    compatibility (core.compatibility.CompatibilityMatrix), se informado, é reaproveitado entre
+    execuções: só as linhas e colunas de alunos e projetos alterados desde a última vez são recalculadas.
+
+    metric escolhe a pontuação de cada par aluno x projeto: "dot", "cosine", "weighted" ou "coverage"
+    (ver core.similarity.compute_similarity); pesos (dict habilidade -> peso) vale para "weighted".
+
+    tolerancia é a folga da janela de carga em torno da média de alunos por projeto (0.2 = 20% para
+    mais e para menos). Com fixar=False, as pré-alocações de 'Projeto 1'/'Projeto 2' são ignoradas.
+
+    report (core.report.RunReport) recebe o tempo e a memória de cada fase, o tamanho do modelo, a
+    situação do solver e a carga de cada projeto; se não for informado, um relatório padrão é criado.
+
+    Antes de calcular a matriz, core.feasibility.check_feasibility confere a janela de carga, os projetos
+    tentados e as pré-alocações; se houver conflito, levanta InfeasibleAllocationError (um ValueError)
+    com a lista de conflitos em `conflitos`, que também vai para o relatório.
+
+    O objetivo da solução e um limite superior para ele ficam em alunos_info.attrs
+    ("objetivo", "limite_superior" e "gap", além da "metrica" e da "tolerancia" usadas e do "relatorio" em
+    forma de dict);
+    quando a solução é comprovadamente ótima o limite é o próprio objetivo.
+
+    Com return_assignment=True, retorna (alunos_info, atribuicao), em que atribuicao é a matriz N x P
+    booleana da alocação (linhas na ordem de alunos_df, colunas na de projetos_df).
+
+    particao ("presencial", "curso" ou rótulos próprios) separa alunos e projetos em grupos independentes,
+    resolvidos em paralelo (ver core.partition.solve_partitioned); cada aluno só recebe projetos do próprio
+    grupo, e attrs["particao"] e o relatório registram essa restrição.
+
+    on_incumbent(alunos_info, objetivo, limite_superior), se informado, recebe cada solução intermediária
+    viável, melhor do que a anterior, com os mesmos attrs do resultado final, attrs["parcial"] = True e um
+    "relatorio" com as fases até ali e status_solver "Parcial"; a solução final é só a retornada.
+    A engine heurística envia a solução inicial e as melhorias da busca local (no máximo uma a cada
+    INCUMBENT_INTERVAL segundos). O MILP envia antes a solução gulosa, que vira a solução inicial do
+    solver; depois dela, só o backend HIGHS (pela interface Python) envia as soluções que o solver
+    encontra, pois o PuLP não expõe as do CBC e do GLPK. O fluxo e a partição não têm soluções
+    intermediárias.
+    """
+    if particao is not None:
+        from core.partition import solve_partitioned
+
+        return solve_partitioned(
+            alunos_df,
+            projetos_df,
+            particao,
+            progress=progress,
+            report=report,
+            return_assignment=return_assignment,
+            compatibility=compatibility,
+            engine=engine,
+            solver_config=solver_config,
+            metric=metric,
+            tolerancia=tolerancia,
+            fixar=fixar,
+            pesos=pesos,
+        )
+
+    if solver_config is None:
+        solver_config = SolverConfig()
+    if progress is None:
+        progress = lambda fase: None
+    if report is None:
+        report = RunReport()
+
+    def fase(nome):
+        progress(nome)
+        return report.phase(nome)
+
+    parciais = 0
+
+    def publish(atribuicao, objetivo, limite):
+        """Envia uma solução parcial a on_incumbent, em uma cópia de alunos_info."""
+        nonlocal parciais
+        parcial = alunos_info.copy()
+        write_assignment(parcial, atribuicao, projetos)
+        gap = (limite - objetivo) / max(abs(limite), 1.0)
+        parcial.attrs.update(
+            metrica=metric, tolerancia=tolerancia, objetivo=objetivo, limite_superior=limite, gap=gap, parcial=True
+        )
+        parcial.attrs["relatorio"] = dict(
+            report.to_dict(), status_solver="Parcial", objetivo=objetivo, limite_superior=limite, gap=round(gap, 6)
+        )
+        parciais += 1
+        on_incumbent(parcial, objetivo, limite)
+
+    with fase("preprocessamento"):
+        alunos_info, projetos_info = split_info(alunos_df, projetos_df)
+
+        projetos = projetos_info.iloc[:, 1].values  # Códigos dos projetos
+        alunos = alunos_info.index
+
+        # Janela de carga: média de alocações por projeto com a tolerância dada
+        projetos_tentados = alunos_info["Projetos Tentados"].to_numpy()
+        limite_inferior, limite_superior = load_window(projetos_tentados, len(projetos), tolerancia)
+        if fixar:
+            fixados = pinned_pairs(alunos_info, projetos)
+        else:
+            fixados = np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+        # Conflitos óbvios entre janela, projetos tentados e pré-alocações são rejeitados antes do modelo
+        conflitos = check_feasibility(
+            projetos_tentados, fixados, limite_inferior, limite_superior, alunos, projetos
+        )
+    report.record(
+        engine=engine, metrica=metric, tolerancia=tolerancia, fixar=fixar, alunos=len(alunos), projetos=len(projetos)
+    )
+    if conflitos:
+        report.record(conflitos=[asdict(conflito) for conflito in conflitos])
+        raise InfeasibleAllocationError(conflitos)
+
+    # Matriz de compatibilidade entre habilidades do aluno e requisitos do projeto, pela métrica escolhida
+    with fase("matriz"):
+        if compatibility is None:
+            compatibility = CompatibilityMatrix()
+        compatibilidade = compatibility.refresh(alunos_df, projetos_df, metric, pesos)
+
+    if engine == "milp":
+        from pulp import LpStatus, LpSolutionOptimal
+
+        inicial = None
+        limite_rapido = None
+        melhor_publicado = -np.inf
+        if on_incumbent is not None:
+            limite_rapido = upper_bound(compatibilidade, remaining_slots(projetos_tentados, fixados), fixados)
+        if solver_config.warm_start is not None:
+            inicial = warm_start_pairs(alunos_info, solver_config.warm_start, projetos)
+        elif on_incumbent is not None:
+            # O CBC não devolve as soluções intermediárias: a gulosa é enviada já e vira a solução inicial.
+            # Com time_limit=0 não há recurso ao fluxo: se a gulosa não for viável, o MILP parte do zero
+            try:
+                gulosa, objetivo_guloso, limite_guloso = solve_heuristic(
+                    compatibilidade,
+                    remaining_slots(projetos_tentados, fixados, alunos),
+                    fixados,
+                    limite_inferior,
+                    limite_superior,
+                    time_limit=0,
+                )
+            except ValueError:
+                logger.info("A solução gulosa não é viável; o MILP começa sem solução inicial.")
+            else:
+                publish(gulosa, objetivo_guloso, limite_guloso)
+                melhor_publicado = objetivo_guloso
+                inicial = np.nonzero(gulosa)
+
+        def publish_solver_solution(valores_highs, limite_solver):
+            """Envia a on_incumbent uma solução do HiGHS melhor do que a última enviada."""
+            nonlocal melhor_publicado
+            posicoes = np.fromiter((v.index for v in variaveis), dtype=np.int64, count=len(variaveis))
+            escolhidos = valores_highs[posicoes] > 0.5
+            atribuicao = assignment_from_pairs(linhas[escolhidos], colunas[escolhidos], n_alunos, n_projetos)
+            objetivo = float(compatibilidade[atribuicao].sum(dtype=np.float64))
+            if objetivo > melhor_publicado:
+                melhor_publicado = objetivo
+                # Com poda, o limite do HiGHS vale só para o modelo reduzido
+                limite = limite_rapido if pares is not None else min(limite_rapido, limite_solver)
+                publish(atribuicao, objetivo, limite)
+
+        # Poda top-k: cada aluno começa com seus top_k projetos (no mínimo os que ele tenta)
+        n_alunos, n_projetos = compatibilidade.shape
+        podado = solver_config.top_k is not None and solver_config.top_k < n_projetos
+        ks = np.maximum(solver_config.top_k or 0, projetos_tentados).astype(np.int64)
+        minimo_por_projeto = limite_inferior
+        rodadas = 0
+
+        while True:
+            rodadas += 1
+            with fase("modelo"):
+                pares = None
+                if podado:
+                    obrigatorios = [fixados] if inicial is None else [fixados, inicial]
+                    pares = top_k_pairs(compatibilidade, ks, obrigatorios, minimo_por_projeto)
+                model, variaveis, (linhas, colunas) = build_model(
+                    compatibilidade,
+                    projetos_tentados,
+                    fixados,
+                    limite_inferior,
+                    limite_superior,
+                    nomes_alunos=alunos,
+                    pares=pares,
+                )
+
+                if inicial is not None:
+                    set_initial_values(variaveis, (linhas, colunas), inicial, n_projetos)
+
+            # Resolver o problema
+            with fase("resolucao"):
+                status = model.solve(
+                    make_solver(
+                        solver_config,
+                        warm_start=inicial is not None,
+                        on_solution=publish_solver_solution if on_incumbent is not None else None,
+                    )
+                )
+            report.record(
+                variaveis=len(variaveis), restricoes=len(model.constraints), status_solver=LpStatus[status]
+            )
+            if LpStatus[status] != "Infeasible" or not podado:
+                break
+
+            # Modelo podado inviável: dobra o k dos alunos presos a projetos disputados (ou de todos)
+            ampliados = congested_students((linhas, colunas), fixados, limite_superior, n_alunos, n_projetos)
+            if len(ampliados) == 0 or (ks[ampliados] >= n_projetos).all():
+                ampliados = np.arange(n_alunos)
+            ks[ampliados] = np.maximum(2 * ks[ampliados], 1)
+            minimo_por_projeto = 2 * minimo_por_projeto
+            podado = bool((ks < n_projetos).any())
+        report.record(backend=solver_config.backend, rodadas_top_k=rodadas if solver_config.top_k else 0)
+
+        if LpStatus[status] != "Optimal":
+            raise ValueError("Não foi possível encontrar uma solução ótima para a alocação.")
+        # Com poda, o ótimo do modelo reduzido não prova o ótimo do problema inteiro
+        otimo = model.sol_status == LpSolutionOptimal and pares is None
+
+        valores = np.fromiter((v.varValue or 0 for v in variaveis), dtype=np.float64, count=len(variaveis))
+        escolhidos = valores > 0.5
+        atribuicao = assignment_from_pairs(linhas[escolhidos], colunas[escolhidos], n_alunos, n_projetos)
+    elif engine == "flow":
+        with fase("resolucao"):
+            restantes = remaining_slots(projetos_tentados, fixados, alunos)
+            atribuicao = solve_flow(compatibilidade, restantes, fixados, limite_inferior, limite_superior)
+        otimo = True
+        report.record(status_solver="Optimal")
+    elif engine == "heuristic":
+        with fase("resolucao"):
+            restantes = remaining_slots(projetos_tentados, fixados, alunos)
+            atribuicao, _, limite = solve_heuristic(
+                compatibilidade,
+                restantes,
+                fixados,
+                limite_inferior,
+                limite_superior,
+                time_limit=solver_config.time_limit or HEURISTIC_TIME_LIMIT,
+                on_incumbent=publish if on_incumbent is not None else None,
+            )
+        otimo = False
+        report.record(status_solver="Heuristica")
+    else:
+        raise ValueError(f"Engine de alocação desconhecida: '{engine}'.")
+
+    with fase("extracao"):
+        objetivo = float(compatibilidade[atribuicao].sum(dtype=np.float64))
+        if otimo:
+            limite = objetivo
+        elif engine != "heuristic":
+            limite = upper_bound(compatibilidade, remaining_slots(projetos_tentados, fixados), fixados)
+
+        # Atualizar alunos_info com os projetos alocados
+        write_assignment(alunos_info, atribuicao, projetos)
+        cargas = atribuicao.sum(axis=0)
+
+    gap = (limite - objetivo) / max(abs(limite), 1.0)
+    report.record(objetivo=objetivo, limite_superior=limite, gap=round(gap, 6))
+    if on_incumbent is not None:
+        report.record(solucoes_parciais=parciais)
+    report.dados["cargas"] = dict(zip(map(str, projetos), cargas.tolist()))
+    if report.top_k_diagnostico:
+        report.dados["diagnostico"] = top_matches(
+            compatibilidade, *np.nonzero(atribuicao), projetos, report.top_k_diagnostico
+        )
+        for i, linha in zip(alunos, report.dados["diagnostico"]):
+            logger.debug("Aluno %s: top %s, alocados %s", i, linha["top"], linha["alocados"])
+
+    alunos_info.attrs["metrica"] = metric
+    alunos_info.attrs["tolerancia"] = tolerancia
+    alunos_info.attrs["objetivo"] = objetivo
+    alunos_info.attrs["limite_superior"] = limite
+    alunos_info.attrs["gap"] = gap
+    alunos_info.attrs["relatorio"] = report.to_dict()
 
+    if return_assignment:
+        return alunos_info, atribuicao
     return alunos_info
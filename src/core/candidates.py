@@ -0,0 +1,71 @@
+import numpy as np
+
+
+def top_k_pairs(compatibilidade, ks, obrigatorios=(), minimo_por_projeto=0):
+    """
+    Pares (aluno, projeto) candidatos do modelo podado.
+
+    - ks: quantos dos projetos mais compatíveis entram para cada aluno (inteiro ou array de tamanho N)
+    - obrigatorios: tuplas (linhas, colunas) de pares que sempre entram (pré-alocações, solução inicial)
+    - minimo_por_projeto: cada projeto recebe pelo menos esse número de alunos candidatos (os mais
+      compatíveis com ele), para que a carga mínima continue alcançável
+
+    Os projetos de cada aluno são ordenados pela compatibilidade menos a média da coluna do projeto: a
+    janela de carga espalha os alunos de qualquer jeito, então um projeto bom para todos não diz nada
+    sobre qual aluno deve ficar com ele (pela pontuação bruta, a solução ótima usa projetos muito mais
+    abaixo na lista de cada aluno). Os melhores saem de um argpartition, sem ordenar a linha inteira.
+
+    Retorna (linhas, colunas) sem repetição, em ordem aluno-major, como os pares de build_model.
+    """
+    n_alunos, n_projetos = compatibilidade.shape
+    relativa = compatibilidade - compatibilidade.mean(axis=0, dtype=np.float64).astype(compatibilidade.dtype)
+    ks = np.minimum(np.broadcast_to(np.asarray(ks, dtype=np.int64), (n_alunos,)), n_projetos)
+    k_max = int(ks.max(initial=0))
+    codigos = []
+
+    if k_max > 0:
+        if k_max < n_projetos:
+            melhores = np.argpartition(-relativa, k_max - 1, axis=1)[:, :k_max]
+        else:
+            melhores = np.broadcast_to(np.arange(n_projetos), (n_alunos, n_projetos))
+        # Só os k_max escolhidos são ordenados, para cortar cada aluno no seu próprio k
+        ordem = np.argsort(-np.take_along_axis(relativa, melhores, axis=1), axis=1, kind="stable")
+        melhores = np.take_along_axis(melhores, ordem, axis=1)
+        usados = np.arange(k_max) < ks[:, None]
+        codigos.append(np.nonzero(usados)[0] * n_projetos + melhores[usados])
+
+    minimo = min(int(np.ceil(minimo_por_projeto)), n_alunos)
+    if minimo > 0 and codigos:
+        por_projeto = np.bincount(codigos[0] % n_projetos, minlength=n_projetos)
+        faltando = np.flatnonzero(por_projeto < minimo)
+        if len(faltando):
+            colunas = compatibilidade[:, faltando]
+            if minimo < n_alunos:
+                alunos = np.argpartition(-colunas, minimo - 1, axis=0)[:minimo]
+            else:
+                alunos = np.broadcast_to(np.arange(n_alunos)[:, None], colunas.shape)
+            codigos.append((alunos * n_projetos + faltando).ravel())
+
+    for linhas, colunas in obrigatorios:
+        codigos.append(np.asarray(linhas, dtype=np.int64) * n_projetos + np.asarray(colunas, dtype=np.int64))
+
+    if not codigos:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    codigos = np.unique(np.concatenate(codigos))
+    return codigos // n_projetos, codigos % n_projetos
+
+
+def congested_students(pares, fixados, limite_superior, n_alunos, n_projetos):
+    """
+    Alunos cujos candidatos livres estão todos em projetos disputados (mais candidatos que vagas).
+
+    São os alunos que mais provavelmente tornaram o modelo podado inviável; é para eles que o k é
+    ampliado primeiro.
+    """
+    linhas, colunas = pares
+    codigos = linhas * n_projetos + colunas
+    livre = ~np.isin(codigos, fixados[0] * n_projetos + fixados[1])
+
+    disputado = np.bincount(colunas, minlength=n_projetos) > limite_superior
+    folgados = np.bincount(linhas[livre & ~disputado[colunas]], minlength=n_alunos)
+    return np.flatnonzero(folgados == 0)
@@ -0,0 +1,73 @@
+import numpy as np
+
+from core.similarity import compute_similarity, skill_weights
+from utils.file_manager import ESQUEMA_ALUNOS, ESQUEMA_PROJETOS, skill_columns
+
+
+def aligned_skills(alunos_df, projetos_df):
+    """
+    Habilidades usadas na compatibilidade, na ordem do arquivo de projetos, casadas por nome com as dos alunos.
+
+    Habilidades que só os alunos têm não contam (nenhum projeto as pede). Se um projeto pede uma
+    habilidade que não está no arquivo de alunos, o par de arquivos não é compatível.
+    """
+    habilidades_alunos = set(skill_columns(alunos_df.columns, ESQUEMA_ALUNOS))
+    habilidades = skill_columns(projetos_df.columns, ESQUEMA_PROJETOS)
+
+    faltando = [habilidade for habilidade in habilidades if habilidade not in habilidades_alunos]
+    if faltando:
+        raise ValueError(f"Habilidades pedidas pelos projetos e ausentes no arquivo de alunos: {', '.join(faltando)}.")
+    return habilidades
+
+
+class CompatibilityMatrix:
+    """
+    Matriz de compatibilidade aluno x projeto (ver core.similarity) mantida entre execuções.
+
+    refresh() compara as habilidades atuais com as da última chamada e recalcula só as linhas dos
+    alunos e as colunas dos projetos que mudaram. Se as habilidades, a métrica, os pesos ou o número de
+    alunos/projetos mudarem, a matriz é refeita inteira.
+    """
+
+    def __init__(self):
+        self.habilidades = None
+        self.metrica = None
+        self.pesos = None
+        self.alunos = None  # N x H
+        self.projetos = None  # P x H
+        self.matriz = None  # N x P, float32
+        self.ultima_atualizacao = None  # (linhas, colunas) recalculadas; None = matriz inteira
+
+    def refresh(self, alunos_df, projetos_df, metric="dot", pesos=None):
+        """
+        Atualiza a matriz para os DataFrames e a métrica dados e a retorna.
+
+        pesos (dict nome da habilidade -> peso) só vale para a métrica "weighted"; o padrão é PESOS_HABILIDADES.
+        """
+        habilidades = aligned_skills(alunos_df, projetos_df)
+        alunos = alunos_df[habilidades].to_numpy(dtype=np.float32)
+        projetos = projetos_df[habilidades].to_numpy(dtype=np.float32)
+        pesos = skill_weights(habilidades, pesos) if metric == "weighted" else None
+
+        if (
+            self.matriz is None
+            or habilidades != self.habilidades
+            or metric != self.metrica
+            or (pesos is not None and not np.array_equal(pesos, self.pesos))
+            or alunos.shape != self.alunos.shape
+            or projetos.shape != self.projetos.shape
+        ):
+            self.matriz = compute_similarity(alunos, projetos, metric, pesos)
+            self.ultima_atualizacao = None
+        else:
+            linhas = np.flatnonzero((alunos != self.alunos).any(axis=1))
+            colunas = np.flatnonzero((projetos != self.projetos).any(axis=1))
+            if len(colunas):
+                self.matriz[:, colunas] = compute_similarity(alunos, projetos[colunas], metric, pesos)
+            if len(linhas):
+                self.matriz[linhas] = compute_similarity(alunos[linhas], projetos, metric, pesos)
+            self.ultima_atualizacao = (linhas, colunas)
+
+        self.habilidades, self.metrica, self.pesos = habilidades, metric, pesos
+        self.alunos, self.projetos = alunos, projetos
+        return self.matriz
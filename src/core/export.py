@@ -0,0 +1,138 @@
+import os
+import re
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from core.allocation_solver import COLUNAS_PROJETO
+from utils.config import CSV_CHUNK_SIZE
+
+# Formatos de export_allocation: "csv" e "binario" (Parquet se o pyarrow estiver instalado, senão pickle)
+FORMATOS = ("csv", "binario")
+
+
+def binary_extension():
+    """Extensão do formato binário: "parquet" se o pyarrow estiver instalado, senão "pkl"."""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return "pkl"
+    return "parquet"
+
+
+def write_table(data, caminho):
+    """
+    Grava o DataFrame no formato da extensão (.csv, .parquet ou, qualquer outra, pickle).
+
+    O CSV é escrito em blocos de CSV_CHUNK_SIZE linhas. Tudo vai para um arquivo temporário na mesma pasta,
+    renomeado no fim, para nunca deixar um arquivo pela metade.
+    """
+    pasta = os.path.dirname(os.path.abspath(caminho))
+    descritor, temporario = tempfile.mkstemp(dir=pasta, suffix=".tmp")
+    os.close(descritor)
+    try:
+        extensao = os.path.splitext(caminho)[1].lower()
+        if extensao == ".csv":
+            data.to_csv(temporario, index=False, chunksize=CSV_CHUNK_SIZE)
+        elif extensao == ".parquet":
+            data.to_parquet(temporario, index=False)
+        else:
+            data.to_pickle(temporario)
+        os.replace(temporario, caminho)
+    except BaseException:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        raise
+    return caminho
+
+
+def _split_groups(linhas, chaves):
+    """{chave: posições}, com as posições de cada grupo na ordem da alocação, a partir de um único argsort."""
+    if len(linhas) == 0:
+        return {}
+    codigos, unicos = pd.factorize(chaves, sort=True)
+    ordem = np.lexsort((linhas, codigos))
+    cortes = np.searchsorted(codigos[ordem], np.arange(1, len(unicos)))
+    return dict(zip(unicos.tolist(), np.split(linhas[ordem], cortes)))
+
+
+def roster_groups(alunos_info):
+    """
+    Posições dos alunos de cada lista, em uma única passagem pela alocação.
+
+    Retorna {"projetos": {projeto: posições}, "cursos": {curso: posições}}: um aluno entra na lista de
+    cada projeto em 'Projeto 1'/'Projeto 2' e na do seu curso.
+    """
+    linhas, nomes = [np.empty(0, dtype=np.int64)], [np.empty(0, dtype=object)]
+    for col in COLUNAS_PROJETO:
+        if col in alunos_info.columns:
+            valores = alunos_info[col].to_numpy(dtype=object)
+            preenchidos = np.flatnonzero(pd.notna(valores) & (valores != ""))
+            linhas.append(preenchidos)
+            nomes.append(valores[preenchidos])
+    grupos = {"projetos": _split_groups(np.concatenate(linhas), np.concatenate(nomes))}
+
+    if "Curso" in alunos_info.columns:
+        cursos = alunos_info["Curso"].to_numpy(dtype=object)
+        validos = np.flatnonzero(pd.notna(cursos))
+        grupos["cursos"] = _split_groups(validos, cursos[validos])
+    return grupos
+
+
+def _file_name(nome, usados):
+    """Nome de arquivo seguro e único na pasta (sem distinguir maiúsculas) para a lista `nome`."""
+    base = re.sub(r"[^\w.-]+", "_", str(nome)).strip("._") or "sem_nome"
+    arquivo, k = base, 2
+    while arquivo.lower() in usados:
+        arquivo, k = f"{base}_{k}", k + 1
+    usados.add(arquivo.lower())
+    return arquivo
+
+
+def _write_roster(alunos_info, linhas, caminhos):
+    """Recorta as linhas da lista uma vez e grava cada formato."""
+    lista = alunos_info if linhas is None else alunos_info.iloc[linhas]
+    return [write_table(lista, caminho) for caminho in caminhos]
+
+
+def export_allocation(alunos_info, pasta, formatos=FORMATOS, listas=True, max_workers=None, progress=None):
+    """
+    Exporta a alocação para a pasta: o arquivo global e, com listas=True, uma lista por projeto e por curso.
+
+    - pasta/alocacao.<ext>: todos os alunos
+    - pasta/projetos/<projeto>.<ext> e pasta/cursos/<curso>.<ext>: as linhas de cada lista, na ordem da
+      alocação e com as mesmas colunas
+    - formatos: "csv" e/ou "binario" (ver binary_extension)
+
+    As listas saem de uma única passagem agrupada (roster_groups). Cada lista é gravada, em todos os
+    formatos, por uma thread de um pool de max_workers; progress(arquivos_gravados, total_de_arquivos), se
+    informado, é chamado a cada lista concluída.
+    Retorna os caminhos gravados, em ordem alfabética.
+    """
+    desconhecidos = set(formatos) - set(FORMATOS)
+    if desconhecidos:
+        raise ValueError(f"Formato de exportação desconhecido: {', '.join(sorted(desconhecidos))}.")
+    extensoes = ["csv" if formato == "csv" else binary_extension() for formato in formatos]
+
+    os.makedirs(pasta, exist_ok=True)
+    tarefas = [(None, [os.path.join(pasta, f"alocacao.{ext}") for ext in extensoes])]
+    if listas:
+        for tipo, grupos in roster_groups(alunos_info).items():
+            subpasta = os.path.join(pasta, tipo)
+            os.makedirs(subpasta, exist_ok=True)
+            usados = set()
+            for nome, linhas in grupos.items():
+                arquivo = _file_name(nome, usados)
+                tarefas.append((linhas, [os.path.join(subpasta, f"{arquivo}.{ext}") for ext in extensoes]))
+
+    total = sum(len(caminhos) for _, caminhos in tarefas)
+    gravados = []
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futuros = [pool.submit(_write_roster, alunos_info, linhas, caminhos) for linhas, caminhos in tarefas]
+        for futuro in as_completed(futuros):
+            gravados += futuro.result()
+            if progress is not None:
+                progress(len(gravados), total)
+    return sorted(gravados)
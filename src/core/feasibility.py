@@ -0,0 +1,131 @@
+from dataclasses import dataclass, field
+from typing import List
+
+import numpy as np
+
+from core.flow_solver import integer_bounds
+
+# Quantos alunos/projetos cada conflito cita na mensagem; as listas completas ficam no Conflict
+MAX_CITADOS = 10
+
+
+@dataclass
+class Conflict:
+    """
+    Um motivo pelo qual a alocação não tem solução.
+
+    - tipo: "janela_vazia", "tentados_demais", "fixado_repetido", "fixados_demais", "projeto_sobrecarregado"
+      ou "demanda_total"
+    - mensagem: explicação para o usuário
+    - alunos: índices (de alunos_df) dos alunos envolvidos
+    - projetos: nomes dos projetos envolvidos
+    """
+    tipo: str
+    mensagem: str
+    alunos: List = field(default_factory=list)
+    projetos: List = field(default_factory=list)
+
+
+class InfeasibleAllocationError(ValueError):
+    """ValueError de uma alocação sem solução; a lista de Conflict fica em `conflitos`."""
+
+    def __init__(self, conflitos):
+        self.conflitos = conflitos
+        super().__init__(
+            "A alocação não tem solução:\n" + "\n".join(f"- {conflito.mensagem}" for conflito in conflitos)
+        )
+
+    def __reduce__(self):
+        # Recriado a partir dos conflitos ao voltar de um processo do pool (partição, cenários)
+        return type(self), (self.conflitos,)
+
+
+def _cite(nomes):
+    nomes = [str(nome) for nome in nomes]
+    texto = ", ".join(nomes[:MAX_CITADOS])
+    if len(nomes) > MAX_CITADOS:
+        texto += f" e mais {len(nomes) - MAX_CITADOS}"
+    return texto
+
+
+def check_feasibility(projetos_tentados, fixados, limite_inferior, limite_superior, nomes_alunos, nomes_projetos):
+    """
+    Verificação rápida, em O(N + P), das condições necessárias para que a alocação tenha solução.
+
+    - projetos_tentados: array com a quantidade de projetos de cada aluno
+    - fixados: tupla (linhas, colunas) com as pré-alocações, como devolvido por pinned_pairs
+    - limite_inferior / limite_superior: janela de carga de cada projeto
+    - nomes_alunos / nomes_projetos: rótulos usados nas mensagens e nas listas dos conflitos
+
+    Confere que a janela tem ao menos uma carga inteira, que nenhum aluno tenta mais projetos do que
+    existem, tem o mesmo projeto fixado duas vezes ou mais pré-alocações do que tenta, que nenhum projeto
+    tem mais pré-alocações do que a carga máxima e que a demanda total (fixada e livre) cabe na soma das
+    janelas. Retorna a lista de Conflict encontrados (vazia se nada impede a alocação; o solver ainda pode
+    não achar solução, pois as condições são necessárias, não suficientes).
+    """
+    projetos_tentados = np.asarray(projetos_tentados, dtype=np.int64)
+    nomes_alunos = np.asarray(nomes_alunos, dtype=object)
+    nomes_projetos = np.asarray(nomes_projetos, dtype=object)
+    n_alunos, n_projetos = len(projetos_tentados), len(nomes_projetos)
+    linhas, colunas = (np.asarray(v, dtype=np.int64) for v in fixados)
+    minimo, maximo = integer_bounds(limite_inferior, limite_superior)
+    minimo, maximo = max(int(minimo), 0), int(maximo)
+    conflitos = []
+
+    if minimo > maximo:
+        conflitos.append(Conflict(
+            "janela_vazia",
+            f"A janela de carga [{limite_inferior:.2f}, {limite_superior:.2f}] alunos por projeto não contém "
+            f"nenhum número inteiro; aumente a tolerância.",
+        ))
+
+    demais = np.flatnonzero(projetos_tentados > n_projetos)
+    if len(demais):
+        conflitos.append(Conflict(
+            "tentados_demais",
+            f"Alunos que tentam mais projetos do que os {n_projetos} existentes: {_cite(nomes_alunos[demais])}.",
+            alunos=nomes_alunos[demais].tolist(),
+        ))
+
+    codigos = np.unique(linhas * n_projetos + colunas, return_counts=True)
+    repetidos = codigos[0][codigos[1] > 1] // max(n_projetos, 1)
+    if len(repetidos):
+        conflitos.append(Conflict(
+            "fixado_repetido",
+            f"Alunos com o mesmo projeto pré-alocado duas vezes: {_cite(nomes_alunos[repetidos])}.",
+            alunos=nomes_alunos[repetidos].tolist(),
+        ))
+
+    por_aluno = np.bincount(linhas, minlength=n_alunos)
+    excesso = np.flatnonzero(por_aluno > projetos_tentados)
+    if len(excesso):
+        conflitos.append(Conflict(
+            "fixados_demais",
+            f"Alunos com mais projetos pré-alocados do que tentados: {_cite(nomes_alunos[excesso])}.",
+            alunos=nomes_alunos[excesso].tolist(),
+        ))
+
+    por_projeto = np.bincount(colunas, minlength=n_projetos)
+    sobrecarregados = np.flatnonzero(por_projeto > maximo)
+    if len(sobrecarregados):
+        alunos = np.flatnonzero(np.isin(colunas, sobrecarregados))
+        citados = [f"{nome} ({n})" for nome, n in zip(nomes_projetos[sobrecarregados], por_projeto[sobrecarregados])]
+        conflitos.append(Conflict(
+            "projeto_sobrecarregado",
+            f"Projetos com mais pré-alocações do que a carga máxima de {maximo} alunos: {_cite(citados)}.",
+            alunos=nomes_alunos[np.unique(linhas[alunos])].tolist(),
+            projetos=nomes_projetos[sobrecarregados].tolist(),
+        ))
+
+    # Demanda total: cada projeto recebe entre max(minimo, fixados) e maximo alunos
+    demanda = int(projetos_tentados.sum())
+    capacidade_minima = int(np.maximum(por_projeto, minimo).sum())
+    capacidade_maxima = n_projetos * maximo
+    if minimo <= maximo and not capacidade_minima <= demanda <= capacidade_maxima:
+        conflitos.append(Conflict(
+            "demanda_total",
+            f"Os alunos tentam {demanda} projetos no total, mas os {n_projetos} projetos comportam entre "
+            f"{capacidade_minima} e {capacidade_maxima} alocações.",
+        ))
+
+    return conflitos
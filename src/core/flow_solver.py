@@ -0,0 +1,186 @@
+import time
+
+import numpy as np
+
+INF = np.inf
+EPS = 1e-9
+
+
+def integer_bounds(limite_inferior, limite_superior):
+    """
+    Converte a janela de carga (possivelmente fracionária) nos limites inteiros equivalentes.
+
+    Os limites podem ser escalares (mesma janela para todos os projetos) ou arrays com um valor por projeto.
+    """
+    return (
+        np.ceil(np.asarray(limite_inferior) - EPS).astype(np.int64),
+        np.floor(np.asarray(limite_superior) + EPS).astype(np.int64),
+    )
+
+
+class AssignmentState:
+    """
+    Estado de uma atribuição aluno -> projeto e do seu grafo residual.
+
+    O problema é um b-matching bipartido: cada aluno envia `restantes` unidades de fluxo, cada aresta
+    aluno -> projeto tem capacidade 1 e cada projeto escoa para o sumidouro entre L e U unidades.
+    Como há poucos projetos e muitos alunos, o grafo residual é comprimido em um grafo só de projetos:
+    a aresta j -> j2 representa "mover algum aluno de j para j2" e custa a menor variação de custo
+    entre os alunos móveis de j (ver `_recompute_row`).
+    """
+
+    def __init__(self, custos, fixados, limite_inferior, limite_superior):
+        n_alunos, n_projetos = custos.shape
+        self.custos = custos
+        self.limite_inferior = limite_inferior
+        self.limite_superior = limite_superior
+
+        self.atribuicao = np.zeros((n_alunos, n_projetos), dtype=bool)
+        linhas_fixadas, colunas_fixadas = fixados
+        self.atribuicao[linhas_fixadas, colunas_fixadas] = True
+        self.carga = self.atribuicao.sum(axis=0).astype(np.int64)
+
+        # Só alunos alocados pelo fluxo podem ser movidos; pré-alocações ficam fixas
+        self.membros = [set() for _ in range(n_projetos)]
+        self.troca = np.full((n_projetos, n_projetos), INF)
+        self.aluno_troca = np.full((n_projetos, n_projetos), -1, dtype=np.int64)
+        self.fixado = self.atribuicao.copy()
+
+    def load(self, atribuicao):
+        """Substitui a atribuição atual (que deve conter as pré-alocações) e recalcula as trocas."""
+        self.atribuicao = atribuicao.copy()
+        self.carga = self.atribuicao.sum(axis=0).astype(np.int64)
+        moveis = self.atribuicao & ~self.fixado
+        for j in range(len(self.membros)):
+            self.membros[j] = set(np.flatnonzero(moveis[:, j]).tolist())
+            self._recompute_row(j)
+
+    def _recompute_row(self, j):
+        """Recalcula o custo de mover o melhor aluno móvel do projeto j para cada outro projeto."""
+        if not self.membros[j]:
+            self.troca[j] = INF
+            self.aluno_troca[j] = -1
+            return
+
+        membros = np.fromiter(self.membros[j], dtype=np.int64)
+        delta = self.custos[membros] - self.custos[membros, j][:, None]
+        delta[self.atribuicao[membros]] = INF  # não pode ir para um projeto que já tem (inclui o próprio j)
+
+        melhor = delta.argmin(axis=0)
+        self.troca[j] = delta[melhor, np.arange(delta.shape[1])]
+        self.aluno_troca[j] = membros[melhor]
+
+    def _entry_tier(self):
+        """
+        Prioridade da aresta projeto -> sumidouro: 0 enquanto o projeto está abaixo do limite inferior,
+        1 até o limite superior e 2 (indisponível) quando está cheio.
+
+        Comparar (prioridade, custo) lexicograficamente equivale a dar custo -M às primeiras L unidades
+        de cada projeto com M arbitrariamente grande, sem perder precisão numérica.
+        """
+        return np.where(self.carga < self.limite_inferior, 0, np.where(self.carga < self.limite_superior, 1, 2))
+
+    def augment(self, i):
+        """
+        Envia uma unidade de fluxo a partir do aluno i pelo caminho residual mais barato.
+
+        Retorna False se não existe caminho até o sumidouro.
+        """
+        n_projetos = self.troca.shape[0]
+        colunas = np.arange(n_projetos)
+
+        distancia = np.where(self.atribuicao[i], INF, self.custos[i])
+        anterior = np.full(n_projetos, -1, dtype=np.int64)
+
+        # Bellman-Ford sobre o grafo de projetos, relaxando só a partir dos rótulos que melhoraram na
+        # rodada anterior; o resíduo não tem ciclos negativos, então converge em no máximo P rodadas
+        ativos = np.flatnonzero(np.isfinite(distancia))
+        for _ in range(n_projetos):
+            candidatos = distancia[ativos, None] + self.troca[ativos]
+            origem = candidatos.argmin(axis=0)
+            nova = candidatos[origem, colunas]
+            melhora = nova < distancia - EPS
+            if not melhora.any():
+                break
+            distancia[melhora] = nova[melhora]
+            anterior[melhora] = ativos[origem[melhora]]
+            ativos = np.flatnonzero(melhora)
+
+        prioridade = self._entry_tier()
+        alcancaveis = np.isfinite(distancia) & (prioridade < 2)
+        if not alcancaveis.any():
+            return False
+
+        melhor_prioridade = prioridade[alcancaveis].min()
+        escolhidos = np.flatnonzero(alcancaveis & (prioridade == melhor_prioridade))
+        destino = escolhidos[distancia[escolhidos].argmin()]
+
+        # Refaz o caminho de trás para frente, movendo um aluno por aresta
+        alterados = set()
+        j = destino
+        while anterior[j] != -1:
+            origem = anterior[j]
+            k = self.aluno_troca[origem, j]
+            self.move(k, origem, j, alterados)
+            j = origem
+        self.move(i, None, j, alterados)
+        self.carga[destino] += 1
+
+        self.refresh(alterados)
+        return True
+
+    def refresh(self, alterados):
+        """Recalcula as linhas de troca dos projetos alterados."""
+        for j in alterados:
+            self._recompute_row(j)
+
+    def move(self, k, origem, destino, alterados):
+        """Move o aluno k de origem para destino (origem None = nova unidade) e anota as linhas a recalcular."""
+        if origem is not None:
+            self.atribuicao[k, origem] = False
+            self.membros[origem].discard(k)
+        self.atribuicao[k, destino] = True
+        self.membros[destino].add(k)
+
+        # Linhas de todos os projetos de k mudam: k entrou/saiu das colunas de troca
+        alterados.update(np.flatnonzero(self.atribuicao[k]).tolist())
+        if origem is not None:
+            alterados.add(origem)
+
+
+def solve_flow(compatibilidade, restantes, fixados, limite_inferior, limite_superior, time_limit=None):
+    """
+    Resolve a alocação como um fluxo de custo mínimo (caminhos mínimos sucessivos).
+
+    - compatibilidade: matriz N x P a maximizar
+    - restantes: vagas de cada aluno ainda não cobertas pelas pré-alocações
+    - fixados: tupla (linhas, colunas) com as pré-alocações
+    - limite_inferior / limite_superior: janela de carga de cada projeto (escalares ou arrays por projeto)
+
+    Como o problema é um fluxo com limites inteiros, o ótimo encontrado é inteiro e tem o mesmo valor
+    do MILP. Retorna a matriz booleana N x P de atribuição, incluindo as pré-alocações.
+
+    time_limit (segundos), se informado, limita a busca: o fluxo só tem uma solução viável no final,
+    então, se o tempo acabar antes, levanta ValueError.
+    """
+    prazo = None if time_limit is None else time.perf_counter() + time_limit
+    limite_inferior, limite_superior = integer_bounds(limite_inferior, limite_superior)
+    custos = -np.asarray(compatibilidade, dtype=np.float64)
+
+    estado = AssignmentState(custos, fixados, limite_inferior, limite_superior)
+    limites = np.broadcast_to(limite_superior, estado.carga.shape)
+    if (estado.carga > limites).any():
+        j = int(np.argmax(estado.carga > limites))
+        raise ValueError(f"O projeto {j} tem mais pré-alocações do que o limite de {limites[j]} alunos.")
+
+    for i in np.flatnonzero(np.asarray(restantes) > 0).tolist():
+        for _ in range(int(restantes[i])):
+            if prazo is not None and time.perf_counter() > prazo:
+                raise ValueError("O tempo limite acabou antes de o fluxo encontrar uma solução viável.")
+            if not estado.augment(i):
+                raise ValueError("Não foi possível encontrar uma solução ótima para a alocação.")
+
+    if (estado.carga < limite_inferior).any():
+        raise ValueError("Não foi possível encontrar uma solução ótima para a alocação.")
+
+    return estado.atribuicao
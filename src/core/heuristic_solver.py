@@ -0,0 +1,197 @@
+import time
+
+import numpy as np
+
+from core.flow_solver import EPS, AssignmentState, integer_bounds, solve_flow
+from core.report import logger
+from utils.config import INCUMBENT_INTERVAL
+
+
+def upper_bound(compatibilidade, restantes, fixados):
+    """
+    Limite superior do objetivo: cada aluno recebe seus melhores projetos, ignorando a capacidade.
+    """
+    compatibilidade = np.asarray(compatibilidade, dtype=np.float64).copy()
+    linhas_fixadas, colunas_fixadas = fixados
+    valor_fixado = compatibilidade[linhas_fixadas, colunas_fixadas].sum()
+    compatibilidade[linhas_fixadas, colunas_fixadas] = -np.inf
+
+    k = min(int(np.max(restantes, initial=0)), compatibilidade.shape[1])
+    if k == 0:
+        return float(valor_fixado)
+
+    melhores = -np.partition(-compatibilidade, k - 1, axis=1)[:, :k]
+    melhores = -np.sort(-melhores, axis=1)
+    usados = np.arange(k) < np.asarray(restantes)[:, None]
+    return float(valor_fixado + melhores[usados].sum())
+
+
+def greedy_assignment(compatibilidade, restantes, fixados, limite_inferior, limite_superior):
+    """
+    Atribuição gulosa que respeita a janela de carga.
+
+    Os alunos são atendidos em ordem de "arrependimento" (diferença entre o 1º e o 2º melhor projeto).
+    Quando as vagas restantes só bastam para completar os projetos abaixo do limite inferior, o aluno
+    passa a escolher entre esses projetos, se algum ainda estiver disponível para ele; o que faltar é
+    corrigido depois por `repair_lower_bounds`. Retorna None se um aluno ficar sem nenhum projeto com vaga.
+    """
+    n_alunos, n_projetos = compatibilidade.shape
+    compatibilidade = np.asarray(compatibilidade, dtype=np.float64)
+
+    atribuicao = np.zeros((n_alunos, n_projetos), dtype=bool)
+    atribuicao[fixados[0], fixados[1]] = True
+    carga = atribuicao.sum(axis=0).astype(np.int64)
+
+    total_restante = int(np.sum(restantes))
+    deficit = int(np.maximum(limite_inferior - carga, 0).sum())
+    if (carga > limite_superior).any():
+        return None
+
+    if n_projetos > 1:
+        dois_melhores = -np.partition(-compatibilidade, 1, axis=1)[:, :2]
+        arrependimento = np.abs(dois_melhores[:, 0] - dois_melhores[:, 1])
+    else:
+        arrependimento = np.zeros(n_alunos)
+    ordem = np.argsort(-arrependimento, kind="stable")
+
+    for i in ordem[np.asarray(restantes)[ordem] > 0].tolist():
+        for _ in range(int(restantes[i])):
+            permitidos = (carga < limite_superior) & ~atribuicao[i]
+            if total_restante <= deficit and (permitidos & (carga < limite_inferior)).any():
+                permitidos &= carga < limite_inferior
+            if not permitidos.any():
+                return None
+
+            j = int(np.argmax(np.where(permitidos, compatibilidade[i], -np.inf)))
+            atribuicao[i, j] = True
+            if carga[j] < limite_inferior:
+                deficit -= 1
+            carga[j] += 1
+            total_restante -= 1
+
+    return atribuicao
+
+
+def repair_lower_bounds(estado):
+    """
+    Completa os projetos abaixo do limite inferior movendo, a cada passo, o aluno de um projeto com
+    folga cuja mudança custa menos. Retorna False se não houver mais de onde tirar alunos.
+    """
+    while True:
+        faltando = np.flatnonzero(estado.carga < estado.limite_inferior)
+        if len(faltando) == 0:
+            return True
+
+        ganho = -estado.troca[:, faltando]
+        ganho[estado.carga <= estado.limite_inferior] = -np.inf
+        j, f = np.unravel_index(np.argmax(ganho), ganho.shape)
+        if not np.isfinite(ganho[j, f]):
+            return False
+
+        alterados = set()
+        estado.move(estado.aluno_troca[j, faltando[f]], j, faltando[f], alterados)
+        estado.carga[j] -= 1
+        estado.carga[faltando[f]] += 1
+        estado.refresh(alterados)
+
+
+def local_search(estado, prazo, on_improvement=None, intervalo=INCUMBENT_INTERVAL):
+    """
+    Melhora a atribuição com movimentos (um aluno muda de projeto) e trocas 2-opt (dois alunos de
+    projetos diferentes trocam de lugar) até não haver melhoria ou o prazo acabar.
+
+    Usa a matriz de trocas do AssignmentState: -troca[j, j2] é o maior ganho ao mover um aluno de j
+    para j2, então a melhor troca entre j e j2 vale -(troca[j, j2] + troca[j2, j]).
+    on_improvement(ganho_total), se informado, é chamado depois de uma melhoria, no máximo uma vez a
+    cada `intervalo` segundos. Retorna o ganho total obtido.
+    """
+    ganho_total = 0.0
+    proximo_aviso = time.perf_counter() + intervalo
+
+    while time.perf_counter() < prazo:
+        ganho = -estado.troca
+
+        # Movimento simples: a origem precisa continuar acima do limite inferior e o destino ter vaga
+        pode_sair = estado.carga > estado.limite_inferior
+        pode_entrar = estado.carga < estado.limite_superior
+        movimentos = np.where(pode_sair[:, None] & pode_entrar[None, :], ganho, -np.inf)
+
+        # Troca 2-opt: as cargas não mudam
+        trocas = ganho + ganho.T
+
+        melhor_movimento = np.unravel_index(np.argmax(movimentos), movimentos.shape)
+        melhor_troca = np.unravel_index(np.argmax(trocas), trocas.shape)
+        if max(movimentos[melhor_movimento], trocas[melhor_troca]) <= EPS:
+            break
+
+        alterados = set()
+        if movimentos[melhor_movimento] >= trocas[melhor_troca]:
+            j, j2 = melhor_movimento
+            ganho_total += movimentos[j, j2]
+            estado.move(estado.aluno_troca[j, j2], j, j2, alterados)
+            estado.carga[j] -= 1
+            estado.carga[j2] += 1
+        else:
+            j, j2 = melhor_troca
+            ganho_total += trocas[j, j2]
+            a, b = estado.aluno_troca[j, j2], estado.aluno_troca[j2, j]
+            estado.move(a, j, j2, alterados)
+            estado.move(b, j2, j, alterados)
+        estado.refresh(alterados)
+
+        if on_improvement is not None and time.perf_counter() >= proximo_aviso:
+            on_improvement(ganho_total)
+            proximo_aviso = time.perf_counter() + intervalo
+
+    return ganho_total
+
+
+def solve_heuristic(
+    compatibilidade, restantes, fixados, limite_inferior, limite_superior, time_limit=5.0, on_incumbent=None
+):
+    """
+    Resolve a alocação de forma aproximada dentro de um orçamento de tempo (em segundos).
+
+    Parte de uma atribuição gulosa, completa os limites inferiores e a melhora por busca local enquanto
+    houver tempo. Se não conseguir uma atribuição viável assim, usa o fluxo de custo mínimo como ponto
+    de partida, com o tempo que restar do orçamento; se ele acabar antes de o fluxo terminar, levanta
+    ValueError (com time_limit=0, só a gulosa reparada é tentada). O log informa qual caminho foi usado.
+
+    on_incumbent(atribuicao, objetivo, limite_superior), se informado, recebe uma cópia da solução inicial
+    e das que a busca local encontrar (no máximo uma a cada INCUMBENT_INTERVAL segundos); a solução final
+    só vem no retorno.
+
+    Retorna (atribuicao, objetivo, limite_superior_do_objetivo), em que atribuicao é a matriz booleana
+    N x P (incluindo as pré-alocações).
+    """
+    prazo = time.perf_counter() + time_limit
+    limite_inferior, limite_superior = integer_bounds(limite_inferior, limite_superior)
+
+    estado = AssignmentState(-np.asarray(compatibilidade, dtype=np.float64), fixados, limite_inferior, limite_superior)
+
+    atribuicao = greedy_assignment(compatibilidade, restantes, fixados, limite_inferior, limite_superior)
+    if atribuicao is not None:
+        estado.load(atribuicao)
+    if atribuicao is not None and repair_lower_bounds(estado):
+        logger.info("Heurística: partindo da solução gulosa.")
+    else:
+        restante = max(prazo - time.perf_counter(), 0.0)
+        logger.info(
+            "Heurística: a gulosa não é viável; partindo do fluxo de custo mínimo (%.2f s restantes).", restante
+        )
+        estado.load(
+            solve_flow(compatibilidade, restantes, fixados, limite_inferior, limite_superior, time_limit=restante)
+        )
+
+    compatibilidade = np.asarray(compatibilidade, dtype=np.float64)
+    limite = upper_bound(compatibilidade, restantes, fixados)
+    melhoria = None
+    if on_incumbent is not None:
+        inicial = float(compatibilidade[estado.atribuicao].sum())
+        on_incumbent(estado.atribuicao.copy(), inicial, limite)
+        melhoria = lambda ganho: on_incumbent(estado.atribuicao.copy(), float(inicial + ganho), limite)
+
+    local_search(estado, prazo, melhoria)
+
+    objetivo = float(compatibilidade[estado.atribuicao].sum())
+    return estado.atribuicao, objetivo, limite
@@ -0,0 +1,257 @@
+import numpy as np
+import pandas as pd
+
+from core.allocation_solver import COLUNAS_PROJETO, load_window, pinned_pairs, remaining_slots, split_info
+from core.compatibility import aligned_skills
+from core.similarity import compute_similarity, skill_weights
+from core.flow_solver import solve_flow
+
+
+def student_scores(alunos_df, projetos_df, linhas, metric="dot"):
+    """
+    Compatibilidade dos alunos nas posições `linhas` com todos os projetos (matriz len(linhas) x P).
+
+    Calcula só as linhas pedidas, para que avaliar uma edição não custe a matriz inteira.
+    """
+    habilidades = aligned_skills(alunos_df, projetos_df)
+    return compute_similarity(
+        alunos_df.iloc[np.asarray(linhas)][habilidades].to_numpy(),
+        projetos_df[habilidades].to_numpy(),
+        metric,
+        skill_weights(habilidades) if metric == "weighted" else None,
+    ).astype(np.float64)
+
+
+def _write_rows(alunos_info, linhas, colunas, projetos, celulas_fixas):
+    """
+    Reescreve 'Projeto 1'/'Projeto 2' das linhas dadas a partir dos pares (linha, coluna do projeto),
+    mantendo cada célula fixa na coluna em que o usuário a colocou.
+    """
+    por_aluno = pd.Series(colunas).groupby(linhas).agg(list)
+    for i in np.unique(linhas).tolist():
+        valores = {col: alunos_info.iat[i, alunos_info.columns.get_loc(col)] for col in COLUNAS_PROJETO}
+        fixos = {col: valores[col] for col in COLUNAS_PROJETO if (i, col) in celulas_fixas}
+        livres = [projetos[j] for j in por_aluno[i] if projetos[j] not in fixos.values()]
+
+        for col in COLUNAS_PROJETO:
+            if col in fixos:
+                continue
+            alunos_info.iat[i, alunos_info.columns.get_loc(col)] = livres.pop(0) if livres else ""
+
+
+def _project_cells(alunos_info, celulas, coluna_do_projeto):
+    """Só as células (linha, coluna) que contêm um projeto; uma célula apagada não prende nada."""
+    return {(linha, coluna) for linha, coluna in celulas if alunos_info.at[linha, coluna] in coluna_do_projeto}
+
+
+def rebalance_allocation(alunos_df, projetos_df, alunos_info, edicoes, fixas=(), tolerancia=None):
+    """
+    Reequilibra a alocação em torno de edições manuais, sem refazer a alocação inteira.
+
+    - alunos_info: alocação atual, já com as edições aplicadas
+    - edicoes: lista de (linha, coluna, projeto_antigo) das edições desde o último reequilíbrio
+    - fixas: outras células (linha, coluna) editadas manualmente antes, que também ficam fixas
+    - tolerancia: folga da janela de carga; None = a usada na alocação (attrs["tolerancia"], ou 0.2)
+
+    As células editadas viram pré-alocações; uma célula apagada não fica fixa, e o projeto que ela tinha
+    é reposto pelo reequilíbrio. Só os alunos dos projetos afetados (o antigo e o novo de cada edição)
+    voltam ao problema; os demais ficam como estão e a carga deles é descontada da janela de cada
+    projeto. O subproblema é resolvido pelo fluxo de custo mínimo; se ele não tiver solução, o
+    reequilíbrio é feito com todos os alunos.
+
+    Retorna (nova_alocacao, delta_objetivo, alunos_no_subproblema).
+    """
+    projetos = projetos_df.iloc[:, 1].values
+    coluna_do_projeto = {nome: j for j, nome in enumerate(projetos)}
+    n_alunos, n_projetos = len(alunos_info), len(projetos)
+
+    celulas_fixas = _project_cells(
+        alunos_info, set(fixas) | {(linha, coluna) for linha, coluna, _ in edicoes}, coluna_do_projeto
+    )
+
+    # Alocação atual e pré-alocações (as do cadastro de alunos mais as células editadas)
+    linhas, colunas = pinned_pairs(alunos_info, projetos)
+    originais = pinned_pairs(alunos_df, projetos, strict=False)
+    editadas = [(linha, coluna_do_projeto[alunos_info.at[linha, coluna]]) for linha, coluna in celulas_fixas]
+    fixados_linhas = np.concatenate([originais[0], np.array([l for l, _ in editadas], dtype=np.int64)])
+    fixados_colunas = np.concatenate([originais[1], np.array([c for _, c in editadas], dtype=np.int64)])
+    pares_fixos = np.unique(fixados_linhas * n_projetos + fixados_colunas)
+
+    afetados = set()
+    for linha, coluna, antigo in edicoes:
+        for nome in (antigo, alunos_info.at[linha, coluna]):
+            if nome in coluna_do_projeto:
+                afetados.add(coluna_do_projeto[nome])
+
+    vizinhos = np.zeros(n_alunos, dtype=bool)
+    vizinhos[linhas[np.isin(colunas, list(afetados))]] = True
+    vizinhos[[linha for linha, _, _ in edicoes]] = True
+
+    if tolerancia is None:
+        tolerancia = alunos_info.attrs.get("tolerancia", 0.2)
+    limite_inferior, limite_superior = load_window(alunos_info["Projetos Tentados"].to_numpy(), n_projetos, tolerancia)
+    resultado = None
+    for sub in (np.flatnonzero(vizinhos), np.arange(n_alunos)):
+        posicao = np.full(n_alunos, -1, dtype=np.int64)
+        posicao[sub] = np.arange(len(sub))
+
+        # Carga dos alunos fora do subproblema fica fixa e sai da janela de cada projeto
+        fora = posicao[linhas] < 0
+        carga_fora = np.bincount(colunas[fora], minlength=n_projetos)
+
+        dentro = posicao[pares_fixos // n_projetos] >= 0
+        fixados = (posicao[pares_fixos[dentro] // n_projetos], pares_fixos[dentro] % n_projetos)
+        restantes = remaining_slots(alunos_info["Projetos Tentados"].to_numpy()[sub], fixados)
+
+        compatibilidade = student_scores(alunos_df, projetos_df, sub, alunos_info.attrs.get("metrica", "dot"))
+        try:
+            atribuicao = solve_flow(
+                compatibilidade, restantes, fixados, limite_inferior - carga_fora, limite_superior - carga_fora
+            )
+        except ValueError:
+            continue
+
+        antes = posicao[linhas[~fora]], colunas[~fora]
+        delta = float(compatibilidade[atribuicao].sum() - compatibilidade[antes].sum())
+        resultado = sub, atribuicao, delta
+        break
+
+    if resultado is None:
+        raise ValueError("Não foi possível reequilibrar a alocação mantendo as edições manuais.")
+
+    sub, atribuicao, delta = resultado
+    novas_linhas, novas_colunas = np.nonzero(atribuicao)
+
+    nova = alunos_info.copy()
+    _write_rows(nova, sub[novas_linhas], novas_colunas, projetos, celulas_fixas)
+
+    # attrs["objetivo"] é o da última alocação calculada; soma o efeito das edições e do reequilíbrio
+    if "objetivo" in nova.attrs:
+        posicao = {linha: k for k, linha in enumerate(sub.tolist())}
+        primeiro_antigo = {}
+        for linha, coluna, antigo in edicoes:
+            primeiro_antigo.setdefault((linha, coluna), antigo)
+        for (linha, coluna), antigo in primeiro_antigo.items():
+            for nome, sinal in ((alunos_info.at[linha, coluna], 1), (antigo, -1)):
+                if nome in coluna_do_projeto:
+                    nova.attrs["objetivo"] += sinal * float(compatibilidade[posicao[linha], coluna_do_projeto[nome]])
+        nova.attrs["objetivo"] += delta
+        if "limite_superior" in nova.attrs:
+            limite = nova.attrs["limite_superior"]
+            nova.attrs["gap"] = (limite - nova.attrs["objetivo"]) / max(abs(limite), 1.0)
+    return nova, delta, len(sub)
+
+
+def insert_students(alunos_df, projetos_df, alunos_info, novos_df, tolerancia=None, fixas=()):
+    """
+    Insere alunos que chegaram depois da alocação, movendo o mínimo possível dos alunos já alocados.
+
+    - alunos_df / alunos_info: cadastro e alocação atual ('Projeto 1'/'Projeto 2') dos alunos existentes
+    - novos_df: linhas dos novos alunos, no formato do cadastro (podem trazer pré-alocações)
+    - tolerancia: folga da janela de carga, recalculada com os novos alunos; None = a usada na alocação
+      (attrs["tolerancia"], ou 0.2)
+    - fixas: células (linha, coluna) editadas manualmente, que não podem mudar
+
+    Primeiro só os novos alunos são alocados, na folga que cada projeto ainda tem na nova janela. Se não
+    couberem, os alunos dos projetos mais compatíveis com os novos (os top-k de cada um, com k dobrando a
+    cada rodada) e dos projetos abaixo da janela entram no subproblema, que é resolvido pelo fluxo de custo
+    mínimo com um bônus para cada aluno existente que fica onde está: o bônus vale mais do que toda a
+    compatibilidade em jogo, então a solução move o menor número possível de alunos e, entre as que movem
+    esse número, é a mais compatível. A compatibilidade só é calculada para os alunos do subproblema; o
+    resto do trabalho é ler a carga atual dos projetos.
+
+    Retorna (nova_alocacao, alunos_todos, movidos): a alocação com os novos alunos no fim, o cadastro com
+    as linhas novas (na mesma ordem) e quantos alunos existentes mudaram de projeto.
+    """
+    projetos = projetos_df.iloc[:, 1].values
+    coluna_do_projeto = {nome: j for j, nome in enumerate(projetos)}
+    n_existentes, n_projetos = len(alunos_info), len(projetos)
+    metrica = alunos_info.attrs.get("metrica", "dot")
+    if tolerancia is None:
+        tolerancia = alunos_info.attrs.get("tolerancia", 0.2)
+    celulas_fixas = _project_cells(alunos_info, fixas, coluna_do_projeto)
+
+    alunos_todos = pd.concat([alunos_df, novos_df], ignore_index=True)
+    novos_info = split_info(novos_df, projetos_df)[0]
+    nova = pd.concat([alunos_info, novos_info.reindex(columns=alunos_info.columns, fill_value="")], ignore_index=True)
+    nova.attrs = dict(alunos_info.attrs)
+    n_alunos = len(nova)
+    novos = np.arange(n_existentes, n_alunos)
+
+    # Alocação atual e pré-alocações (do cadastro, dos novos alunos e das células editadas)
+    linhas, colunas = pinned_pairs(alunos_info, projetos)
+    originais = pinned_pairs(alunos_todos, projetos, strict=False)
+    editadas = [(linha, coluna_do_projeto[alunos_info.at[linha, coluna]]) for linha, coluna in celulas_fixas]
+    fixados_linhas = np.concatenate([originais[0], np.array([l for l, _ in editadas], dtype=np.int64)])
+    fixados_colunas = np.concatenate([originais[1], np.array([c for _, c in editadas], dtype=np.int64)])
+    pares_fixos = np.unique(fixados_linhas * n_projetos + fixados_colunas)
+
+    projetos_tentados = nova["Projetos Tentados"].to_numpy()
+    limite_inferior, limite_superior = load_window(projetos_tentados, n_projetos, tolerancia)
+    carga = np.bincount(colunas, minlength=n_projetos)
+
+    # Projetos candidatos: os mais compatíveis com os novos alunos e os que ficaram abaixo da janela
+    compatibilidade_novos = student_scores(alunos_todos, projetos_df, novos, metrica)
+    ordem_novos = np.argsort(-compatibilidade_novos, axis=1, kind="stable")
+    abaixo = np.flatnonzero(carga < limite_inferior - 1e-9)
+
+    # Alunos existentes com menos projetos do que tentam (ex.: uma célula apagada) entram em toda rodada
+    incompletos = np.flatnonzero(np.bincount(linhas, minlength=n_existentes) < projetos_tentados[:n_existentes])
+
+    k, resultado = 0, None
+    while resultado is None:
+        if k == 0:
+            existentes = incompletos
+        else:
+            candidatos = np.union1d(np.unique(ordem_novos[:, :k]), abaixo)
+            existentes = np.union1d(np.unique(linhas[np.isin(colunas, candidatos)]), incompletos)
+        sub = np.concatenate([existentes, novos])
+
+        posicao = np.full(n_alunos, -1, dtype=np.int64)
+        posicao[sub] = np.arange(len(sub))
+        fora = posicao[linhas] < 0
+        carga_fora = np.bincount(colunas[fora], minlength=n_projetos)
+
+        dentro = posicao[pares_fixos // n_projetos] >= 0
+        fixados = (posicao[pares_fixos[dentro] // n_projetos], pares_fixos[dentro] % n_projetos)
+        restantes = remaining_slots(projetos_tentados[sub], fixados)
+
+        existentes = sub[sub < n_existentes]
+        compatibilidade = np.concatenate(
+            [student_scores(alunos_todos, projetos_df, existentes, metrica), compatibilidade_novos]
+        )
+        antes = posicao[linhas[~fora]], colunas[~fora]
+
+        # Bônus por par mantido maior do que a compatibilidade de todos os pares do subproblema juntos
+        amplitude = float(compatibilidade.max(initial=0) - min(compatibilidade.min(initial=0), 0))
+        bonus = (amplitude + 1) * (int(projetos_tentados[sub].sum()) + 1)
+        custos = compatibilidade.astype(np.float64)
+        custos[antes] += bonus
+        try:
+            atribuicao = solve_flow(
+                custos, restantes, fixados, limite_inferior - carga_fora, limite_superior - carga_fora
+            )
+            resultado = sub, atribuicao, compatibilidade, antes
+        except ValueError:
+            if k >= n_projetos:
+                raise ValueError("Não foi possível inserir os novos alunos respeitando a janela de carga.")
+            k = min(max(2 * k, 2), n_projetos)
+
+    sub, atribuicao, compatibilidade, antes = resultado
+    mantidos = np.zeros(atribuicao.shape, dtype=bool)
+    mantidos[antes] = True
+    # Movido é quem perdeu algum projeto que tinha; completar um aluno incompleto não conta
+    movidos = int((mantidos & ~atribuicao).any(axis=1).sum())
+
+    novas_linhas, novas_colunas = np.nonzero(atribuicao)
+    _write_rows(nova, sub[novas_linhas], novas_colunas, projetos, celulas_fixas)
+
+    if "objetivo" in nova.attrs:
+        delta = float(compatibilidade[atribuicao].sum(dtype=np.float64) - compatibilidade[antes].sum(dtype=np.float64))
+        nova.attrs["objetivo"] += delta
+        if "limite_superior" in nova.attrs:
+            # O limite anterior não vale para a turma maior; ao menos não fica abaixo do novo objetivo
+            nova.attrs["limite_superior"] = max(nova.attrs["limite_superior"] + delta, nova.attrs["objetivo"])
+            limite = nova.attrs["limite_superior"]
+            nova.attrs["gap"] = (limite - nova.attrs["objetivo"]) / max(abs(limite), 1.0)
+    return nova, alunos_todos, movidos
@@ -0,0 +1,215 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from core.allocation_solver import COLUNAS_PROJETO, pinned_pairs, solve_allocation, split_info
+from core.report import RunReport
+from utils.config import SolverConfig
+
+# Partições conhecidas: (coluna dos alunos, coluna dos projetos) cujos valores iguais formam um grupo.
+# "presencial": quem pode comparecer fica com os projetos presenciais e quem não pode, com os remotos.
+PARTICOES = {
+    "presencial": ("Pode Comparecer", "Presencial"),
+    "curso": ("Curso", "Curso"),
+}
+
+# O que muda no modelo ao particionar; vai para o relatório e para os attrs de toda alocação particionada
+RESTRICAO_PARTICAO = (
+    "cada aluno só recebe projetos do próprio grupo e a janela de carga é calculada dentro do grupo; "
+    "o objetivo pode ficar abaixo do da alocação sem partição"
+)
+
+
+def partition_labels(alunos_df, projetos_df, particao):
+    """
+    Rótulos de grupo (rotulos_alunos, rotulos_projetos), dois arrays; alunos e projetos com o mesmo
+    rótulo formam um subproblema.
+
+    particao pode ser:
+    - um nome de PARTICOES ("presencial", "curso")
+    - uma tupla (coluna dos alunos, coluna dos projetos)
+    - uma tupla de arrays (rótulos dos alunos, rótulos dos projetos)
+
+    Não há escolha automática: a partição restringe o modelo, então precisa ser pedida pelo nome.
+    """
+    if isinstance(particao, str):
+        if particao not in PARTICOES:
+            raise ValueError(f"Partição desconhecida: '{particao}'. Use uma de: {', '.join(PARTICOES)}.")
+        particao = PARTICOES[particao]
+
+    rotulos_alunos, rotulos_projetos = particao
+    if isinstance(rotulos_alunos, str):
+        for coluna, df, nome in ((rotulos_alunos, alunos_df, "alunos"), (rotulos_projetos, projetos_df, "projetos")):
+            if coluna not in df.columns:
+                raise ValueError(f"A coluna '{coluna}' usada na partição não existe no arquivo de {nome}.")
+        rotulos_alunos, rotulos_projetos = alunos_df[rotulos_alunos], projetos_df[rotulos_projetos]
+
+    rotulos_alunos = np.asarray(rotulos_alunos, dtype=object)
+    rotulos_projetos = np.asarray(rotulos_projetos, dtype=object)
+    if len(rotulos_alunos) != len(alunos_df) or len(rotulos_projetos) != len(projetos_df):
+        raise ValueError("A partição precisa de um rótulo para cada aluno e para cada projeto.")
+    return rotulos_alunos, rotulos_projetos
+
+
+def partition_description(particao):
+    """Descrição da partição para o relatório, ex.: "presencial ('Pode Comparecer' = 'Presencial')"."""
+    if isinstance(particao, str):
+        return f"{particao} ('{PARTICOES[particao][0]}' = '{PARTICOES[particao][1]}')"
+    if isinstance(particao[0], str):
+        return f"'{particao[0]}' = '{particao[1]}'"
+    return "rótulos informados"
+
+
+def _solve_part(alunos_df, projetos_df, opcoes):
+    """Resolve um subproblema (no processo do pool ou no atual)."""
+    inicio = time.perf_counter()
+    resultado, atribuicao = solve_allocation(alunos_df, projetos_df, return_assignment=True, **opcoes)
+    return resultado, atribuicao, time.perf_counter() - inicio
+
+
+def solve_partitioned(
+    alunos_df,
+    projetos_df,
+    particao,
+    progress=None,
+    report=None,
+    return_assignment=False,
+    comparar=False,
+    max_workers=None,
+    compatibility=None,
+    **opcoes,
+):
+    """
+    Resolve a alocação separadamente em cada grupo da partição (ver partition_labels), em paralelo.
+
+    Cada grupo é um problema independente: seus alunos só recebem projetos do próprio grupo e a janela
+    de carga é calculada dentro do grupo (a média de alunos por projeto do grupo, com a mesma tolerância).
+    Os subproblemas são resolvidos em um pool de processos, um por núcleo, e os resultados são juntados em
+    um único alunos_info, na ordem de alunos_df.
+
+    opcoes são repassadas a solve_allocation (engine, solver_config, metric, tolerancia, fixar, pesos);
+    sem solver_config, cada subproblema usa uma thread e nenhum log. Com um único grupo, a alocação é
+    resolvida inteira, como em solve_allocation.
+
+    O modelo particionado não é o da alocação inteira: attrs["particao"] descreve a partição usada e
+    attrs["restricao_particao"] (RESTRICAO_PARTICAO) diz o que mudou; os dois também vão para o relatório,
+    mesmo sem comparar. Com comparar=True, a alocação inteira também é resolvida e attrs traz
+    "objetivo_monolitico" e "perda_particao" (quanto do objetivo se perde ao separar os grupos).
+    attrs["particoes"] lista, por grupo, o número de alunos e projetos, o objetivo, o gap e o tempo.
+    """
+    rotulos_alunos, rotulos_projetos = partition_labels(alunos_df, projetos_df, particao)
+    grupos = list(pd.unique(rotulos_alunos))
+
+    sem_projetos = [g for g in grupos if not (rotulos_projetos == g).any()]
+    if sem_projetos:
+        raise ValueError(f"Nenhum projeto para os alunos do grupo {', '.join(map(str, sem_projetos))} da partição.")
+    sem_alunos = sorted(set(rotulos_projetos) - set(grupos), key=str)
+    if sem_alunos:
+        raise ValueError(f"Nenhum aluno para os projetos do grupo {', '.join(map(str, sem_alunos))} da partição.")
+
+    if report is None:
+        report = RunReport()
+    descricao = partition_description(particao)
+    report.record(particao=descricao, restricao_particao=RESTRICAO_PARTICAO)
+
+    if len(grupos) <= 1:
+        resultado = solve_allocation(
+            alunos_df,
+            projetos_df,
+            progress=progress,
+            report=report,
+            return_assignment=return_assignment,
+            compatibility=compatibility,
+            **opcoes,
+        )
+        alunos_info = resultado[0] if return_assignment else resultado
+        alunos_info.attrs["particao"] = descricao
+        alunos_info.attrs["restricao_particao"] = RESTRICAO_PARTICAO
+        return resultado
+
+    if progress is None:
+        progress = lambda fase: None
+    if opcoes.get("solver_config") is None:
+        opcoes["solver_config"] = SolverConfig(threads=1, msg=False)
+
+    with report.phase("preprocessamento"):
+        progress("preprocessamento")
+        alunos_info, projetos_info = split_info(alunos_df, projetos_df)
+        projetos = projetos_info.iloc[:, 1].values
+
+        if opcoes.get("fixar", True):
+            linhas, colunas = pinned_pairs(alunos_info, projetos)
+            fora = np.flatnonzero(rotulos_alunos[linhas] != rotulos_projetos[colunas])
+            if len(fora):
+                k = fora[0]
+                raise ValueError(
+                    f"O aluno {alunos_info.index[linhas[k]]} está pré-alocado ao projeto '{projetos[colunas[k]]}', "
+                    f"que fica em outro grupo da partição."
+                )
+
+        indices = [(np.flatnonzero(rotulos_alunos == g), np.flatnonzero(rotulos_projetos == g)) for g in grupos]
+
+    with report.phase("resolucao"):
+        progress("resolucao")
+        tarefas = [(alunos_df.iloc[ia], projetos_df.iloc[ip], opcoes) for ia, ip in indices]
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+        max_workers = max(1, min(max_workers, len(tarefas)))
+        if max_workers == 1:
+            resultados = [_solve_part(*tarefa) for tarefa in tarefas]
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+                resultados = list(pool.map(_solve_part, *zip(*tarefas)))
+
+    with report.phase("extracao"):
+        progress("extracao")
+        atribuicao = np.zeros((len(alunos_df), len(projetos_df)), dtype=bool)
+        valores = {col: np.full(len(alunos_df), "", dtype=object) for col in COLUNAS_PROJETO}
+        particoes = []
+        for grupo, (ia, ip), (resultado, parte, segundos) in zip(grupos, indices, resultados):
+            atribuicao[np.ix_(ia, ip)] = parte
+            for col in COLUNAS_PROJETO:
+                valores[col][ia] = resultado[col].to_numpy(dtype=object)
+            particoes.append({
+                "grupo": grupo,
+                "alunos": len(ia),
+                "projetos": len(ip),
+                "objetivo": resultado.attrs["objetivo"],
+                "gap": resultado.attrs["gap"],
+                "segundos": round(segundos, 4),
+            })
+        for col in COLUNAS_PROJETO:
+            alunos_info[col] = valores[col]
+
+    objetivo = sum(resultado.attrs["objetivo"] for resultado, _, _ in resultados)
+    limite = sum(resultado.attrs["limite_superior"] for resultado, _, _ in resultados)
+    alunos_info.attrs["metrica"] = opcoes.get("metric", "dot")
+    alunos_info.attrs["tolerancia"] = opcoes.get("tolerancia", 0.2)
+    alunos_info.attrs["objetivo"] = objetivo
+    alunos_info.attrs["limite_superior"] = limite
+    alunos_info.attrs["gap"] = (limite - objetivo) / max(abs(limite), 1.0)
+    alunos_info.attrs["particoes"] = particoes
+    alunos_info.attrs["particao"] = descricao
+    alunos_info.attrs["restricao_particao"] = RESTRICAO_PARTICAO
+    report.record(particoes=len(grupos), objetivo=objetivo, limite_superior=limite)
+
+    if comparar:
+        with report.phase("monolitico"):
+            monolitico = solve_allocation(alunos_df, projetos_df, compatibility=compatibility, **opcoes)
+        alunos_info.attrs["objetivo_monolitico"] = monolitico.attrs["objetivo"]
+        alunos_info.attrs["perda_particao"] = monolitico.attrs["objetivo"] - objetivo
+        report.record(
+            objetivo_monolitico=monolitico.attrs["objetivo"], perda_particao=alunos_info.attrs["perda_particao"]
+        )
+
+    report.dados["cargas"] = dict(zip(map(str, projetos), atribuicao.sum(axis=0).tolist()))
+    report.dados["detalhe_particoes"] = particoes
+    alunos_info.attrs["relatorio"] = report.to_dict()
+
+    if return_assignment:
+        return alunos_info, atribuicao
+    return alunos_info
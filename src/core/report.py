@@ -0,0 +1,120 @@
+import json
+import logging
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import numpy as np
+
+from utils.config import LOG_LEVEL
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = logging.getLogger("alocacao")
+
+
+def setup_logging(level=LOG_LEVEL):
+    """Configura o logger raiz da aplicação (formato e nível); pode ser chamada mais de uma vez."""
+    logging.basicConfig(format="%(asctime)s %(name)s %(levelname)s: %(message)s", level=level, force=True)
+
+
+def _peak_rss_mb():
+    """Pico de memória residente do processo até agora, em MB (None se o sistema não informar)."""
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS informa em bytes; Linux e os BSDs, em KB
+    return round(pico / (2**20 if sys.platform == "darwin" else 2**10), 1)
+
+
+def save_report(relatorio, caminho):
+    """Grava em JSON um relatório (dict, como o de alunos_info.attrs["relatorio"])."""
+    with open(caminho, "w", encoding="utf-8") as arquivo:
+        json.dump(relatorio, arquivo, ensure_ascii=False, indent=2, default=str)
+
+
+def top_matches(compatibilidade, linhas, colunas, projetos, k=3):
+    """
+    Diagnóstico por aluno: os k projetos mais compatíveis (com a pontuação) e os projetos alocados.
+
+    Usa argpartition na matriz inteira, sem ordenar a linha de cada aluno em Python. linhas/colunas são
+    os pares alocados, em ordem aluno-major. Retorna uma lista de dicts, um por aluno.
+    """
+    n_alunos, n_projetos = compatibilidade.shape
+    k = min(k, n_projetos)
+    if n_alunos == 0 or k == 0:
+        return []
+
+    melhores = np.argpartition(-compatibilidade, k - 1, axis=1)[:, :k]
+    pontuacoes = np.take_along_axis(compatibilidade, melhores, axis=1)
+    ordem = np.argsort(-pontuacoes, axis=1, kind="stable")
+    melhores = np.take_along_axis(melhores, ordem, axis=1)
+    pontuacoes = np.take_along_axis(pontuacoes, ordem, axis=1)
+
+    projetos = np.asarray(projetos, dtype=object)
+    alocados = np.split(projetos[colunas], np.searchsorted(linhas, np.arange(1, n_alunos)))
+    return [
+        {"top": list(zip(nomes, valores)), "alocados": list(aloc)}
+        for nomes, valores, aloc in zip(
+            projetos[melhores].tolist(), np.round(pontuacoes.astype(np.float64), 2).tolist(), alocados
+        )
+    ]
+
+
+class RunReport:
+    """
+    Relatório de uma execução de solve_allocation: tempo e memória de cada fase, tamanho do modelo e
+    situação do solver.
+
+    - rastrear_memoria: mede com tracemalloc o pico de memória alocada em cada fase (deixa a execução
+      mais lenta); sem ele só o pico de memória residente do processo é registrado
+    - top_k_diagnostico: se maior que zero, guarda para cada aluno os top_k_diagnostico projetos mais
+      compatíveis e os alocados (ver top_matches)
+
+    Cada fase também é registrada no logger "alocacao" (nível INFO); o relatório inteiro pode ser salvo em
+    JSON com save().
+    """
+
+    def __init__(self, rastrear_memoria=False, top_k_diagnostico=0):
+        self.rastrear_memoria = rastrear_memoria
+        self.top_k_diagnostico = top_k_diagnostico
+        self.fases = []
+        self.dados = {}
+
+    @contextmanager
+    def phase(self, nome):
+        """Mede o bloco como a fase `nome`."""
+        rastreando = self.rastrear_memoria and not tracemalloc.is_tracing()
+        if rastreando:
+            tracemalloc.start()
+        elif self.rastrear_memoria:
+            tracemalloc.reset_peak()
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            fase = {"nome": nome, "segundos": round(time.perf_counter() - inicio, 4)}
+            if self.rastrear_memoria:
+                fase["pico_alocado_mb"] = round(tracemalloc.get_traced_memory()[1] / 2**20, 1)
+                if rastreando:
+                    tracemalloc.stop()
+            fase["pico_rss_mb"] = _peak_rss_mb()
+            self.fases.append(fase)
+            logger.info("Fase %s: %.3f s, pico RSS %s MB", nome, fase["segundos"], fase["pico_rss_mb"])
+
+    def record(self, **dados):
+        """Acrescenta informações ao relatório (tamanho do modelo, situação do solver, objetivo, ...)."""
+        self.dados.update(dados)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(", ".join(f"{chave}={valor}" for chave, valor in dados.items()))
+
+    def to_dict(self):
+        return {"fases": list(self.fases), **self.dados}
+
+    def save(self, caminho):
+        """Grava o relatório em JSON."""
+        save_report(self.to_dict(), caminho)
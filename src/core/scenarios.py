@@ -0,0 +1,136 @@
+import itertools
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from core.allocation_solver import solve_allocation
+from core.compatibility import CompatibilityMatrix
+from utils.config import SolverConfig
+
+# Parâmetros que um cenário pode variar, com o valor usado quando o cenário não os informa
+PARAMETROS_CENARIO = {"tolerancia": 0.2, "metrica": "dot", "pesos": None, "fixar": True}
+
+# Colunas de resultado da tabela de comparação, depois das dos parâmetros
+COLUNAS_RESULTADO = ["objetivo", "gap", "carga_min", "carga_max", "desvio_carga", "segundos", "erro"]
+
+# Estado de cada processo do pool, preenchido uma vez por _init_worker
+_compartilhado = {}
+
+
+def _check_parameters(nomes):
+    desconhecidos = set(nomes) - set(PARAMETROS_CENARIO)
+    if desconhecidos:
+        raise ValueError(
+            f"Parâmetro(s) de cenário desconhecido(s): {', '.join(sorted(desconhecidos))}. "
+            f"Use: {', '.join(PARAMETROS_CENARIO)}."
+        )
+
+
+def scenario_grid(**valores):
+    """
+    Produto cartesiano dos valores de cada parâmetro, como lista de cenários (dicts).
+
+    Ex.: scenario_grid(tolerancia=[0.1, 0.2], fixar=[True, False]) gera 4 cenários. Os parâmetros aceitos
+    estão em PARAMETROS_CENARIO.
+    """
+    _check_parameters(valores)
+    nomes = list(valores)
+    return [dict(zip(nomes, combinacao)) for combinacao in itertools.product(*(valores[nome] for nome in nomes))]
+
+
+def _matrix_key(cenario):
+    """Cenários com a mesma chave usam a mesma matriz de compatibilidade."""
+    pesos = cenario["pesos"] if cenario["metrica"] == "weighted" else None
+    return cenario["metrica"], tuple(sorted(pesos.items())) if pesos else None
+
+
+def _init_worker(alunos_df, projetos_df, matrizes):
+    """Recebe os dados e as matrizes já calculadas uma vez por processo, e não a cada cenário."""
+    _compartilhado.update(alunos=alunos_df, projetos=projetos_df, matrizes=matrizes)
+
+
+def _solve_scenario(cenario, engine, solver_config):
+    """Resolve um cenário no processo do pool e devolve a linha da tabela de comparação."""
+    linha = {nome: cenario[nome] for nome in PARAMETROS_CENARIO}
+    inicio = time.perf_counter()
+    try:
+        resultado, atribuicao = solve_allocation(
+            _compartilhado["alunos"],
+            _compartilhado["projetos"],
+            engine=engine,
+            solver_config=solver_config,
+            compatibility=_compartilhado["matrizes"][_matrix_key(cenario)],
+            metric=cenario["metrica"],
+            return_assignment=True,
+            tolerancia=cenario["tolerancia"],
+            fixar=cenario["fixar"],
+            pesos=cenario["pesos"],
+        )
+    except ValueError as e:
+        linha.update(segundos=round(time.perf_counter() - inicio, 4), erro=str(e))
+        return linha
+
+    cargas = atribuicao.sum(axis=0) if atribuicao.size else np.zeros(1, dtype=np.int64)
+    linha.update(
+        objetivo=resultado.attrs["objetivo"],
+        gap=resultado.attrs["gap"],
+        carga_min=int(cargas.min()),
+        carga_max=int(cargas.max()),
+        desvio_carga=float(cargas.std()),
+        segundos=round(time.perf_counter() - inicio, 4),
+        erro="",
+    )
+    return linha
+
+
+def run_scenarios(alunos_df, projetos_df, cenarios, engine="flow", solver_config=None, max_workers=None):
+    """
+    Resolve vários cenários da alocação em paralelo e devolve uma tabela de comparação.
+
+    - cenarios: lista de dicts com alguns dos parâmetros de PARAMETROS_CENARIO (ver scenario_grid);
+      os que faltarem usam o valor padrão
+    - engine / solver_config: como em solve_allocation; por padrão o fluxo, exato e sem solver externo
+    - max_workers: número de processos (padrão: um por CPU, no máximo um por cenário)
+
+    Cada matriz de compatibilidade distinta (métrica e pesos) é calculada uma única vez aqui e enviada,
+    junto com os DataFrames, a cada processo do pool pelo inicializador. Cenários inviáveis (ex.: uma
+    tolerância apertada demais) não interrompem os demais: a linha deles traz a mensagem em "erro".
+
+    Retorna um DataFrame com uma linha por cenário, na ordem dada: os parâmetros, objetivo, gap,
+    carga_min, carga_max e desvio_carga (alunos por projeto), segundos e erro.
+    """
+    if solver_config is None:
+        # Vários solvers ao mesmo tempo: uma thread e sem log para cada um
+        solver_config = SolverConfig(threads=1, msg=False)
+
+    for cenario in cenarios:
+        _check_parameters(cenario)
+    cenarios = [{**PARAMETROS_CENARIO, **cenario} for cenario in cenarios]
+
+    matrizes = {}
+    for cenario in cenarios:
+        chave = _matrix_key(cenario)
+        if chave not in matrizes:
+            matrizes[chave] = CompatibilityMatrix()
+            matrizes[chave].refresh(alunos_df, projetos_df, cenario["metrica"], cenario["pesos"])
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    max_workers = max(1, min(max_workers, len(cenarios)))
+
+    # "spawn", como o processo da alocação na interface: não herda threads do Qt nem do solver
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(alunos_df, projetos_df, matrizes),
+    ) as pool:
+        linhas = list(pool.map(_solve_scenario, cenarios, itertools.repeat(engine), itertools.repeat(solver_config)))
+
+    tabela = pd.DataFrame(linhas, columns=list(PARAMETROS_CENARIO) + COLUNAS_RESULTADO)
+    tabela["pesos"] = tabela["pesos"].map(lambda pesos: "" if pesos is None else str(pesos))
+    return tabela
@@ -0,0 +1,84 @@
+import numpy as np
+
+from utils.config import PESOS_HABILIDADES, SIMILARITY_MEMORY_LIMIT
+
+# Métricas aceitas por compute_similarity (e pelo parâmetro metric de solve_allocation)
+METRICAS = ("dot", "cosine", "weighted", "coverage")
+
+
+def skill_weights(habilidades, pesos=None):
+    """Vetor de importância das habilidades, na ordem dada; pesos é um dict nome -> peso (padrão: PESOS_HABILIDADES)."""
+    if pesos is None:
+        pesos = PESOS_HABILIDADES
+    return np.array([pesos.get(habilidade, 1.0) for habilidade in habilidades], dtype=np.float32)
+
+
+def _normalize_rows(matriz):
+    """Divide cada linha pela sua norma; linhas nulas continuam nulas."""
+    normas = np.linalg.norm(matriz, axis=1, keepdims=True)
+    return np.divide(matriz, normas, out=np.zeros_like(matriz), where=normas > 0)
+
+
+def _level_features(matriz, niveis):
+    """
+    Indicadores [nível >= t] de cada habilidade, um bloco de colunas por nível t.
+
+    Para valores não negativos, min(a, b) = soma sobre os níveis t de (t - t_anterior) * [a >= t] * [b >= t];
+    assim a soma dos mínimos entre dois vetores vira um produto de matrizes.
+    """
+    return np.concatenate([(matriz >= t).astype(np.float32) for t in niveis], axis=1)
+
+
+def compute_similarity(alunos, projetos, metric="dot", pesos=None, memoria_max=SIMILARITY_MEMORY_LIMIT):
+    """
+    Matriz N x P (float32) de similaridade entre as habilidades dos alunos (N x H) e as dos projetos (P x H).
+
+    Métricas:
+    - "dot": produto escalar (a pontuação original)
+    - "cosine": produto escalar dos vetores normalizados; não favorece quem só tem níveis altos em tudo
+    - "weighted": produto escalar com a importância de cada habilidade (pesos, vetor de tamanho H)
+    - "coverage": fração dos níveis pedidos pelo projeto que o aluno atende, soma(min(a, b)) / soma(b);
+      faltar 3 níveis numa habilidade pesa 3 vezes mais que faltar 1, e sobrar nível não compensa falta
+
+    Os alunos são processados em blocos para que os temporários de cada bloco fiquem abaixo de
+    memoria_max bytes; só a matriz de saída ocupa N x P.
+    """
+    if metric not in METRICAS:
+        raise ValueError(f"Métrica de similaridade desconhecida: '{metric}'. Use uma de: {', '.join(METRICAS)}.")
+
+    alunos = np.asarray(alunos, dtype=np.float32)
+    projetos = np.asarray(projetos, dtype=np.float32)
+    n_alunos, n_projetos = len(alunos), len(projetos)
+    resultado = np.empty((n_alunos, n_projetos), dtype=np.float32)
+    if n_alunos == 0 or n_projetos == 0:
+        return resultado
+
+    # Lado dos projetos, preparado uma vez
+    if metric == "dot":
+        direita = projetos.T
+    elif metric == "weighted":
+        direita = (projetos * (np.ones(projetos.shape[1], np.float32) if pesos is None else pesos)).T
+    elif metric == "cosine":
+        direita = _normalize_rows(projetos).T
+    else:
+        niveis = np.unique(np.concatenate([alunos[alunos > 0], projetos[projetos > 0]]))
+        incrementos = np.diff(niveis, prepend=np.float32(0)).astype(np.float32)
+        direita = _level_features(projetos, niveis).T
+        pedido = projetos.sum(axis=1)
+
+    largura = direita.shape[0]
+    bloco = max(1, int(memoria_max // (4 * (n_projetos + largura))))
+
+    for inicio in range(0, n_alunos, bloco):
+        parte = alunos[inicio:inicio + bloco]
+        if metric == "cosine":
+            parte = _normalize_rows(parte)
+        elif metric == "coverage":
+            parte = _level_features(parte, niveis) * np.repeat(incrementos, alunos.shape[1])
+        np.matmul(parte, direita, out=resultado[inicio:inicio + bloco])
+
+    if metric == "coverage":
+        # Projeto que não pede nada é atendido por qualquer aluno
+        np.divide(resultado, pedido, out=resultado, where=pedido > 0)
+        resultado[:, pedido <= 0] = 1.0
+    return resultado
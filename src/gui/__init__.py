@@ -1,16 +1,28 @@
 # src/gui/__init__.py
 
-from .menu_window import MenuWindow
-from .alunos_window import AlunosWindow
-from .projetos_window import ProjetosWindow
-from .alocacao_window import AlocacaoWindow
-from .base_data_window import BaseDataWindow
+import importlib
+
+# Cada janela é importada só no primeiro acesso (from gui import X), para que abrir o menu não carregue
+# as outras telas nem o que elas importam
+_MODULOS = {
+    "MenuWindow": ".menu_window",
+    "AlunosWindow": ".alunos_window",
+    "ProjetosWindow": ".projetos_window",
+    "AlocacaoWindow": ".alocacao_window",
+    "BaseDataWindow": ".base_data_window",
+}
 
 # Defina __all__ para controle explícito do que é exportado
-__all__ = [
-    "MenuWindow",
-    "AlunosWindow",
-    "ProjetosWindow",
-    "AlocacaoWindow",
-    "BaseDataWindow",
-]
+__all__ = list(_MODULOS)
+
+
+def __getattr__(nome):
+    if nome not in _MODULOS:
+        raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
+    valor = getattr(importlib.import_module(_MODULOS[nome], __name__), nome)
+    globals()[nome] = valor
+    return valor
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
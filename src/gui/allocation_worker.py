@@ -0,0 +1,107 @@
+import multiprocessing
+import os
+import queue
+import signal
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from core.allocation_process import allocation_process_main, sends_partials
+from core.allocation_solver import FASES
+
+
+class AllocationWorker(QThread):
+    """
+    Executa solve_allocation em um processo separado e repassa o progresso para a interface.
+
+    O QThread só acompanha a fila de mensagens do processo; o cálculo em si não disputa o GIL com a
+    interface, e cancel() encerra o processo inteiro (inclusive o CBC). As soluções intermediárias chegam
+    por `parcial`; accept() encerra o processo e entrega a última delas como resultado.
+    """
+    fase_iniciada = pyqtSignal(str, int)  # nome da fase, percentual aproximado
+    parcial = pyqtSignal(object)  # alunos_info de uma solução intermediária
+    matriz_atualizada = pyqtSignal(object)  # CompatibilityMatrix atualizada pelo processo
+    concluido = pyqtSignal(object)  # alunos_info
+    falhou = pyqtSignal(str)
+    cancelado = pyqtSignal()
+
+    def __init__(self, alunos_df, projetos_df, opcoes=None, parent=None):
+        super().__init__(parent)
+        self.alunos_df = alunos_df
+        self.projetos_df = projetos_df
+        self.opcoes = opcoes or {}
+        self.processo = None
+        self.ultima_parcial = None
+        self._cancelar = False
+        self._aceitar = False
+
+    def run(self):
+        contexto = multiprocessing.get_context("spawn")
+        fila = contexto.Queue()
+        self.processo = contexto.Process(
+            target=allocation_process_main,
+            args=(fila, self.alunos_df, self.projetos_df, self.opcoes),
+            daemon=True,
+        )
+        self.processo.start()
+
+        while True:
+            if self._cancelar:
+                self._kill()
+                self.cancelado.emit()
+                return
+            if self._aceitar and self.ultima_parcial is not None:
+                self._kill()
+                self.concluido.emit(self.ultima_parcial)
+                return
+
+            try:
+                tipo, valor = fila.get(timeout=0.1)
+            except queue.Empty:
+                if self.processo.is_alive():
+                    continue
+                # O processo pode ter enviado o resultado e terminado logo depois do timeout
+                try:
+                    tipo, valor = fila.get_nowait()
+                except queue.Empty:
+                    self.falhou.emit("O processo de alocação terminou inesperadamente.")
+                    return
+
+            if tipo == "fase":
+                self.fase_iniciada.emit(valor, int(100 * FASES.index(valor) / len(FASES)))
+            elif tipo == "matriz":
+                self.matriz_atualizada.emit(valor)
+            elif tipo == "parcial":
+                self.ultima_parcial = valor
+                self.parcial.emit(valor)
+            elif tipo == "resultado":
+                self.processo.join()
+                self.concluido.emit(valor)
+                return
+            else:
+                self.processo.join()
+                self.falhou.emit(valor)
+                return
+
+    @property
+    def envia_parciais(self):
+        """Se a execução envia soluções intermediárias (ver core.allocation_process.sends_partials)."""
+        return sends_partials(self.opcoes)
+
+    def cancel(self):
+        """Pede o cancelamento; o processo é encerrado pela thread de acompanhamento."""
+        self._cancelar = True
+
+    def accept(self):
+        """Pede para encerrar o processo e usar a última solução intermediária recebida."""
+        self._aceitar = True
+
+    def _kill(self):
+        if self.processo is None or not self.processo.is_alive():
+            return
+        try:
+            # O filho chamou setsid(), então o grupo dele contém também o solver
+            os.killpg(self.processo.pid, signal.SIGKILL)
+        except (AttributeError, ProcessLookupError, PermissionError):
+            # Windows, ou o filho ainda não criou o próprio grupo
+            self.processo.terminate()
+        self.processo.join()
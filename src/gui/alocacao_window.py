@@ -1,9 +1,37 @@
+import pandas as pd
 from PyQt5.QtWidgets import (
-    QWidget, QVBoxLayout, QPushButton, QTableWidget, QTableWidgetItem, QComboBox,
-    QMessageBox, QFileDialog
+    QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QTableView, QMessageBox, QFileDialog, QLabel, QProgressBar,
+    QComboBox, QCheckBox, QDoubleSpinBox
 )
 from PyQt5.QtCore import Qt
-from core.allocation_solver import solve_allocation
+from core.export import export_allocation, write_table
+from core.incremental import insert_students, rebalance_allocation, student_scores
+from core.report import save_report
+from core.similarity import METRICAS
+from utils.config import HEURISTIC_TIME_LIMIT, SOLVER_BACKENDS, SolverConfig
+from utils.file_manager import load_alunos_csv
+from .allocation_worker import AllocationWorker
+from .export_worker import ExportWorker
+from .dataframe_model import DataFrameModel, ProjetoComboDelegate
+
+# Colunas ajustáveis manualmente na tabela de resultados
+COLUNAS_EDITAVEIS = ["Grupo", "Projeto", "Projeto 1", "Projeto 2"]
+
+# Engines de solve_allocation oferecidas na tela
+NOMES_ENGINES = {
+    "milp": "MILP (ótimo)",
+    "heuristic": "Heurística (tempo limitado)",
+    "flow": "Fluxo de custo mínimo (ótimo)",
+}
+
+# Texto exibido para cada fase de solve_allocation
+NOMES_FASES = {
+    "preprocessamento": "Pré-processando dados...",
+    "matriz": "Calculando compatibilidades...",
+    "modelo": "Montando o modelo...",
+    "resolucao": "Resolvendo...",
+    "extracao": "Extraindo a solução...",
+}
 
 
 class AlocacaoWindow(QWidget):
@@ -17,30 +45,137 @@ class AlocacaoWindow(QWidget):
         self.layout = QVBoxLayout()
         self.setLayout(self.layout)
 
+        # Métrica de compatibilidade usada na alocação
+        metrica_layout = QHBoxLayout()
+        metrica_layout.addWidget(QLabel("Métrica de compatibilidade:"))
+        self.metric_combo = QComboBox()
+        self.metric_combo.addItems(METRICAS)
+        metrica_layout.addWidget(self.metric_combo)
+        self.layout.addLayout(metrica_layout)
+
+        # Método de resolução, solver do MILP, tempo limite e soluções intermediárias
+        engine_layout = QHBoxLayout()
+        engine_layout.addWidget(QLabel("Método:"))
+        self.engine_combo = QComboBox()
+        for engine, nome in NOMES_ENGINES.items():
+            self.engine_combo.addItem(nome, engine)
+        self.engine_combo.currentIndexChanged.connect(self.update_engine_options)
+        engine_layout.addWidget(self.engine_combo)
+
+        engine_layout.addWidget(QLabel("Solver:"))
+        self.backend_combo = QComboBox()
+        self.backend_combo.addItems(SOLVER_BACKENDS)
+        engine_layout.addWidget(self.backend_combo)
+
+        engine_layout.addWidget(QLabel("Tempo limite:"))
+        self.time_limit_spin = QDoubleSpinBox()
+        self.time_limit_spin.setRange(0, 24 * 3600)
+        self.time_limit_spin.setDecimals(1)
+        self.time_limit_spin.setSuffix(" s")
+        engine_layout.addWidget(self.time_limit_spin)
+
+        self.partials_check = QCheckBox("Mostrar soluções parciais")
+        self.partials_check.setToolTip(
+            "No MILP, o CBC e o GLPK só mostram a solução gulosa inicial; o HiGHS mostra também as soluções "
+            "que encontrar."
+        )
+        engine_layout.addWidget(self.partials_check)
+        self.layout.addLayout(engine_layout)
+        self.update_engine_options()
+
         # Botão para executar alocação
         self.allocate_button = QPushButton("Executar Alocação")
         self.allocate_button.clicked.connect(self.run_allocation)
         self.layout.addWidget(self.allocate_button)
 
-        # Tabela com resultados da alocação
-        self.result_table = QTableWidget()
+        # Progresso da alocação em segundo plano
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 100)
+        self.progress_bar.setVisible(False)
+        self.layout.addWidget(self.progress_bar)
+
+        self.cancel_button = QPushButton("Cancelar Alocação")
+        self.cancel_button.clicked.connect(self.cancel_allocation)
+        self.cancel_button.setVisible(False)
+        self.layout.addWidget(self.cancel_button)
+
+        # Encerra a alocação usando a melhor solução intermediária recebida até agora
+        self.accept_button = QPushButton("Aceitar Solução Atual")
+        self.accept_button.clicked.connect(self.accept_incumbent)
+        self.accept_button.setVisible(False)
+        self.layout.addWidget(self.accept_button)
+
+        self.worker = None
+
+        # Objetivo da alocação e efeito das edições manuais
+        self.objetivo_label = QLabel("")
+        self.layout.addWidget(self.objetivo_label)
+
+        # Edições manuais: as pendentes definem a vizinhança do reequilíbrio; todas ficam fixas
+        self.edicoes = []
+        self.celulas_fixas = set()
+        self.delta_pendente = 0
+
+        # Tabela com resultados da alocação; o combobox de projetos só é criado para a célula em edição
+        self.result_model = DataFrameModel(parent=self)
+        self.result_model.celula_editada.connect(self.update_allocation_data)
+        self.result_model.celulas_gravadas.connect(
+            lambda column, linhas: self.parent.save_cells("alunos_info", column, linhas)
+        )
+        self.colunas_com_delegate = []
+
+        self.result_table = QTableView()
+        self.result_table.setModel(self.result_model)
+        self.projeto_delegate = ProjetoComboDelegate(self.projetos_nomes, self.result_table)
+        self.result_table.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
         self.result_table.setSortingEnabled(True)
-        self.result_table.setSelectionBehavior(QTableWidget.SelectRows)
+        self.result_table.setSelectionBehavior(QTableView.SelectRows)
+        self.result_table.setEditTriggers(
+            QTableView.DoubleClicked | QTableView.SelectedClicked | QTableView.EditKeyPressed
+        )
         self.layout.addWidget(self.result_table)
 
+        # Botão para reequilibrar a alocação em torno das edições manuais
+        self.rebalance_button = QPushButton("Reequilibrar em Torno das Edições")
+        self.rebalance_button.clicked.connect(self.rebalance_edits)
+        self.rebalance_button.setEnabled(False)
+        self.layout.addWidget(self.rebalance_button)
+
+        # Botão para inserir alunos que chegaram depois da alocação, sem refazê-la
+        self.insert_button = QPushButton("Inserir Alunos Atrasados")
+        self.insert_button.clicked.connect(self.insert_late_students)
+        self.insert_button.setEnabled(False)
+        self.layout.addWidget(self.insert_button)
+
         # Botão para exportar CSV
         self.export_button = QPushButton("Exportar Alocação para CSV")
         self.export_button.clicked.connect(self.export_csv)
         self.export_button.setEnabled(False)
         self.layout.addWidget(self.export_button)
 
+        # Botão para exportar, de uma vez, a alocação e as listas de cada projeto e de cada curso
+        self.rosters_button = QPushButton("Exportar Listas por Projeto e Curso")
+        self.rosters_button.clicked.connect(self.export_rosters)
+        self.rosters_button.setEnabled(False)
+        self.layout.addWidget(self.rosters_button)
+        self.export_worker = None
+
+        # Botão para salvar o relatório (tempos, tamanho do modelo, situação do solver) da última execução
+        self.report_button = QPushButton("Salvar Relatório da Execução")
+        self.report_button.clicked.connect(self.export_report)
+        self.report_button.setEnabled(False)
+        self.layout.addWidget(self.report_button)
+
         # Botão para voltar
         back_button = QPushButton("Voltar ao Menu")
         back_button.clicked.connect(self.return_to_menu)
         self.layout.addWidget(back_button)
 
+        # Alocação recuperada da sessão anterior
+        self.refresh()
+
     def run_allocation(self):
-        """Executa a alocação e exibe os resultados."""
+        """Executa a alocação em segundo plano; os resultados são exibidos ao final."""
         alunos_data = self.parent.alunos_data
         projetos_data = self.parent.projetos_data
 
@@ -48,66 +183,337 @@ class AlocacaoWindow(QWidget):
             QMessageBox.warning(self, "Erro", "Importe os dados de alunos e projetos antes de continuar!")
             return
 
-        try:
-            allocation_result = solve_allocation(alunos_data, projetos_data)
-            self.parent.alunos_info = allocation_result
-            self.display_allocation(allocation_result)
-            self.export_button.setEnabled(True)
-        except Exception as e:
-            QMessageBox.critical(self, "Erro", f"Ocorreu um erro durante a alocação: {e}")
-
-    def display_allocation(self, alunos_info):
-        """Exibe os resultados com ComboBoxes para ajuste manual."""
-        self.result_table.setRowCount(len(alunos_info))
-        self.result_table.setColumnCount(len(alunos_info.columns))
-        self.result_table.setHorizontalHeaderLabels(alunos_info.columns)
-
-        # Lista de nomes de projetos
-        projetos_nomes = (
-            self.parent.projetos_data.iloc[:, 1].tolist()
-            if self.parent.projetos_data is not None
-            else []
+        # O processo de alocação atualiza só as linhas/colunas dos alunos e projetos editados desde a última
+        # execução e devolve a matriz para a próxima
+        metrica = self.metric_combo.currentText()
+        config = SolverConfig(
+            backend=self.backend_combo.currentText(), time_limit=self.time_limit_spin.value() or None
+        )
+        self.worker = AllocationWorker(
+            alunos_data,
+            projetos_data,
+            opcoes={
+                "compatibility": self.parent.compatibilidade,
+                "metric": metrica,
+                "engine": self.engine_combo.currentData(),
+                "solver_config": config,
+                "parciais": self.partials_check.isChecked(),
+            },
+            parent=self,
+        )
+        self.worker.fase_iniciada.connect(self.show_phase)
+        self.worker.matriz_atualizada.connect(self.store_matrix)
+        self.worker.parcial.connect(self.show_incumbent)
+        self.worker.concluido.connect(self.allocation_finished)
+        self.worker.falhou.connect(self.allocation_failed)
+        self.worker.cancelado.connect(self.allocation_cancelled)
+        self.worker.finished.connect(self.allocation_stopped)
+
+        self.allocate_button.setEnabled(False)
+        self.progress_bar.setValue(0)
+        self.progress_bar.setFormat("Iniciando...")
+        self.progress_bar.setVisible(True)
+        self.cancel_button.setEnabled(True)
+        self.cancel_button.setVisible(True)
+        self.accept_button.setEnabled(False)
+        self.accept_button.setVisible(self.worker.envia_parciais)
+        self.worker.start()
+
+    def update_engine_options(self):
+        """Habilita só as opções que a engine escolhida usa (o fluxo não tem tempo limite nem parciais)."""
+        engine = self.engine_combo.currentData()
+        self.backend_combo.setEnabled(engine == "milp")
+        self.time_limit_spin.setEnabled(engine != "flow")
+        self.partials_check.setEnabled(engine != "flow")
+        # Sem tempo limite, a heurística usa o orçamento padrão
+        self.time_limit_spin.setSpecialValueText(
+            f"Padrão ({HEURISTIC_TIME_LIMIT:g} s)" if engine == "heuristic" else "Sem limite"
         )
 
-        for i, row in alunos_info.iterrows():
-            for j, value in enumerate(row):
-                column_name = alunos_info.columns[j]
-                if column_name in ["Grupo", "Projeto", "Projeto 1", "Projeto 2"]:  # ajuste conforme necessário
-                    combobox = QComboBox()
-                    combobox.addItems([""] + projetos_nomes)
-                    combobox.setCurrentText(str(value))
-                    combobox.currentTextChanged.connect(
-                        lambda text, row=i, col=j: self.update_allocation_data(text, row, col)
-                    )
-                    self.result_table.setCellWidget(i, j, combobox)
-                else:
-                    item = QTableWidgetItem(str(value))
-                    item.setFlags(item.flags() & ~Qt.ItemIsEditable)
-                    self.result_table.setItem(i, j, item)
-
-    def update_allocation_data(self, text, row, col):
-        """Atualiza o DataFrame global com alterações feitas nos ComboBoxes."""
+    def store_matrix(self, compatibilidade):
+        """Guarda a matriz atualizada pelo processo de alocação para a próxima execução."""
+        self.parent.compatibilidade = compatibilidade
+
+    def show_phase(self, fase, percentual):
+        """Atualiza a barra de progresso com a fase atual da alocação."""
+        self.progress_bar.setValue(percentual)
+        self.progress_bar.setFormat(NOMES_FASES.get(fase, fase))
+
+    def show_incumbent(self, parcial):
+        """Exibe, só para leitura, a solução intermediária mais recente, com o objetivo e o gap."""
+        header = self.result_table.horizontalHeader()
+        self.display_allocation(parcial, editavel=False)
+        if header.sortIndicatorSection() >= 0:
+            self.result_table.sortByColumn(header.sortIndicatorSection(), header.sortIndicatorOrder())
+
+        attrs = parcial.attrs
+        self.objetivo_label.setText(
+            f"Solução parcial  |  Objetivo: {attrs['objetivo']:.2f}  |  Limite: {attrs['limite_superior']:.2f}"
+            f"  |  Gap: {attrs['gap']:.2%}"
+        )
+        self.accept_button.setEnabled(True)
+
+    def accept_incumbent(self):
+        """Encerra a alocação em andamento e fica com a última solução intermediária."""
+        if self.worker is not None:
+            self.accept_button.setEnabled(False)
+            self.cancel_button.setEnabled(False)
+            self.progress_bar.setFormat("Aceitando a solução atual...")
+            self.worker.accept()
+
+    def allocation_finished(self, allocation_result):
+        """Recebe o resultado do processo de alocação e exibe na tabela."""
+        self.parent.alunos_info = allocation_result
+        self.parent.save_run(allocation_result)
+        self.edicoes = []
+        self.celulas_fixas = set()
+        self.delta_pendente = 0
+        self.rebalance_button.setEnabled(False)
+        self.display_allocation(allocation_result)
+        if allocation_result.attrs.get("parcial"):
+            self.show_objective(f"Solução parcial aceita (gap {allocation_result.attrs['gap']:.2%})")
+        else:
+            self.show_objective()
+        self.export_button.setEnabled(True)
+        self.rosters_button.setEnabled(True)
+        self.insert_button.setEnabled(True)
+        self.report_button.setEnabled("relatorio" in allocation_result.attrs)
+
+    def allocation_failed(self, mensagem):
+        self.restore_allocation()
+        QMessageBox.critical(self, "Erro", f"Ocorreu um erro durante a alocação: {mensagem}")
+
+    def allocation_cancelled(self):
+        self.restore_allocation()
+        QMessageBox.information(self, "Alocação", "Alocação cancelada.")
+
+    def restore_allocation(self):
+        """Troca a solução intermediária exibida pela alocação atual (a usada na exportação e nas edições)."""
+        alunos_info = self.parent.alunos_info
+        if alunos_info is None:
+            self.result_model.set_dataframe(pd.DataFrame())
+            self.objetivo_label.setText("")
+        elif alunos_info is not self.result_model.dataframe():
+            self.display_allocation(alunos_info)
+            self.show_objective()
+
+    def allocation_stopped(self):
+        """Restaura os botões quando o processo de alocação termina, por qualquer motivo."""
+        self.progress_bar.setVisible(False)
+        self.cancel_button.setVisible(False)
+        self.accept_button.setVisible(False)
+        self.allocate_button.setEnabled(True)
+        self.worker = None
+
+    def cancel_allocation(self):
+        """Cancela a alocação em andamento, encerrando o solver."""
+        if self.worker is not None:
+            self.cancel_button.setEnabled(False)
+            self.progress_bar.setFormat("Cancelando...")
+            self.worker.cancel()
+
+    def projetos_nomes(self):
+        """Nomes dos projetos oferecidos no combobox de edição."""
+        return self.parent.projetos_data.iloc[:, 1].tolist() if self.parent.projetos_data is not None else []
+
+    def display_allocation(self, alunos_info, editavel=True):
+        """
+        Exibe os resultados; as colunas de projeto são editáveis por combobox para ajuste manual (com
+        editavel=False, como nas soluções intermediárias, nada pode ser editado).
+        """
+        editaveis = {alunos_info.columns.get_loc(col) for col in COLUNAS_EDITAVEIS if col in alunos_info.columns}
+        if not editavel:
+            editaveis = set()
+        self.result_model.set_dataframe(alunos_info, editavel=lambda linhas, column: column in editaveis)
+
+        for col in self.colunas_com_delegate:
+            self.result_table.setItemDelegateForColumn(col, None)
+        self.colunas_com_delegate = sorted(editaveis)
+        for col in self.colunas_com_delegate:
+            self.result_table.setItemDelegateForColumn(col, self.projeto_delegate)
+
+    def update_allocation_data(self, row, col, antigo):
+        """Chamado depois que o modelo grava uma edição no DataFrame global (parent.alunos_info)."""
         data = self.parent.alunos_info
         column_name = data.columns[col]
-        data.at[row, column_name] = text
-        self.parent.alunos_info = data
+        text = data.iat[row, col]
+
+        # Registra a edição e mostra na hora quanto ela mudou o objetivo
+        self.edicoes.append((row, column_name, antigo))
+        self.celulas_fixas.add((row, column_name))
+        self.rebalance_button.setEnabled(True)
+
+        projetos = self.parent.projetos_data.iloc[:, 1].tolist()
+        metrica = data.attrs.get("metrica", "dot")
+        scores = student_scores(self.parent.alunos_data, self.parent.projetos_data, [row], metrica)[0]
+        delta = sum(
+            sinal * scores[projetos.index(nome)]
+            for nome, sinal in ((text, 1), (antigo, -1))
+            if nome in projetos
+        )
+        self.delta_pendente += delta
+        self.show_objective(f"Última edição: {delta:+.2f}")
+
+    def rebalance_edits(self):
+        """Reequilibra a alocação só em torno das edições manuais feitas desde o último reequilíbrio."""
+        try:
+            nova, delta, tamanho = rebalance_allocation(
+                self.parent.alunos_data,
+                self.parent.projetos_data,
+                self.parent.alunos_info,
+                self.edicoes,
+                self.celulas_fixas,
+            )
+        except Exception as e:
+            QMessageBox.critical(self, "Erro", f"Ocorreu um erro durante o reequilíbrio: {e}")
+            return
+
+        self.parent.alunos_info = nova
+        self.parent.save_table("alunos_info")
+        self.edicoes = []
+        self.delta_pendente = 0
+        self.rebalance_button.setEnabled(False)
+        self.display_allocation(nova)
+        self.show_objective(f"Reequilíbrio: {delta:+.2f} ({tamanho} alunos reotimizados)")
+
+    def insert_late_students(self):
+        """Insere os alunos de um CSV na alocação atual, movendo o mínimo possível dos já alocados."""
+        path, _ = QFileDialog.getOpenFileName(self, "Abrir CSV dos Novos Alunos", "", "CSV Files (*.csv)")
+        if not path:
+            return
+        try:
+            novos = load_alunos_csv(path)
+            nova, alunos, movidos = insert_students(
+                self.parent.alunos_data,
+                self.parent.projetos_data,
+                self.parent.alunos_info,
+                novos,
+                fixas=self.celulas_fixas,
+            )
+        except Exception as e:
+            QMessageBox.critical(self, "Erro", f"Ocorreu um erro ao inserir os alunos: {e}")
+            return
+
+        self.parent.alunos_data = alunos
+        self.parent.alunos_info = nova
+        self.parent.save_table("alunos_data")
+        self.parent.save_table("alunos_info")
+        self.display_allocation(nova)
+        self.show_objective(f"{len(novos)} alunos inseridos ({movidos} alunos movidos)")
+
+    def show_objective(self, detalhe=""):
+        """Mostra o objetivo da alocação atual (com as edições ainda não reequilibradas) e o efeito da última operação."""
+        attrs = self.parent.alunos_info.attrs
+        texto = f"Objetivo: {attrs['objetivo'] + self.delta_pendente:.2f}" if "objetivo" in attrs else ""
+        if detalhe:
+            texto = f"{texto}  |  {detalhe}" if texto else detalhe
+        self.objetivo_label.setText(texto)
 
     def export_csv(self):
-        """Abre um diálogo para salvar o arquivo CSV com os dados alocados."""
+        """Abre um diálogo para salvar o arquivo CSV com os dados alocados; a gravação roda em segundo plano."""
+        path, _ = QFileDialog.getSaveFileName(
+            self,
+            "Salvar Alocação como CSV",
+            "alocacao_final.csv",
+            "CSV Files (*.csv)"
+        )
+        if path:
+            alunos_info = self.parent.alunos_info.copy()
+            self.start_export(
+                lambda progress: [write_table(alunos_info, path)],
+                lambda caminhos: f"Arquivo salvo com sucesso:\n{path}",
+            )
+
+    def export_rosters(self):
+        """Exporta para uma pasta a alocação e as listas por projeto e por curso, em CSV e em formato binário."""
+        pasta = QFileDialog.getExistingDirectory(self, "Pasta para as Listas da Alocação")
+        if pasta:
+            alunos_info = self.parent.alunos_info.copy()
+            self.start_export(
+                lambda progress: export_allocation(alunos_info, pasta, progress=progress),
+                lambda caminhos: f"{len(caminhos)} arquivos salvos em:\n{pasta}",
+            )
+
+    def start_export(self, exportar, mensagem):
+        """
+        Roda exportar(progress) em um ExportWorker, com o progresso na barra. Os dados são copiados antes,
+        para que edições feitas durante a gravação não se misturem aos arquivos.
+        """
+        self.export_worker = ExportWorker(exportar, parent=self)
+        self.export_worker.progresso.connect(self.show_export_progress)
+        self.export_worker.concluido.connect(
+            lambda caminhos: QMessageBox.information(self, "Exportação", mensagem(caminhos))
+        )
+        self.export_worker.falhou.connect(
+            lambda erro: QMessageBox.critical(self, "Erro", f"Erro ao exportar: {erro}")
+        )
+        self.export_worker.finished.connect(self.export_stopped)
+
+        self.export_button.setEnabled(False)
+        self.rosters_button.setEnabled(False)
+        self.allocate_button.setEnabled(False)
+        self.progress_bar.setRange(0, 0)
+        self.progress_bar.setFormat("Exportando...")
+        self.progress_bar.setVisible(True)
+        self.export_worker.start()
+
+    def show_export_progress(self, feitos, total):
+        self.progress_bar.setRange(0, total)
+        self.progress_bar.setValue(feitos)
+        self.progress_bar.setFormat(f"Exportando: {feitos} de {total} arquivos")
+
+    def export_stopped(self):
+        """Restaura a barra e os botões quando a exportação termina, com sucesso ou não."""
+        self.progress_bar.setVisible(False)
+        self.progress_bar.setRange(0, 100)
+        self.export_button.setEnabled(True)
+        self.rosters_button.setEnabled(True)
+        self.allocate_button.setEnabled(self.worker is None)
+        self.export_worker = None
+
+    def export_report(self):
+        """Abre um diálogo para salvar em JSON o relatório da última execução da alocação."""
         try:
             path, _ = QFileDialog.getSaveFileName(
                 self,
-                "Salvar Alocação como CSV",
-                "alocacao_final.csv",
-                "CSV Files (*.csv)"
+                "Salvar Relatório da Execução",
+                "relatorio_alocacao.json",
+                "JSON Files (*.json)"
             )
             if path:
-                self.parent.alunos_info.to_csv(path, index=False)
-                QMessageBox.information(self, "Exportação", f"Arquivo salvo com sucesso:\n{path}")
+                save_report(self.parent.alunos_info.attrs["relatorio"], path)
+                QMessageBox.information(self, "Relatório", f"Arquivo salvo com sucesso:\n{path}")
         except Exception as e:
-            QMessageBox.critical(self, "Erro", f"Erro ao exportar CSV: {e}")
+            QMessageBox.critical(self, "Erro", f"Erro ao salvar o relatório: {e}")
+
+    def stop_workers(self):
+        """Cancela a alocação em andamento (encerrando o processo e o solver) e espera a exportação terminar."""
+        if self.worker is not None:
+            self.worker.cancel()
+            self.worker.wait()
+        if self.export_worker is not None:
+            self.export_worker.wait()
+
+    def closeEvent(self, event):
+        """Não deixa o processo de alocação órfão se a janela for fechada no meio da execução."""
+        self.stop_workers()
+        super().closeEvent(event)
+
+    def refresh(self):
+        """Redesenha os resultados só se a alocação do menu não for mais a exibida."""
+        alunos_info = self.parent.alunos_info
+        if alunos_info is not None and alunos_info is not self.result_model.dataframe():
+            self.display_allocation(alunos_info)
+            self.show_objective()
+            self.export_button.setEnabled(True)
+            self.rosters_button.setEnabled(True)
+            self.insert_button.setEnabled(True)
+            self.report_button.setEnabled("relatorio" in alunos_info.attrs)
 
     def return_to_menu(self):
-        """Retorna ao menu principal."""
+        """
+        Retorna ao menu principal; uma alocação em andamento continua e aparece ao reabrir a tela (se a
+        aplicação for fechada antes, o menu a cancela; ver MenuWindow.stop_workers).
+        """
         self.parent.show()
-        self.close()
+        self.hide()
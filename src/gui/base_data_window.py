@@ -1,16 +1,23 @@
-import pandas as pd
-from PyQt5.QtWidgets import QWidget, QVBoxLayout, QPushButton, QTableWidget, QTableWidgetItem, QFileDialog, QMessageBox
+import numpy as np
+from PyQt5.QtWidgets import (
+    QWidget, QVBoxLayout, QPushButton, QTableView, QFileDialog, QMessageBox, QApplication, QShortcut, QUndoStack
+)
+from PyQt5.QtGui import QKeySequence
 from PyQt5.QtCore import Qt
+from utils.file_manager import integer_ranges
+from .dataframe_model import DataFrameModel, RowHighlightDelegate
 
 
 class BaseDataWindow(QWidget):
     """Classe base para telas de gerenciamento de dados."""
     
-    def __init__(self, parent, title, data_attr):
+    def __init__(self, parent, title, data_attr, loader, schema):
         super().__init__()
         self.parent = parent
         self.setWindowTitle(title)
         self.data_attr = data_attr
+        self.loader = loader  # lê e valida o CSV (ver utils.file_manager)
+        self.schema = schema  # esquema do CSV: as edições respeitam as mesmas faixas da importação
         self.setGeometry(100, 100, 800, 600)
 
         # Layout principal
@@ -22,15 +29,31 @@ class BaseDataWindow(QWidget):
         self.import_button.clicked.connect(self.import_data)
         layout.addWidget(self.import_button)
 
-        # Tabela para exibir os dados
-        self.table = QTableWidget()
+        # Tabela para exibir os dados: o modelo lê e escreve direto no DataFrame e ordena por conta própria
+        self.model = DataFrameModel(parent=self)
+        self.model.erro_conversao.connect(self.show_conversion_error)
+        self.model.celulas_gravadas.connect(
+            lambda column, linhas: self.parent.save_cells(self.data_attr, column, linhas)
+        )
+        self.undo_stack = QUndoStack(self)
+        self.model.undo_stack = self.undo_stack
+
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)  # Não ordena ao abrir
         self.table.setSortingEnabled(True)  # Habilita a ordenação por colunas
-        self.table.setSelectionBehavior(QTableWidget.SelectItems)  # Seleção de células individuais
-        self.table.itemSelectionChanged.connect(self.highlight_row)  # Destaca a linha ao selecionar
-        self.table.setEditTriggers(QTableWidget.DoubleClicked)  # Permite edição ao dar um duplo clique
-        self.table.itemChanged.connect(self.update_data)  # Captura alterações nas células
+        self.table.setSelectionBehavior(QTableView.SelectItems)  # Seleção de células individuais
+        self.table.selectionModel().selectionChanged.connect(self.highlight_row)  # Destaca a linha ao selecionar
+        self.table.setEditTriggers(QTableView.DoubleClicked)  # Permite edição ao dar um duplo clique
+        self.table.setItemDelegate(RowHighlightDelegate(self.table))
         layout.addWidget(self.table)
 
+        # Colar e preencher para baixo gravam o bloco inteiro de uma vez, desfeito em um único passo
+        QShortcut(QKeySequence.Paste, self.table, self.paste_cells)
+        QShortcut(QKeySequence("Ctrl+D"), self.table, self.fill_down)
+        QShortcut(QKeySequence.Undo, self.table, self.undo_stack.undo)
+        QShortcut(QKeySequence.Redo, self.table, self.undo_stack.redo)
+
         # Preencher a tabela se os dados já foram importados
         data = getattr(self.parent, self.data_attr, None)
         if data is not None:
@@ -46,8 +69,9 @@ class BaseDataWindow(QWidget):
         file_path, _ = QFileDialog.getOpenFileName(self, "Selecione o arquivo CSV", "", "CSV Files (*.csv)")
         if file_path:
             try:
-                data = pd.read_csv(file_path)
+                data = self.loader(file_path)
                 setattr(self.parent, self.data_attr, data)  # Armazena os dados no MenuWindow
+                self.parent.save_table(self.data_attr)
                 self.display_data(data)
                 self.parent.enable_alocacao_button()
                 QMessageBox.information(self, "Sucesso", "Dados importados com sucesso!")
@@ -56,66 +80,87 @@ class BaseDataWindow(QWidget):
 
     def display_data(self, data):
         """Exibe os dados importados na tabela."""
-        # Atualiza a tabela com o número de linhas e colunas do DataFrame
-        self.table.setRowCount(len(data))
-        self.table.setColumnCount(len(data.columns))
-        self.table.setHorizontalHeaderLabels(data.columns)
-
-        # Preenche a tabela com os dados
-        for i, row in data.iterrows():
-            for j, value in enumerate(row):
-                self.table.setItem(i, j, QTableWidgetItem(str(value)))
+        self.model.set_dataframe(data, limites=integer_ranges(data.columns, self.schema))
 
-    def highlight_row(self):
-        """Destaca a linha correspondente à célula selecionada."""
-        # Remove destaque de todas as linhas
-        for i in range(self.table.rowCount()):
-            for j in range(self.table.columnCount()):
-                item = self.table.item(i, j)
-                if item:
-                    item.setBackground(Qt.white)
-
-        # Adiciona destaque à linha selecionada
-        for item in self.table.selectedItems():
-            row = item.row()
-            for col in range(self.table.columnCount()):
-                cell = self.table.item(row, col)
-                if cell:
-                    cell.setBackground(Qt.lightGray)
-
-    def update_data(self, item):
-        """Atualiza os dados na variável associada ao modificar uma célula."""
+    def refresh(self):
+        """Redesenha a tabela só se o DataFrame do menu não for mais o exibido (ex.: foi reimportado)."""
         data = getattr(self.parent, self.data_attr, None)
-        if data is not None:
-            row = item.row()
-            column = item.column()
-            column_name = data.columns[column]
-            column_dtype = data[column_name].dtype
+        if data is not None and data is not self.model.dataframe():
+            self.display_data(data)
 
-            try:
-                # Converte o valor para o tipo adequado antes de atualizar
-                if pd.api.types.is_integer_dtype(column_dtype):
-                    value = int(item.text())
-                elif pd.api.types.is_float_dtype(column_dtype):
-                    value = float(item.text())
-                else:
-                    value = item.text()
-
-                # Atualiza o DataFrame
-                data.at[row, column_name] = value
-                setattr(self.parent, self.data_attr, data)
-            except ValueError:
-                QMessageBox.critical(
-                    self,
-                    "Erro de Tipo",
-                    f"Não foi possível converter '{item.text()}' para o tipo {column_dtype}."
-                )
-                # Restaura o valor original na tabela
-                self.table.blockSignals(True)  # Evita loop de sinais
-                self.table.setItem(row, column, QTableWidgetItem(str(data.at[row, column_name])))
-                self.table.blockSignals(False)
+    def highlight_row(self):
+        """Destaca as linhas das células selecionadas: o delegate consulta a seleção ao repintar as células visíveis."""
+        self.table.viewport().update()
+
+    def paste_cells(self):
+        """
+        Cola o texto da área de transferência (colunas separadas por tab, como no Excel) a partir da
+        célula selecionada. Um único valor colado sobre várias células preenche todas elas.
+        """
+        texto = QApplication.clipboard().text()
+        selecao = self.table.selectionModel().selection()
+        if not texto or selecao.isEmpty():
+            return
+
+        grade = [linha.split("\t") for linha in texto.replace("\r\n", "\n").rstrip("\n").split("\n")]
+        blocos_texto = []
+        if len(grade) == 1 and len(grade[0]) == 1:
+            for faixa in selecao:
+                for column in range(faixa.left(), faixa.right() + 1):
+                    linhas = self.model.source_rows(np.arange(faixa.top(), faixa.bottom() + 1))
+                    blocos_texto.append((column, linhas, [grade[0][0]] * len(linhas)))
+        else:
+            topo = min(faixa.top() for faixa in selecao)
+            esquerda = min(faixa.left() for faixa in selecao)
+            n_linhas = min(len(grade), self.model.rowCount() - topo)
+            linhas = self.model.source_rows(np.arange(topo, topo + n_linhas))
+            largura = max(len(linha) for linha in grade)
+            for k in range(min(largura, self.model.columnCount() - esquerda)):
+                valores = [linha[k] if k < len(linha) else "" for linha in grade[:n_linhas]]
+                blocos_texto.append((esquerda + k, linhas, valores))
+
+        self.commit_blocks(blocos_texto, "Colar")
+
+    def fill_down(self):
+        """Copia o valor da primeira célula selecionada de cada coluna para as demais células selecionadas abaixo dela."""
+        data = self.model.dataframe()
+        blocos_texto = []
+        for faixa in self.table.selectionModel().selection():
+            linhas = self.model.source_rows(np.arange(faixa.top(), faixa.bottom() + 1))
+            for column in range(faixa.left(), faixa.right() + 1):
+                valor = str(data.iat[int(linhas[0]), column])
+                blocos_texto.append((column, linhas[1:], [valor] * (len(linhas) - 1)))
+
+        self.commit_blocks(blocos_texto, "Preencher para baixo")
+
+    def commit_blocks(self, blocos_texto, descricao):
+        """
+        Converte cada coluna do bloco de uma vez e grava tudo com uma única edição (um passo de desfazer).
+        Se algum valor não puder ser convertido, nada é gravado.
+        """
+        blocos = []
+        for column, linhas, textos in blocos_texto:
+            editaveis = self.model.editable_mask(column, linhas)
+            if not editaveis.any():
+                continue
+            linhas = linhas[editaveis]
+            valores = self.model.convert_values(column, np.asarray(textos, dtype=object)[editaveis])
+            if valores is None:
+                return
+            blocos.append((column, linhas, valores))
+
+        if blocos:
+            self.model.edit_cells(blocos, descricao)
+
+    def show_conversion_error(self, texto, column_dtype):
+        """Avisa que o valor digitado não é do tipo da coluna; o DataFrame e a tabela ficam como estavam."""
+        QMessageBox.critical(
+            self,
+            "Erro de Tipo",
+            f"Não foi possível converter '{texto}' para o tipo {column_dtype}."
+        )
 
     def return_to_menu(self):
-        """Retorna para o menu principal."""
+        """Retorna para o menu principal; a tela fica guardada no menu para ser reaberta."""
         self.parent.show()
-        self.close()
+        self.hide()
@@ -0,0 +1,269 @@
+import numpy as np
+import pandas as pd
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, Qt, pyqtSignal
+from PyQt5.QtGui import QColor
+from PyQt5.QtWidgets import QComboBox, QStyledItemDelegate, QUndoCommand
+
+
+class DataFrameModel(QAbstractTableModel):
+    """
+    Modelo de tabela que lê e escreve direto em um DataFrame.
+
+    A view só pede as células visíveis, então abrir uma tela não depende do número de linhas.
+    As edições são convertidas para o tipo da coluna (e checadas contra a faixa da coluna em `limites`,
+    a mesma da importação) e gravadas no próprio DataFrame.
+    A ordenação é uma permutação das linhas calculada de uma vez com o NumPy; o DataFrame não é
+    reordenado, e os sinais e métodos públicos usam sempre a posição da linha no DataFrame.
+
+    Com um QUndoStack em `undo_stack`, cada edição (de uma célula ou de um bloco colado) vira um
+    passo de desfazer.
+    """
+    celula_editada = pyqtSignal(int, int, object)  # linha, coluna, valor antigo
+    erro_conversao = pyqtSignal(str, str)  # texto digitado, tipo da coluna
+    celulas_gravadas = pyqtSignal(int, object)  # coluna, posições no DataFrame (edição, colar, desfazer)
+
+    def __init__(self, data=None, editavel=None, parent=None):
+        super().__init__(parent)
+        self._data = data if data is not None else pd.DataFrame()
+        self._editavel = editavel
+        self._limites = {}  # nome da coluna -> (dtype, mínimo, máximo) das colunas inteiras
+        self._ordem = None  # linha da view -> posição no DataFrame (None = ordem original)
+        self._posicao = None  # inversa de _ordem
+        self.undo_stack = None
+
+    def dataframe(self):
+        return self._data
+
+    def set_dataframe(self, data, editavel=None, limites=None):
+        """
+        Troca o DataFrame exibido. editavel(linhas, coluna) restringe quais células podem ser editadas;
+        recebe uma posição ou um array de posições do DataFrame e devolve um bool ou uma máscara.
+        limites: {coluna: (dtype, mínimo, máximo)} das colunas inteiras (ver utils.file_manager.integer_ranges);
+        máximo None é o limite do dtype.
+        """
+        self.beginResetModel()
+        self._data = data
+        self._editavel = editavel
+        self._limites = dict(limites or {})
+        self._ordem = None
+        self._posicao = None
+        self.endResetModel()
+        if self.undo_stack is not None:
+            self.undo_stack.clear()  # os passos guardados são do DataFrame anterior
+
+    def source_row(self, row):
+        """Posição no DataFrame da linha `row` da view."""
+        return row if self._ordem is None else int(self._ordem[row])
+
+    def view_row(self, linha):
+        """Linha da view que exibe a posição `linha` do DataFrame."""
+        return linha if self._posicao is None else int(self._posicao[linha])
+
+    def source_rows(self, rows):
+        """Versão vetorizada de source_row para um array de linhas da view."""
+        rows = np.asarray(rows, dtype=np.int64)
+        return rows if self._ordem is None else self._ordem[rows]
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._data)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._data.columns)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+
+        row = self.source_row(index.row())
+        if role in (Qt.DisplayRole, Qt.EditRole):
+            return str(self._data.iat[row, index.column()])
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return str(self._data.columns[section])
+        return str(self.source_row(section) + 1)
+
+    def flags(self, index):
+        flags = Qt.ItemIsEnabled | Qt.ItemIsSelectable
+        if self._editavel is None or self._editavel(self.source_row(index.row()), index.column()):
+            flags |= Qt.ItemIsEditable
+        return flags
+
+    def editable_mask(self, column, linhas):
+        """Máscara das posições do DataFrame cuja célula na coluna dada pode ser editada."""
+        linhas = np.asarray(linhas, dtype=np.int64)
+        if self._editavel is None:
+            return np.ones(len(linhas), dtype=bool)
+        return np.broadcast_to(np.asarray(self._editavel(linhas, column), dtype=bool), linhas.shape).copy()
+
+    def convert_values(self, column, textos):
+        """
+        Converte os textos digitados para o tipo da coluna de uma vez.
+
+        Retorna os valores convertidos ou None (e emite erro_conversao com o primeiro texto inválido).
+        """
+        column_dtype = self._data.dtypes.iloc[column]
+        textos = pd.Series(textos, dtype=object).astype(str).str.strip()
+        tipo = str(column_dtype)
+        if pd.api.types.is_integer_dtype(column_dtype):
+            # Também recusa valores fora da faixa da coluna (ex.: habilidades de 0 a NIVEL_MAXIMO) ou do dtype
+            limites = np.iinfo(column_dtype)
+            minimo, maximo = limites.min, limites.max
+            if self._data.columns[column] in self._limites:
+                _, minimo, maximo = self._limites[self._data.columns[column]]
+                tipo += f" maior ou igual a {minimo}" if maximo is None else f" entre {minimo} e {maximo}"
+                maximo = limites.max if maximo is None else maximo
+            valores = pd.to_numeric(textos, errors="coerce")
+            invalidos = valores.isna() | (valores != np.floor(valores)) | (valores < minimo) | (valores > maximo)
+        elif pd.api.types.is_float_dtype(column_dtype):
+            valores = pd.to_numeric(textos, errors="coerce")
+            invalidos = valores.isna() & (textos.str.lower() != "nan")
+        else:
+            return textos.to_numpy(dtype=object)
+
+        if invalidos.any():
+            self.erro_conversao.emit(textos[invalidos].iloc[0], tipo)
+            return None
+        return valores.to_numpy().astype(column_dtype)
+
+    def setData(self, index, value, role=Qt.EditRole):
+        """Converte o valor editado para o tipo da coluna e atualiza o DataFrame."""
+        if role != Qt.EditRole or not index.isValid():
+            return False
+
+        row, column = self.source_row(index.row()), index.column()
+        novos = self.convert_values(column, [value])
+        if novos is None:
+            return False
+
+        antigo = self._data.iat[row, column]
+        if str(antigo) == str(novos[0]):
+            return False
+
+        self.edit_cells([(column, np.array([row]), novos)], "Editar célula")
+        self.celula_editada.emit(row, column, antigo)
+        return True
+
+    def edit_cells(self, blocos, descricao="Editar células"):
+        """
+        Grava vários blocos de uma vez, como um único passo de desfazer.
+
+        blocos: lista de (coluna, posicoes_no_dataframe, valores_ja_convertidos).
+        """
+        if self.undo_stack is not None:
+            self.undo_stack.push(EditCellsCommand(self, blocos, descricao))
+        else:
+            for column, linhas, valores in blocos:
+                self.write_column(column, linhas, valores)
+
+    def write_column(self, column, linhas, valores):
+        """Escreve os valores nas posições dadas de uma coluna com uma única atribuição vetorizada."""
+        if len(linhas) == 0:
+            return
+        serie = self._data.iloc[:, column]
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            # Colunas categóricas (ex.: "Curso") só aceitam valores já registrados como categoria
+            novas = pd.Index(pd.unique(np.asarray(valores, dtype=object))).difference(serie.cat.categories)
+            novas = novas[pd.notna(novas)]
+            if len(novas):
+                self._data.isetitem(column, serie.cat.add_categories(novas))
+        self._data.iloc[linhas, column] = valores
+        self.celulas_gravadas.emit(column, np.asarray(linhas))
+
+        # Um único sinal cobrindo as linhas alteradas; a view só repinta o que está visível
+        linhas_view = np.asarray(linhas) if self._posicao is None else self._posicao[linhas]
+        self.dataChanged.emit(
+            self.index(int(linhas_view.min()), column),
+            self.index(int(linhas_view.max()), column),
+            [Qt.DisplayRole, Qt.EditRole],
+        )
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        """Ordena a exibição pela coluna dada; column < 0 volta à ordem do DataFrame."""
+        self.layoutAboutToBeChanged.emit()
+        antigos = self.persistentIndexList()
+        linhas_antigas = [self.source_row(index.row()) for index in antigos]
+
+        if column < 0 or column >= self.columnCount():
+            self._ordem = self._posicao = None
+        else:
+            serie = self._data.iloc[:, column].reset_index(drop=True)
+            try:
+                ordenada = serie.sort_values(ascending=order == Qt.AscendingOrder, kind="stable")
+            except TypeError:
+                # Coluna com tipos misturados (ex.: texto e NaN): ordena pelo texto exibido
+                ordenada = serie.astype(str).sort_values(ascending=order == Qt.AscendingOrder, kind="stable")
+            self._ordem = ordenada.index.to_numpy()
+            self._posicao = np.empty_like(self._ordem)
+            self._posicao[self._ordem] = np.arange(len(self._ordem))
+
+        self.changePersistentIndexList(
+            antigos,
+            [self.index(self.view_row(linha), index.column()) for linha, index in zip(linhas_antigas, antigos)],
+        )
+        self.layoutChanged.emit()
+
+
+class EditCellsCommand(QUndoCommand):
+    """Passo de desfazer de uma edição em bloco: guarda os valores antigos de cada coluna alterada."""
+
+    def __init__(self, model, blocos, descricao):
+        super().__init__(descricao)
+        self.model = model
+        self.blocos = [
+            (column, linhas, valores, model.dataframe().iloc[linhas, column].to_numpy(copy=True))
+            for column, linhas, valores in blocos
+        ]
+
+    def redo(self):
+        for column, linhas, valores, _ in self.blocos:
+            self.model.write_column(column, linhas, valores)
+
+    def undo(self):
+        for column, linhas, _, antigos in self.blocos:
+            self.model.write_column(column, linhas, antigos)
+
+
+class RowHighlightDelegate(QStyledItemDelegate):
+    """
+    Pinta de cinza as células das linhas que têm alguma célula selecionada.
+
+    A consulta é feita só quando a célula é pintada, então mudar a seleção custa o número de células
+    visíveis, e não linhas x colunas.
+    """
+
+    def __init__(self, view):
+        super().__init__(view)
+        self.view = view
+
+    def initStyleOption(self, option, index):
+        super().initStyleOption(option, index)
+        selecao = self.view.selectionModel()
+        if selecao is not None and selecao.rowIntersectsSelection(index.row(), index.parent()):
+            option.backgroundBrush = QColor(Qt.lightGray)
+
+
+class ProjetoComboDelegate(RowHighlightDelegate):
+    """
+    Editor de células de projeto: cria um QComboBox com a lista de projetos só para a célula em edição.
+    """
+
+    def __init__(self, projetos_nomes, view):
+        super().__init__(view)
+        self.projetos_nomes = projetos_nomes  # função que devolve a lista atual de nomes
+
+    def createEditor(self, parent, option, index):
+        combobox = QComboBox(parent)
+        combobox.addItems([""] + list(self.projetos_nomes()))
+        # Grava assim que o usuário escolhe, como os comboboxes fixos faziam
+        combobox.activated.connect(lambda _: self.commitData.emit(combobox))
+        return combobox
+
+    def setEditorData(self, editor, index):
+        editor.setCurrentText(index.data(Qt.EditRole))
+
+    def setModelData(self, editor, model, index):
+        model.setData(index, editor.currentText(), Qt.EditRole)
@@ -0,0 +1,25 @@
+from PyQt5.QtCore import QThread, pyqtSignal
+
+
+class ExportWorker(QThread):
+    """
+    Grava arquivos fora da thread da interface.
+
+    exportar(progress) faz a gravação (ex.: core.export.export_allocation) e chama progress(feitos, total)
+    a cada arquivo; o progresso e o resultado chegam à interface por sinais.
+    """
+    progresso = pyqtSignal(int, int)  # arquivos gravados, total
+    concluido = pyqtSignal(object)  # valor retornado por exportar
+    falhou = pyqtSignal(str)
+
+    def __init__(self, exportar, parent=None):
+        super().__init__(parent)
+        self.exportar = exportar
+
+    def run(self):
+        try:
+            resultado = self.exportar(self.progresso.emit)
+        except Exception as e:
+            self.falhou.emit(str(e))
+            return
+        self.concluido.emit(resultado)
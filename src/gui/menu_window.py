@@ -1,8 +1,12 @@
-from PyQt5.QtWidgets import QWidget, QVBoxLayout, QLabel, QPushButton
+import sqlite3
+from PyQt5.QtWidgets import QApplication, QWidget, QVBoxLayout, QLabel, QPushButton
 from PyQt5.QtCore import Qt
-from .alunos_window import AlunosWindow
-from .projetos_window import ProjetosWindow
-from .alocacao_window import AlocacaoWindow
+from core.compatibility import CompatibilityMatrix
+from core.report import logger
+from utils.file_manager import SessionStore
+
+# DataFrames do menu guardados na sessão, pelo nome do atributo
+TABELAS_SESSAO = ("alunos_data", "projetos_data", "alunos_info")
 
 
 class MenuWindow(QWidget):
@@ -43,27 +47,107 @@ class MenuWindow(QWidget):
         # Variáveis de estado
         self.alunos_data = None
         self.projetos_data = None
-        
+        self.alunos_info = None
+
+        # Telas criadas no primeiro acesso e reaproveitadas depois (ver open_screen)
+        self.alunos_window = None
+        self.projetos_window = None
+        self.alocacao_window = None
+
+        # A tela de alocação fica só escondida ao voltar ao menu: ao sair da aplicação (fechando o menu ou a
+        # última tela visível), a alocação que ainda estiver rodando nela é cancelada
+        QApplication.instance().aboutToQuit.connect(self.stop_workers)
+
+        # Matriz de compatibilidade reaproveitada entre execuções da alocação
+        self.compatibilidade = CompatibilityMatrix()
+
+        # Sessão em disco: reaberta aqui e atualizada a cada importação, alocação e edição de célula
+        self.sessao = None
+        try:
+            self.sessao = SessionStore()
+            self.restore_session()
+        except (OSError, sqlite3.Error) as e:
+            logger.warning("Sessão anterior indisponível: %s", e)
+
     def enable_alocacao_button(self):
         """Habilita o botão de alocação se os dados de alunos e projetos forem importados."""
         if self.alunos_data is not None and self.projetos_data is not None:
             self.alocacao_button.setEnabled(True)
 
+    def restore_session(self):
+        """Recarrega os DataFrames da última sessão, já com as edições manuais, e habilita a alocação."""
+        for atributo in TABELAS_SESSAO:
+            setattr(self, atributo, self.sessao.load_table(atributo))
+        self.enable_alocacao_button()
+
+    def _persist(self, metodo, *args):
+        """Chama self.sessao.<metodo>; uma falha do banco só vai para o log, sem interromper a interface."""
+        if self.sessao is None:
+            return
+        try:
+            getattr(self.sessao, metodo)(*args)
+        except sqlite3.Error as e:
+            logger.warning("Não foi possível salvar a sessão: %s", e)
+
+    def save_table(self, atributo):
+        """Grava na sessão o DataFrame de self.<atributo> inteiro (depois de importar ou reequilibrar)."""
+        self._persist("save_table", atributo, getattr(self, atributo))
+
+    def save_cells(self, atributo, column, linhas):
+        """Grava na sessão só as células alteradas de uma coluna de self.<atributo>."""
+        if self.sessao is None:
+            return
+        data = getattr(self, atributo)
+        try:
+            salva = data.columns[column] in self.sessao.columns(atributo)
+        except sqlite3.Error as e:
+            logger.warning("Não foi possível salvar a sessão: %s", e)
+            return
+        if not salva:
+            # Coluna criada depois do último save_table (ex.: 'Projeto 1' na tela de alunos): grava a tabela
+            self.save_table(atributo)
+            return
+        self._persist(
+            "save_cells", atributo, data.columns[column], linhas, data.iloc[linhas, column].to_numpy(dtype=object)
+        )
+
+    def save_run(self, alunos_info):
+        """Registra uma execução da alocação na sessão e guarda o resultado como self.alunos_info."""
+        self._persist("record_run", "alunos_info", alunos_info)
+
+    def stop_workers(self):
+        """Encerra o processo de alocação e espera as threads da tela de alocação, se ela foi criada."""
+        if self.alocacao_window is not None:
+            self.alocacao_window.stop_workers()
+
+    def open_screen(self, atributo, criar):
+        """
+        Mostra a tela guardada em self.<atributo>, criando-a com criar() no primeiro acesso.
+
+        Uma tela já criada é reaproveitada: refresh() só redesenha a tabela se o DataFrame que ela exibe
+        foi trocado desde a última vez.
+        """
+        janela = getattr(self, atributo)
+        if janela is None:
+            janela = criar()
+            setattr(self, atributo, janela)
+        else:
+            janela.refresh()
+        janela.show()
+        self.hide()
+
     def open_alunos_screen(self):
         """Abre a tela de alunos."""
-        self.alunos_window = AlunosWindow(self)
-        self.alunos_window.show()
-        self.hide()
+        from .alunos_window import AlunosWindow
+        self.open_screen("alunos_window", lambda: AlunosWindow(self))
 
     def open_projetos_screen(self):
         """Abre a tela de projetos."""
-        self.projetos_window = ProjetosWindow(self)
-        self.projetos_window.show()
-        self.hide()
+        from .projetos_window import ProjetosWindow
+        self.open_screen("projetos_window", lambda: ProjetosWindow(self))
 
     def open_alocacao_screen(self):
         """Abre a tela de alocação."""
-        self.alocacao_window = AlocacaoWindow(self)
-        self.alocacao_window.show()
-        self.hide()
+        from .alocacao_window import AlocacaoWindow
+        self.open_screen("alocacao_window", lambda: AlocacaoWindow(self))
 
@@ -1,7 +1,8 @@
+from utils.file_manager import ESQUEMA_PROJETOS, load_projetos_csv
 from .base_data_window import BaseDataWindow
 
 
 class ProjetosWindow(BaseDataWindow):
     """Tela de gerenciamento de projetos."""
     def __init__(self, parent):
-        super().__init__(parent, "Projetos", "projetos_data")
+        super().__init__(parent, "Projetos", "projetos_data", load_projetos_csv, ESQUEMA_PROJETOS)
@@ -1,9 +1,11 @@
 import sys
 from PyQt5.QtWidgets import QApplication
 from gui import MenuWindow  # Importa a classe MenuWindow do pacote gui
+from core.report import setup_logging
 
 def main():
     """Função principal para iniciar o aplicativo."""
+    setup_logging()
     app = QApplication(sys.argv)
     window = MenuWindow()  # Cria a janela principal (MenuWindow)
     window.show()
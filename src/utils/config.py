@@ -1 +1,61 @@
-# General configuration settings
\ No newline at end of file
+# General configuration settings
+import os
+from dataclasses import dataclass
+from typing import Any, Optional
+
+# Orçamento de tempo padrão (em segundos) da engine heurística de alocação
+HEURISTIC_TIME_LIMIT = 5.0
+
+# Intervalo mínimo (em segundos) entre duas soluções parciais enviadas ao callback on_incumbent da alocação
+INCUMBENT_INTERVAL = 0.5
+
+# Linhas lidas por vez na importação de CSVs de alunos e projetos
+CSV_CHUNK_SIZE = 50_000
+
+# Pasta do cache binário dos CSVs importados (ver utils.file_manager.load_cached_csv)
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "projeto-unesp")
+
+# Banco SQLite da sessão da interface: dados importados, alocações e edições manuais (ver SessionStore)
+SESSION_DB = os.environ.get(
+    "PROJETO_UNESP_SESSAO", os.path.join(os.path.expanduser("~"), ".local", "share", "projeto-unesp", "sessao.sqlite3")
+)
+
+# Nível máximo de uma habilidade nos CSVs (as habilidades vão de 0 a NIVEL_MAXIMO)
+NIVEL_MAXIMO = 5
+
+# Memória máxima (em bytes) dos temporários de cada bloco no cálculo da matriz de similaridade
+SIMILARITY_MEMORY_LIMIT = 256 * 2**20
+
+# Importância de cada habilidade na métrica "weighted" (habilidades ausentes valem 1.0)
+PESOS_HABILIDADES = {}
+
+# Nível do logger da aplicação (tempos de cada fase da alocação saem em INFO, diagnósticos em DEBUG)
+LOG_LEVEL = os.environ.get("PROJETO_UNESP_LOG", "WARNING")
+
+# Backends de MILP aceitos por SolverConfig.backend
+SOLVER_BACKENDS = ("CBC", "HIGHS", "GLPK")
+
+
+@dataclass
+class SolverConfig:
+    """
+    Configuração do solver usado por solve_allocation.
+
+    - backend: "CBC" (padrão, embutido no PuLP), "HIGHS" (se instalado) ou "GLPK"
+    - threads: número de threads do solver (None = padrão do solver)
+    - time_limit: tempo máximo em segundos; vale também para a engine heurística
+    - gap_rel: gap relativo em que o solver pode parar (ex.: 0.01 = 1%)
+    - warm_start: alocação anterior (DataFrame ou caminho de CSV com "Projeto 1"/"Projeto 2")
+      usada como solução inicial do MILP (o GLPK e o HiGHS sem o executável highs a ignoram; ver
+      core.allocation_solver.make_solver)
+    - msg: exibe o log do solver
+    - top_k: se informado, o MILP só cria variáveis para os top_k projetos mais compatíveis de cada aluno
+      (mais as pré-alocações); o k é ampliado automaticamente se o modelo podado ficar inviável
+    """
+    backend: str = "CBC"
+    threads: Optional[int] = None
+    time_limit: Optional[float] = None
+    gap_rel: Optional[float] = None
+    warm_start: Any = None
+    msg: bool = True
+    top_k: Optional[int] = None
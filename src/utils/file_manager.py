@@ -1 +1,492 @@
-# Utility functions for file handling
\ No newline at end of file
+# Utility functions for file handling
+import hashlib
+import json
+import logging
+import os
+import pickle
+import shutil
+import sqlite3
+import tempfile
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils.config import CACHE_DIR, CSV_CHUNK_SIZE, NIVEL_MAXIMO, SESSION_DB
+
+# Quantos erros são listados na mensagem de validação; o total é sempre informado
+MAX_ERROS_LISTADOS = 20
+
+# Versão do formato do cache; mudar invalida todas as entradas antigas
+VERSAO_CACHE = 1
+
+# Versão do formato do banco da sessão (PRAGMA user_version); um banco de outra versão é recriado
+VERSAO_SESSAO = 2
+
+# Mesmo logger de core.report (utils não importa core)
+logger = logging.getLogger("alocacao")
+
+
+@dataclass
+class CsvSchema:
+    """
+    Esquema de um CSV de entrada.
+
+    - texto: colunas obrigatórias de texto, que não podem ficar vazias
+    - inteiros: colunas obrigatórias inteiras -> (dtype, mínimo, máximo); None = sem limite
+    - categorias: colunas obrigatórias categóricas -> valores aceitos (None = qualquer valor não vazio)
+    - opcionais: colunas de texto que podem faltar no arquivo ou ficar vazias
+    - chave: coluna que não pode ter valores repetidos
+
+    Todas as outras colunas são habilidades: uint8 de 0 a NIVEL_MAXIMO.
+    """
+    texto: List[str]
+    inteiros: Dict[str, Tuple[str, Optional[int], Optional[int]]]
+    categorias: Dict[str, Optional[List[str]]]
+    opcionais: List[str] = field(default_factory=list)
+    chave: Optional[str] = None
+
+
+ESQUEMA_ALUNOS = CsvSchema(
+    texto=["Nome do Aluno"],
+    # Projetos Tentados vai até o número de colunas de projeto (Projeto 1 e Projeto 2)
+    inteiros={"RA": ("int64", 0, None), "Projetos Tentados": ("uint8", 0, 2)},
+    categorias={"Curso": None, "Pode Comparecer": ["Sim", "Não"]},
+    opcionais=["Projeto 1", "Projeto 2"],
+    chave="RA",
+)
+
+ESQUEMA_PROJETOS = CsvSchema(
+    texto=["Codigo do Projeto", "Nome do Projeto"],
+    inteiros={},
+    categorias={"Presencial": ["Sim", "Não"]},
+    chave="Nome do Projeto",
+)
+
+
+def info_columns(colunas, schema):
+    """Colunas de informação: as que o esquema nomeia e estão presentes, na ordem do arquivo."""
+    especiais = set(schema.texto) | set(schema.inteiros) | set(schema.categorias) | set(schema.opcionais)
+    return [coluna for coluna in colunas if coluna in especiais]
+
+
+def skill_columns(colunas, schema):
+    """Colunas de habilidades: todas as que o esquema não nomeia, na ordem do arquivo."""
+    especiais = set(info_columns(colunas, schema))
+    return [coluna for coluna in colunas if coluna not in especiais]
+
+
+def integer_ranges(colunas, schema):
+    """
+    Colunas inteiras presentes em `colunas` -> (dtype, mínimo, máximo): as do esquema e as habilidades
+    (uint8 de 0 a NIVEL_MAXIMO). É a mesma regra usada na importação e na edição das tabelas.
+    """
+    inteiros = {coluna: limites for coluna, limites in schema.inteiros.items() if coluna in colunas}
+    inteiros.update({coluna: ("uint8", 0, NIVEL_MAXIMO) for coluna in skill_columns(colunas, schema)})
+    return inteiros
+
+
+def _range_text(minimo, maximo):
+    if maximo is None:
+        return f"deve ser um inteiro maior ou igual a {minimo}"
+    return f"deve ser um inteiro entre {minimo} e {maximo}"
+
+
+def _record_errors(erros, mascara, parte, coluna, linhas_arquivo, motivo):
+    """Anota as linhas marcadas em `mascara` (guardando só as primeiras) e retorna quantas são."""
+    posicoes = np.flatnonzero(np.asarray(mascara))
+    espaco = MAX_ERROS_LISTADOS - len(erros)
+    for k in posicoes[:max(espaco, 0)].tolist():
+        erros.append((int(linhas_arquivo[k]), coluna, parte[coluna].iloc[k], motivo))
+    return len(posicoes)
+
+
+def read_csv_typed(path, schema, chunksize=CSV_CHUNK_SIZE):
+    """
+    Lê um CSV de alunos ou projetos em blocos, validando e convertendo cada coluna para um tipo compacto.
+
+    Habilidades viram uint8, as colunas categóricas viram category e as inteiras o dtype do esquema,
+    o que reduz bastante a memória em turmas grandes. Colunas obrigatórias ausentes são recusadas antes
+    de ler os dados. Os erros de cada linha (valor não numérico, fora do intervalo, vazio, categoria
+    desconhecida, chave repetida) são reunidos durante a leitura e reportados juntos, com o número da
+    linha no arquivo, em um único ValueError.
+    """
+    colunas = pd.read_csv(path, nrows=0).columns
+    obrigatorias = schema.texto + list(schema.inteiros) + list(schema.categorias)
+    faltando = [coluna for coluna in obrigatorias if coluna not in colunas]
+    if faltando:
+        raise ValueError(f"Colunas obrigatórias ausentes no arquivo: {', '.join(faltando)}.")
+
+    habilidades = skill_columns(colunas, schema)
+    if not habilidades:
+        raise ValueError("O arquivo não tem colunas de habilidades.")
+
+    inteiros = integer_ranges(colunas, schema)
+    opcionais = [coluna for coluna in schema.opcionais if coluna in colunas]
+    textos = schema.texto + list(schema.categorias) + opcionais
+
+    erros, total_erros, partes, inicio = [], 0, [], 0
+    for parte in pd.read_csv(path, chunksize=chunksize, dtype={coluna: str for coluna in textos}):
+        linhas_arquivo = np.arange(inicio, inicio + len(parte)) + 2  # a linha 1 é o cabeçalho
+        inicio += len(parte)
+        parte = parte.reset_index(drop=True)
+
+        for coluna, (dtype, minimo, maximo) in inteiros.items():
+            valores = parte[coluna]
+            if pd.api.types.is_integer_dtype(valores.dtype):
+                invalidos = np.zeros(len(parte), dtype=bool)
+            else:
+                valores = pd.to_numeric(valores, errors="coerce")
+                invalidos = (valores.isna() | (valores != np.floor(valores))).to_numpy()
+                valores = valores.where(~invalidos, 0)
+
+            fora = np.zeros(len(parte), dtype=bool)
+            if minimo is not None:
+                fora |= ~invalidos & (valores < minimo).to_numpy()
+            if maximo is not None:
+                fora |= ~invalidos & (valores > maximo).to_numpy()
+            total_erros += _record_errors(
+                erros, invalidos | fora, parte, coluna, linhas_arquivo, _range_text(minimo, maximo)
+            )
+            parte[coluna] = valores.to_numpy().astype(dtype)
+
+        for coluna in schema.texto + list(schema.categorias):
+            # Só os valores distintos passam pelo strip; em colunas categóricas eles são poucos
+            brancos = [valor for valor in parte[coluna].dropna().unique() if not valor.strip()]
+            vazios = parte[coluna].isna() | parte[coluna].isin(brancos)
+            total_erros += _record_errors(erros, vazios, parte, coluna, linhas_arquivo, "não pode ficar vazio")
+            aceitos = schema.categorias.get(coluna)
+            if aceitos is not None:
+                desconhecidos = ~vazios & ~parte[coluna].isin(aceitos)
+                total_erros += _record_errors(
+                    erros, desconhecidos, parte, coluna, linhas_arquivo, f"deve ser um de: {', '.join(aceitos)}"
+                )
+
+        partes.append(parte)
+
+    data = pd.concat(partes, ignore_index=True) if partes else pd.DataFrame(columns=colunas)
+
+    if schema.chave is not None:
+        repetidos = data[schema.chave].duplicated(keep=False).to_numpy()
+        total_erros += _record_errors(
+            erros, repetidos, data, schema.chave, np.arange(len(data)) + 2, "valor repetido em outra linha"
+        )
+
+    if total_erros:
+        linhas = [f"Linha {linha}, coluna '{coluna}': '{valor}' {motivo}." for linha, coluna, valor, motivo in erros]
+        if total_erros > len(erros):
+            linhas.append(f"... e mais {total_erros - len(erros)} erro(s).")
+        raise ValueError(f"O arquivo tem {total_erros} erro(s):\n" + "\n".join(linhas))
+
+    for coluna, aceitos in schema.categorias.items():
+        data[coluna] = data[coluna].astype(pd.CategoricalDtype(aceitos) if aceitos is not None else "category")
+    for coluna in opcionais:
+        data[coluna] = data[coluna].fillna("")
+
+    return data
+
+
+def file_digest(path, bloco=1 << 20):
+    """Hash SHA-256 do conteúdo do arquivo, lido em blocos."""
+    resumo = hashlib.sha256()
+    with open(path, "rb") as arquivo:
+        for parte in iter(lambda: arquivo.read(bloco), b""):
+            resumo.update(parte)
+    return resumo.hexdigest()
+
+
+def _cache_key(path, schema):
+    """Chave do cache: conteúdo do CSV, esquema e formato do cache (mudar qualquer um gera outra entrada)."""
+    resumo = hashlib.sha256(file_digest(path).encode())
+    resumo.update(repr((schema, NIVEL_MAXIMO, VERSAO_CACHE)).encode())
+    return resumo.hexdigest()
+
+
+def _write_cache(pasta, data, habilidades):
+    """Grava a entrada em uma pasta temporária e a renomeia no fim, para nunca deixar uma entrada pela metade."""
+    pai = os.path.dirname(pasta)
+    os.makedirs(pai, exist_ok=True)
+    temporaria = tempfile.mkdtemp(dir=pai)
+    try:
+        np.save(os.path.join(temporaria, "habilidades.npy"), np.ascontiguousarray(data[habilidades].to_numpy()))
+        info = data.drop(columns=habilidades)
+        with open(os.path.join(temporaria, "info.pkl"), "wb") as arquivo:
+            pickle.dump((list(data.columns), info), arquivo, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporaria, pasta)
+    except OSError:
+        # Outro processo gravou a mesma entrada antes, ou a pasta não é gravável: o cache é opcional
+        shutil.rmtree(temporaria, ignore_errors=True)
+
+
+def _read_cache(pasta):
+    """Monta o DataFrame a partir de uma entrada do cache, mapeando a matriz de habilidades do disco."""
+    with open(os.path.join(pasta, "info.pkl"), "rb") as arquivo:
+        colunas, info = pickle.load(arquivo)
+
+    # mmap_mode="c": páginas lidas sob demanda e edições feitas só na memória, sem alterar o cache
+    matriz = np.load(os.path.join(pasta, "habilidades.npy"), mmap_mode="c")
+    habilidades = [coluna for coluna in colunas if coluna not in info.columns]
+    skills = pd.DataFrame(matriz, columns=habilidades, copy=False)
+
+    # As colunas de informação vêm antes e depois das habilidades nos CSVs
+    primeira = colunas.index(habilidades[0])
+    antes, depois = colunas[:primeira], colunas[primeira + len(habilidades):]
+    return pd.concat([info[antes], skills, info[depois]], axis=1, copy=False)
+
+
+def load_cached_csv(path, schema, cache_dir=CACHE_DIR, chunksize=CSV_CHUNK_SIZE):
+    """
+    Lê um CSV com read_csv_typed, reaproveitando um cache binário endereçado pelo conteúdo do arquivo.
+
+    A entrada do cache fica em cache_dir/<hash>, com a matriz de habilidades em .npy e as demais colunas,
+    já tipadas, em pickle. Reimportar um arquivo inalterado só calcula o hash e mapeia a matriz, sem
+    interpretar o texto de novo. Arquivos com erro de validação não entram no cache. cache_dir=None
+    desativa o cache.
+    """
+    if cache_dir is None:
+        return read_csv_typed(path, schema, chunksize)
+
+    pasta = os.path.join(cache_dir, _cache_key(path, schema))
+    if os.path.isdir(pasta):
+        try:
+            return _read_cache(pasta)
+        except (OSError, ValueError, EOFError, pickle.UnpicklingError):
+            # Entrada corrompida: descarta e lê o CSV de novo
+            shutil.rmtree(pasta, ignore_errors=True)
+
+    data = read_csv_typed(path, schema, chunksize)
+    habilidades = skill_columns(data.columns, schema)
+    _write_cache(pasta, data, habilidades)
+    return data
+
+
+def load_alunos_csv(path, chunksize=CSV_CHUNK_SIZE, cache_dir=CACHE_DIR):
+    """Lê e valida o CSV de alunos (ver read_csv_typed), usando o cache binário."""
+    return load_cached_csv(path, ESQUEMA_ALUNOS, cache_dir, chunksize)
+
+
+def load_projetos_csv(path, chunksize=CSV_CHUNK_SIZE, cache_dir=CACHE_DIR):
+    """Lê e valida o CSV de projetos (ver read_csv_typed), usando o cache binário."""
+    return load_cached_csv(path, ESQUEMA_PROJETOS, cache_dir, chunksize)
+
+
+def _sql_name(nome):
+    """Nome de tabela entre aspas para o SQL."""
+    return '"' + nome.replace('"', '""') + '"'
+
+
+def _column_info(serie):
+    """Descrição de uma coluna para a sessão: nome, dtype, tipo SQL e, nas categóricas, as categorias."""
+    dtype = serie.dtype
+    info = {"nome": serie.name, "dtype": str(dtype)}
+    if isinstance(dtype, pd.CategoricalDtype):
+        info.update(sql="TEXT", categorias=dtype.categories.tolist(), ordenada=bool(dtype.ordered))
+    elif pd.api.types.is_bool_dtype(dtype) or pd.api.types.is_integer_dtype(dtype):
+        info["sql"] = "INTEGER"
+    elif pd.api.types.is_float_dtype(dtype):
+        info["sql"] = "REAL"
+    else:
+        # Sem tipo declarado, o SQLite guarda cada valor com o próprio tipo (texto continua texto, número número)
+        info.update(sql="", dtype="object")
+    return info
+
+
+def _sql_values(serie):
+    """Valores de uma coluna como tipos nativos do SQLite, com NULL no lugar de NaN."""
+    if pd.api.types.is_bool_dtype(serie.dtype) or pd.api.types.is_integer_dtype(serie.dtype):
+        return serie.to_numpy().tolist()
+    return [_sql_value(valor) for valor in serie.to_numpy(dtype=object).tolist()]
+
+
+def _column_values(info, valores):
+    """Reconstrói uma coluna lida da sessão com o dtype (e as categorias) de quando foi salva."""
+    if "categorias" in info:
+        # Edições podem ter criado categorias novas depois do save_table
+        valores = pd.Series(valores, dtype=object)
+        novas = pd.Index(valores.dropna().unique()).difference(info["categorias"], sort=False)
+        categorias = info["categorias"] + novas.tolist()
+        return pd.Categorical(valores, categories=categorias, ordered=info["ordenada"])
+    if info["dtype"] == "object":
+        return np.array(valores, dtype=object)
+    return pd.Series(valores, dtype=object).astype(info["dtype"]).to_numpy()
+
+
+def _json_attrs(attrs):
+    """attrs do DataFrame em JSON (escalares do NumPy viram tipos do Python; o resto, texto)."""
+    return json.dumps(
+        attrs, ensure_ascii=False, default=lambda valor: valor.item() if isinstance(valor, np.generic) else str(valor)
+    )
+
+
+def _sql_value(valor):
+    """Valor de uma célula como tipo nativo do SQLite (NaN e vazio de categoria viram NULL)."""
+    if valor is None or (isinstance(valor, float) and np.isnan(valor)) or valor is pd.NA:
+        return None
+    return valor.item() if isinstance(valor, np.generic) else valor
+
+
+def _write_values(data, coluna, linhas, valores):
+    """Grava valores nas linhas de uma coluna, registrando antes as categorias novas de colunas categóricas."""
+    serie = data[coluna]
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        novas = pd.Index(pd.unique(np.asarray(valores, dtype=object))).difference(serie.cat.categories)
+        novas = novas[pd.notna(novas)]
+        if len(novas):
+            data[coluna] = serie.cat.add_categories(novas)
+    data.iloc[linhas, data.columns.get_loc(coluna)] = valores
+
+
+class SessionStore:
+    """
+    Sessão de trabalho da interface (alunos, projetos, alocações e edições manuais) em um banco SQLite local.
+
+    Cada DataFrame vira uma tabela SQLite de verdade, uma linha por linha do DataFrame (chave `linha`, a
+    posição) e uma coluna tipada por coluna (INTEGER, REAL ou TEXT). Nomes, dtypes, categorias e attrs
+    ficam em JSON na tabela `tabelas`. O DataFrame inteiro só é gravado quando é importado ou recalculado
+    (save_table); cada edição de células depois disso é um UPDATE pela chave primária, em uma transação
+    (save_cells), e load_table relê as linhas em ordem de chave. Nada é gravado em pickle: o arquivo não
+    depende da versão do pandas e lê-lo não executa código.
+
+    O banco usa journal WAL: uma edição confirmada sobrevive a uma queda do programa.
+    """
+
+    def __init__(self, caminho=SESSION_DB):
+        if caminho != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+        self.caminho = caminho
+        self.conexao = sqlite3.connect(caminho)
+        self.conexao.execute("PRAGMA journal_mode=WAL")
+        self.conexao.execute("PRAGMA synchronous=NORMAL")
+        with self.conexao:
+            if self.conexao.execute("PRAGMA user_version").fetchone()[0] != VERSAO_SESSAO:
+                self._drop_tables()
+            self.conexao.executescript(
+                f"""
+                CREATE TABLE IF NOT EXISTS tabelas (
+                    nome TEXT PRIMARY KEY,
+                    colunas TEXT NOT NULL,
+                    attrs TEXT NOT NULL,
+                    linhas INTEGER NOT NULL,
+                    salvo_em REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS execucoes (
+                    id INTEGER PRIMARY KEY,
+                    criado_em REAL NOT NULL,
+                    metrica TEXT,
+                    objetivo REAL,
+                    gap REAL,
+                    relatorio TEXT
+                );
+                PRAGMA user_version = {VERSAO_SESSAO};
+                """
+            )
+
+    def _drop_tables(self):
+        """Descarta as tabelas de um formato anterior da sessão (as execuções registradas são mantidas)."""
+        antigas = [
+            nome
+            for (nome,) in self.conexao.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table' AND name != 'execucoes'"
+            )
+        ]
+        if antigas:
+            logger.warning("Sessão em um formato anterior: os dados salvos serão descartados.")
+        for nome in antigas:
+            self.conexao.execute(f"DROP TABLE {_sql_name(nome)}")
+
+    def close(self):
+        self.conexao.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def tables(self):
+        """Nomes das tabelas salvas na sessão."""
+        return [nome for (nome,) in self.conexao.execute("SELECT nome FROM tabelas ORDER BY nome")]
+
+    def columns(self, nome):
+        """Colunas da tabela salva, na ordem do DataFrame (lista vazia se a tabela não existe na sessão)."""
+        linha = self.conexao.execute("SELECT colunas FROM tabelas WHERE nome = ?", (nome,)).fetchone()
+        return [] if linha is None else [coluna["nome"] for coluna in json.loads(linha[0])]
+
+    def _save_table(self, nome, data):
+        tabela = _sql_name(f"sessao_{nome}")
+        colunas = [_column_info(data[coluna]) for coluna in data.columns]
+        definicoes = ", ".join(f"c{k} {coluna['sql']}" for k, coluna in enumerate(colunas))
+        self.conexao.execute(f"DROP TABLE IF EXISTS {tabela}")
+        self.conexao.execute(f"CREATE TABLE {tabela} (linha INTEGER PRIMARY KEY, {definicoes})")
+        valores = [_sql_values(data.iloc[:, k]) for k in range(len(colunas))]
+        self.conexao.executemany(
+            f"INSERT INTO {tabela} VALUES (?{', ?' * len(colunas)})", zip(range(len(data)), *valores)
+        )
+        self.conexao.execute(
+            "INSERT OR REPLACE INTO tabelas (nome, colunas, attrs, linhas, salvo_em) VALUES (?, ?, ?, ?, ?)",
+            (nome, json.dumps(colunas, ensure_ascii=False), _json_attrs(data.attrs), len(data), time.time()),
+        )
+
+    def save_table(self, nome, data):
+        """Grava o DataFrame inteiro (com attrs), substituindo a tabela salva e as edições anteriores."""
+        with self.conexao:
+            self._save_table(nome, data)
+
+    def save_cells(self, nome, coluna, linhas, valores):
+        """
+        Grava, em uma única transação, os valores das linhas (posições) de uma coluna da tabela salva.
+
+        Levanta ValueError se a tabela não tem essa coluna (ela foi criada depois do último save_table).
+        """
+        colunas = self.columns(nome)
+        if coluna not in colunas:
+            raise ValueError(f"A tabela '{nome}' da sessão não tem a coluna '{coluna}'.")
+        registros = [
+            (_sql_value(valor), int(linha)) for linha, valor in zip(np.asarray(linhas).tolist(), valores)
+        ]
+        with self.conexao:
+            self.conexao.executemany(
+                f"UPDATE {_sql_name(f'sessao_{nome}')} SET c{colunas.index(coluna)} = ? WHERE linha = ?",
+                registros,
+            )
+
+    def load_table(self, nome):
+        """DataFrame salvo, já com as edições, ou None se a tabela não existe na sessão."""
+        linha = self.conexao.execute("SELECT colunas, attrs FROM tabelas WHERE nome = ?", (nome,)).fetchone()
+        if linha is None:
+            return None
+        colunas, attrs = json.loads(linha[0]), json.loads(linha[1])
+
+        registros = self.conexao.execute(f"SELECT * FROM {_sql_name(f'sessao_{nome}')} ORDER BY linha").fetchall()
+        valores = list(zip(*registros))[1:] if registros else [()] * len(colunas)
+        data = pd.DataFrame(
+            {coluna["nome"]: _column_values(coluna, valores[k]) for k, coluna in enumerate(colunas)},
+            columns=[coluna["nome"] for coluna in colunas],
+        )
+        data.attrs.update(attrs)
+        return data
+
+    def record_run(self, nome, alunos_info):
+        """Registra uma execução da alocação e grava o resultado como a tabela `nome`, na mesma transação."""
+        attrs = alunos_info.attrs
+        relatorio = attrs.get("relatorio")
+        with self.conexao:
+            self.conexao.execute(
+                "INSERT INTO execucoes (criado_em, metrica, objetivo, gap, relatorio) VALUES (?, ?, ?, ?, ?)",
+                (
+                    time.time(),
+                    attrs.get("metrica"),
+                    attrs.get("objetivo"),
+                    attrs.get("gap"),
+                    None if relatorio is None else json.dumps(relatorio, ensure_ascii=False, default=str),
+                ),
+            )
+            self._save_table(nome, alunos_info)
+
+    def runs(self):
+        """Execuções registradas, da mais antiga para a mais recente."""
+        return pd.read_sql_query(
+            "SELECT id, criado_em, metrica, objetivo, gap FROM execucoes ORDER BY id", self.conexao
+        )
@@ -1 +1,412 @@
-# Unit tests for allocation logic
\ No newline at end of file
+# Unit tests for allocation logic
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from core.allocation_solver import build_model, pinned_pairs, solve_allocation, warm_start_pairs  # noqa: E402
+from core.heuristic_solver import solve_heuristic  # noqa: E402
+from utils.config import SolverConfig  # noqa: E402
+
+
+def _coorte(n_alunos=12, n_projetos=4, n_habilidades=5, seed=0):
+    """Gera um par (alunos_df, projetos_df) pequeno no mesmo formato dos CSVs de exemplo."""
+    rng = np.random.default_rng(seed)
+    habilidades = [f"H{k}" for k in range(n_habilidades)]
+
+    alunos = pd.DataFrame({
+        "Nome do Aluno": [f"Aluno{i}" for i in range(n_alunos)],
+        "RA": np.arange(n_alunos) + 1000,
+        "Curso": "Computação",
+        "Projetos Tentados": rng.integers(1, 3, n_alunos),
+        "Pode Comparecer": "Sim",
+    })
+    alunos[habilidades] = rng.integers(0, 6, (n_alunos, n_habilidades))
+    alunos["Projeto 1"] = ""
+    alunos["Projeto 2"] = ""
+
+    projetos = pd.DataFrame({
+        "Codigo do Projeto": [f"C{j}" for j in range(n_projetos)],
+        "Nome do Projeto": [f"Projeto{j}" for j in range(n_projetos)],
+        "Presencial": "Sim",
+    })
+    projetos[habilidades] = rng.integers(0, 6, (n_projetos, n_habilidades))
+    return alunos, projetos
+
+
+def _assinatura(constraint):
+    termos = frozenset((v.name, c) for v, c in constraint.items())
+    return termos, constraint.sense, -constraint.constant
+
+
+def test_build_model_matches_reference_model():
+    rng = np.random.default_rng(1)
+    compatibilidade = rng.integers(0, 50, (6, 3))
+    tentados = np.array([1, 2, 2, 1, 2, 1])
+    fixados = (np.array([1, 4]), np.array([2, 0]))
+
+    model, variaveis, (linhas, colunas) = build_model(compatibilidade, tentados, fixados, 1.5, 4.5)
+
+    assert len(variaveis) == 18
+    assert list(zip(linhas, colunas))[:4] == [(0, 0), (0, 1), (0, 2), (1, 0)]
+    objetivo = {v.name: c for v, c in model.objective.items()}
+    assert objetivo["x_(3,_1)"] == compatibilidade[3, 1]
+
+    esperadas = set()
+    nome = lambda i, j: f"x_({i},_{j})"
+    for i in range(6):
+        pinos = [j for a, j in zip(*fixados) if a == i]
+        for j in pinos:
+            esperadas.add((frozenset({(nome(i, j), 1)}), 0, 1))
+        livres = frozenset((nome(i, j), 1) for j in range(3) if j not in pinos)
+        esperadas.add((livres, 0, tentados[i] - len(pinos)))
+    for j in range(3):
+        termos = frozenset((nome(i, j), 1) for i in range(6))
+        esperadas.add((termos, 1, 1.5))
+        esperadas.add((termos, -1, 4.5))
+
+    assert {_assinatura(c) for c in model.constraints.values()} == esperadas
+
+
+def test_pinned_pairs_rejects_unknown_project():
+    alunos, projetos = _coorte()
+    alunos.loc[3, "Projeto 2"] = "Inexistente"
+    try:
+        pinned_pairs(alunos, projetos["Nome do Projeto"].values)
+    except ValueError as e:
+        assert "Inexistente" in str(e)
+    else:
+        raise AssertionError("ValueError esperado")
+
+
+def test_solve_allocation_respects_pins_and_attempts():
+    alunos, projetos = _coorte()
+    alunos.loc[0, "Projeto 1"] = "Projeto2"
+
+    resultado = solve_allocation(alunos, projetos)
+
+    assert resultado.loc[0, ["Projeto 1", "Projeto 2"]].tolist().count("Projeto2") == 1
+    preenchidos = (resultado[["Projeto 1", "Projeto 2"]] != "").sum(axis=1)
+    assert (preenchidos == alunos["Projetos Tentados"]).all()
+
+
+def _objetivo(resultado, alunos, projetos):
+    habilidades = [c for c in projetos.columns if c.startswith("H")]
+    compatibilidade = alunos[habilidades].values @ projetos[habilidades].values.T
+    coluna = {nome: j for j, nome in enumerate(projetos["Nome do Projeto"])}
+    total = 0
+    for i, row in resultado.iterrows():
+        for col in ["Projeto 1", "Projeto 2"]:
+            if row[col]:
+                total += compatibilidade[i, coluna[row[col]]]
+    return total
+
+
+def test_flow_engine_matches_milp_objective():
+    for seed in range(4):
+        alunos, projetos = _coorte(n_alunos=40, n_projetos=6, seed=seed)
+        alunos.loc[5, "Projeto 1"] = "Projeto1"
+        alunos.loc[7, "Projeto 1"] = "Projeto1"
+
+        milp = solve_allocation(alunos, projetos, engine="milp")
+        flow = solve_allocation(alunos, projetos, engine="flow")
+
+        assert _objetivo(flow, alunos, projetos) == _objetivo(milp, alunos, projetos)
+        cargas = flow[["Projeto 1", "Projeto 2"]].stack().value_counts().drop("", errors="ignore")
+        media = alunos["Projetos Tentados"].sum() / len(projetos)
+        assert cargas.reindex(projetos["Nome do Projeto"], fill_value=0).between(0.8 * media, 1.2 * media).all()
+        assert "Projeto1" in flow.loc[5, ["Projeto 1", "Projeto 2"]].tolist()
+
+
+def test_heuristic_engine_is_feasible_and_bounded():
+    alunos, projetos = _coorte(n_alunos=60, n_projetos=6, seed=3)
+    alunos.loc[2, "Projeto 1"] = "Projeto4"
+
+    exato = solve_allocation(alunos, projetos, engine="flow")
+    heuristica = solve_allocation(alunos, projetos, engine="heuristic")
+
+    preenchidos = (heuristica[["Projeto 1", "Projeto 2"]] != "").sum(axis=1)
+    assert (preenchidos == alunos["Projetos Tentados"]).all()
+    assert "Projeto4" in heuristica.loc[2, ["Projeto 1", "Projeto 2"]].tolist()
+
+    cargas = heuristica[["Projeto 1", "Projeto 2"]].stack().value_counts().drop("", errors="ignore")
+    media = alunos["Projetos Tentados"].sum() / len(projetos)
+    assert cargas.reindex(projetos["Nome do Projeto"], fill_value=0).between(0.8 * media, 1.2 * media).all()
+
+    assert heuristica.attrs["objetivo"] == _objetivo(heuristica, alunos, projetos)
+    assert heuristica.attrs["objetivo"] <= exato.attrs["objetivo"] <= heuristica.attrs["limite_superior"]
+
+
+def test_heuristic_flow_fallback_respects_the_time_budget(caplog):
+    # A gulosa lota o projeto 0 com os alunos 1 e 2 e o aluno 0 fica sem segundo projeto
+    compatibilidade = np.array([[1.0, 1.0], [5.0, 0.0], [5.0, 0.0]])
+    restantes = np.array([2, 1, 1])
+    sem_fixados = (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64))
+
+    try:
+        solve_heuristic(compatibilidade, restantes, sem_fixados, 1, 2, time_limit=0)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("o fluxo de reserva deveria respeitar o orçamento de tempo")
+
+    caplog.set_level("INFO", logger="alocacao")
+    atribuicao, objetivo, _ = solve_heuristic(compatibilidade, restantes, sem_fixados, 1, 2, time_limit=5)
+    assert atribuicao.sum(axis=1).tolist() == [2, 1, 1]
+    assert objetivo == 7.0
+    assert "partindo do fluxo de custo mínimo" in caplog.text
+
+
+def test_warm_start_pairs_match_students_by_ra():
+    alunos, projetos = _coorte(n_alunos=4)
+    anterior = pd.DataFrame({
+        "RA": [1003, 1000, 9999],
+        "Projeto 1": ["Projeto1", "Projeto0", "Projeto2"],
+        "Projeto 2": ["Removido", "Projeto3", ""],
+    })
+
+    linhas, colunas = warm_start_pairs(alunos, anterior, projetos["Nome do Projeto"].values)
+
+    assert sorted(zip(linhas.tolist(), colunas.tolist())) == [(0, 0), (0, 3), (3, 1)]
+
+
+def test_rebalance_keeps_edits_and_restores_load_window():
+    from core.incremental import rebalance_allocation
+
+    alunos, projetos = _coorte(n_alunos=60, n_projetos=6, seed=5)
+    alocacao = solve_allocation(alunos, projetos, engine="flow")
+
+    antigo = alocacao.at[0, "Projeto 1"]
+    novo = next(nome for nome in projetos["Nome do Projeto"] if nome not in alocacao.loc[0, ["Projeto 1", "Projeto 2"]].tolist())
+    alocacao.at[0, "Projeto 1"] = novo
+
+    nova, delta, tamanho = rebalance_allocation(alunos, projetos, alocacao, [(0, "Projeto 1", antigo)])
+
+    assert nova.at[0, "Projeto 1"] == novo
+    assert tamanho < len(alunos)
+    preenchidos = (nova[["Projeto 1", "Projeto 2"]] != "").sum(axis=1)
+    assert (preenchidos == alunos["Projetos Tentados"]).all()
+    cargas = nova[["Projeto 1", "Projeto 2"]].stack().value_counts().drop("", errors="ignore")
+    media = alunos["Projetos Tentados"].sum() / len(projetos)
+    assert cargas.reindex(projetos["Nome do Projeto"], fill_value=0).between(0.8 * media, 1.2 * media).all()
+    assert nova.attrs["objetivo"] == _objetivo(nova, alunos, projetos)
+    assert _objetivo(nova, alunos, projetos) - _objetivo(alocacao, alunos, projetos) == delta
+
+
+def test_rebalance_refills_a_cleared_cell_with_the_allocation_tolerance():
+    from core.incremental import rebalance_allocation
+
+    alunos, projetos = _coorte(n_alunos=60, n_projetos=6, seed=5)
+    alocacao = solve_allocation(alunos, projetos, engine="flow", tolerancia=0.05)
+    assert alocacao.attrs["tolerancia"] == 0.05
+
+    i = int(np.flatnonzero(alunos["Projetos Tentados"] == 2)[0])
+    antigo = alocacao.at[i, "Projeto 1"]
+    alocacao.at[i, "Projeto 1"] = ""
+
+    nova, delta, _ = rebalance_allocation(alunos, projetos, alocacao, [(i, "Projeto 1", antigo)])
+
+    # A célula apagada não prende o aluno a ficar com um projeto só
+    assert (nova.loc[i, ["Projeto 1", "Projeto 2"]] != "").all()
+    preenchidos = (nova[["Projeto 1", "Projeto 2"]] != "").sum(axis=1)
+    assert (preenchidos == alunos["Projetos Tentados"]).all()
+    cargas = nova[["Projeto 1", "Projeto 2"]].stack().value_counts().drop("", errors="ignore")
+    media = alunos["Projetos Tentados"].sum() / len(projetos)
+    assert cargas.reindex(projetos["Nome do Projeto"], fill_value=0).between(0.95 * media, 1.05 * media).all()
+    assert nova.attrs["objetivo"] == _objetivo(nova, alunos, projetos)
+
+
+def test_highs_uses_the_executable_when_there_is_a_warm_start(monkeypatch, caplog):
+    import pulp
+    from core.allocation_solver import make_solver
+
+    config = SolverConfig(backend="HIGHS", msg=False)
+    monkeypatch.setattr(pulp.HiGHS, "available", lambda self: True)
+
+    monkeypatch.setattr(pulp.HiGHS_CMD, "available", lambda self: True)
+    assert isinstance(make_solver(config, warm_start=True), pulp.HiGHS_CMD)
+    assert isinstance(make_solver(config), pulp.HiGHS)
+
+    # Sem o executável, a solução inicial é descartada com um aviso
+    monkeypatch.setattr(pulp.HiGHS_CMD, "available", lambda self: None)
+    with caplog.at_level("WARNING", logger="alocacao"):
+        assert isinstance(make_solver(config, warm_start=True), pulp.HiGHS)
+    assert "solução inicial" in caplog.text
+
+
+def test_top_k_pairs_keep_pins_and_feed_a_sparse_model():
+    from core.candidates import top_k_pairs
+
+    rng = np.random.default_rng(2)
+    compatibilidade = rng.integers(0, 50, (30, 10)).astype(np.float32)
+    fixados = (np.array([4]), np.array([int(np.argmin(compatibilidade[4]))]))
+
+    linhas, colunas = top_k_pairs(compatibilidade, 3, [fixados])
+
+    assert len(linhas) == 30 * 3 + 1
+    assert np.all(np.diff(linhas * 10 + colunas) > 0)
+    assert (4, fixados[1][0]) in set(zip(linhas.tolist(), colunas.tolist()))
+
+    tentados = np.ones(30, dtype=np.int64)
+    model, variaveis, pares = build_model(compatibilidade, tentados, fixados, 2, 4, pares=(linhas, colunas))
+    assert len(variaveis) == len(linhas)
+    assert all(a is b for a, b in zip(pares, (linhas, colunas)))
+
+
+def test_top_k_widens_until_feasible_and_keeps_pins():
+    alunos, projetos = _coorte(n_alunos=40, n_projetos=8, seed=6)
+    alunos.loc[9, "Projeto 1"] = "Projeto5"
+    # Todos preferem o mesmo projeto: com k = 1 o modelo podado é inviável
+    alunos.loc[:, "H0"] = 5
+    projetos.loc[:, "H0"] = 0
+    projetos.loc[0, "H0"] = 5
+
+    completo = solve_allocation(alunos, projetos, solver_config=SolverConfig(msg=False))
+    podado = solve_allocation(alunos, projetos, solver_config=SolverConfig(msg=False, top_k=1))
+
+    assert "Projeto5" in podado.loc[9, ["Projeto 1", "Projeto 2"]].tolist()
+    preenchidos = (podado[["Projeto 1", "Projeto 2"]] != "").sum(axis=1)
+    assert (preenchidos == alunos["Projetos Tentados"]).all()
+    cargas = podado[["Projeto 1", "Projeto 2"]].stack().value_counts().drop("", errors="ignore")
+    media = alunos["Projetos Tentados"].sum() / len(projetos)
+    assert cargas.reindex(projetos["Nome do Projeto"], fill_value=0).between(0.8 * media, 1.2 * media).all()
+    assert podado.attrs["objetivo"] <= completo.attrs["objetivo"] <= podado.attrs["limite_superior"]
+
+
+def test_run_report_records_phases_without_printing(tmp_path, capsys):
+    import json
+
+    from core.report import RunReport
+
+    alunos, projetos = _coorte(n_alunos=20, n_projetos=4, seed=7)
+    relatorio = RunReport(top_k_diagnostico=2)
+
+    resultado = solve_allocation(alunos, projetos, solver_config=SolverConfig(msg=False), report=relatorio)
+
+    assert capsys.readouterr().out == ""
+    dados = resultado.attrs["relatorio"]
+    assert [fase["nome"] for fase in dados["fases"]] == ["preprocessamento", "matriz", "modelo", "resolucao", "extracao"]
+    assert all(fase["segundos"] >= 0 for fase in dados["fases"])
+    assert dados["variaveis"] == 20 * 4 and dados["restricoes"] == 20 + 2 * 4
+    assert dados["status_solver"] == "Optimal" and dados["objetivo"] == resultado.attrs["objetivo"]
+    assert sum(dados["cargas"].values()) == alunos["Projetos Tentados"].sum()
+
+    compatibilidade = alunos[projetos.columns[3:]].to_numpy() @ projetos[projetos.columns[3:]].to_numpy().T
+    primeiro = dados["diagnostico"][0]
+    assert primeiro["top"][0][1] == compatibilidade[0].max()
+    assert primeiro["alocados"] == [p for p in resultado.loc[0, ["Projeto 1", "Projeto 2"]] if p]
+
+    caminho = tmp_path / "relatorio.json"
+    relatorio.save(caminho)
+    assert json.loads(caminho.read_text(encoding="utf-8"))["variaveis"] == 80
+
+    assert "diagnostico" not in solve_allocation(alunos, projetos, engine="flow").attrs["relatorio"]
+
+
+def test_peak_rss_unit_follows_the_platform_not_the_value(monkeypatch):
+    import core.report as report
+
+    if report.resource is None:  # Windows
+        return
+    uso = type("Uso", (), {})()
+    monkeypatch.setattr(report.resource, "getrusage", lambda quem: uso)
+
+    # 100 MB: em bytes no macOS (abaixo de 4 GiB, o que enganava a conversão pelo tamanho) e em KB no Linux
+    monkeypatch.setattr(report.sys, "platform", "darwin")
+    uso.ru_maxrss = 100 * 2**20
+    assert report._peak_rss_mb() == 100.0
+    monkeypatch.setattr(report.sys, "platform", "linux")
+    uso.ru_maxrss = 100 * 2**10
+    assert report._peak_rss_mb() == 100.0
+
+
+def test_assignment_matrix_matches_written_columns():
+    alunos, projetos = _coorte(n_alunos=30, n_projetos=5, seed=8)
+    alunos.loc[4, "Projeto 2"] = "Projeto3"
+
+    for engine in ("milp", "flow"):
+        resultado, atribuicao = solve_allocation(
+            alunos, projetos, engine=engine, solver_config=SolverConfig(msg=False), return_assignment=True
+        )
+
+        assert atribuicao.shape == (30, 5) and atribuicao.dtype == bool
+        assert (atribuicao.sum(axis=1) == alunos["Projetos Tentados"]).all()
+        nomes = projetos["Nome do Projeto"].to_numpy()
+        for i in range(30):
+            escritos = [p for p in resultado.loc[i, ["Projeto 1", "Projeto 2"]] if p]
+            assert escritos == nomes[atribuicao[i]].tolist()
+        assert atribuicao[4, 3]
+        assert list(resultado.attrs["relatorio"]["cargas"].values()) == atribuicao.sum(axis=0).tolist()
+
+
+def test_insert_students_moves_only_what_the_window_requires():
+    from core.incremental import insert_students
+
+    alunos, projetos = _coorte(n_alunos=110, n_projetos=10, seed=7)
+    alunos["Projetos Tentados"] = 1
+    existentes, novos = alunos.iloc[:100].reset_index(drop=True), alunos.iloc[100:].reset_index(drop=True)
+    alocacao = solve_allocation(existentes, projetos, engine="flow", tolerancia=0.0)
+
+    # Os dez novos alunos vêm pré-alocados no mesmo projeto: com janela exata, nove dos dez alunos que já
+    # estavam nele precisam sair, e ninguém mais
+    novos["Projeto 1"] = "Projeto3"
+    nova, todos, movidos = insert_students(existentes, projetos, alocacao, novos, tolerancia=0.0)
+
+    assert len(nova) == len(todos) == 110
+    assert (nova.loc[100:, "Projeto 1"] == "Projeto3").all()
+    assert movidos == (nova.loc[:99, "Projeto 1"] != alocacao["Projeto 1"]).sum() == 9
+    assert (nova["Projeto 1"].value_counts() == 11).all()
+    assert nova.attrs["objetivo"] == _objetivo(nova, todos, projetos)
+
+    # Com folga na janela, os novos alunos entram sem mover ninguém; a célula apagada não fica fixa e
+    # o aluno volta a ter um projeto
+    novos["Projeto 1"] = ""
+    alocacao.at[0, "Projeto 1"] = ""
+    nova, todos, movidos = insert_students(existentes, projetos, alocacao, novos, fixas={(0, "Projeto 1")})
+    assert movidos == 0 and (nova["Projeto 1"] != "").all()
+
+
+def test_on_incumbent_streams_feasible_solutions_up_to_the_final_one():
+    import pulp
+    from core.report import RunReport
+
+    alunos, projetos = _coorte(n_alunos=60, n_projetos=6, seed=4)
+    alunos.loc[3, "Projeto 1"] = "Projeto2"
+
+    execucoes = [("heuristic", SolverConfig(msg=False)), ("milp", SolverConfig(msg=False))]
+    if pulp.HiGHS().available():
+        execucoes.append(("milp", SolverConfig(backend="HIGHS", msg=False)))
+    for engine, config in execucoes:
+        parciais, relatorio = [], RunReport()
+        final = solve_allocation(
+            alunos,
+            projetos,
+            engine=engine,
+            solver_config=config,
+            report=relatorio,
+            on_incumbent=lambda parcial, objetivo, limite: parciais.append((parcial, objetivo, limite)),
+        )
+
+        assert len(parciais) >= 1 and relatorio.dados["solucoes_parciais"] == len(parciais)
+        objetivos = [objetivo for _, objetivo, _ in parciais]
+        assert objetivos == sorted(objetivos) and objetivos[-1] <= final.attrs["objetivo"]
+        for parcial, objetivo, limite in parciais:
+            assert parcial.attrs["objetivo"] == objetivo == _objetivo(parcial, alunos, projetos)
+            assert objetivo <= final.attrs["objetivo"] <= limite
+            assert parcial.attrs["parcial"] and parcial.attrs["relatorio"]["status_solver"] == "Parcial"
+            assert parcial.attrs["relatorio"]["fases"][0]["nome"] == "preprocessamento"
+            assert "parcial" not in final.attrs
+            assert "Projeto2" in parcial.loc[3, ["Projeto 1", "Projeto 2"]].tolist()
+            preenchidos = (parcial[["Projeto 1", "Projeto 2"]] != "").sum(axis=1)
+            assert (preenchidos == alunos["Projetos Tentados"]).all()
+        if config.backend == "HIGHS":
+            # O HiGHS envia as soluções que encontra, não só a gulosa inicial: a última é a ótima
+            assert objetivos[-1] == final.attrs["objetivo"]
+
+    # O fluxo não tem soluções intermediárias
+    parciais = []
+    solve_allocation(alunos, projetos, engine="flow", on_incumbent=lambda *args: parciais.append(args))
+    assert parciais == []
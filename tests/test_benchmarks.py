@@ -0,0 +1,47 @@
+# Unit tests for the benchmark suite
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "benchmarks"))
+
+from cohort import generate_cohort, skill_names  # noqa: E402
+from core.allocation_solver import pinned_pairs, split_info  # noqa: E402
+from run_benchmarks import compare, main  # noqa: E402
+from utils.file_manager import load_alunos_csv, load_projetos_csv  # noqa: E402
+
+
+def test_generated_cohort_follows_csv_schema(tmp_path):
+    alunos, projetos = generate_cohort(500, 12, fracao_fixados=0.1, seed=3)
+    alunos.to_csv(tmp_path / "alunos.csv", index=False)
+    projetos.to_csv(tmp_path / "projetos.csv", index=False)
+
+    alunos = load_alunos_csv(tmp_path / "alunos.csv", cache_dir=None)
+    projetos = load_projetos_csv(tmp_path / "projetos.csv", cache_dir=None)
+
+    assert list(alunos.columns[5:-2]) == skill_names()
+    assert set(alunos["Projetos Tentados"].unique()) == {0, 1, 2}
+    alunos_info, projetos_info = split_info(alunos, projetos)
+    linhas, colunas = pinned_pairs(alunos_info, projetos_info["Nome do Projeto"].values)
+    assert len(linhas) == round(0.1 * (alunos["Projetos Tentados"] > 0).sum())
+    assert (alunos["Pode Comparecer"].to_numpy()[linhas] == projetos["Presencial"].to_numpy()[colunas]).all()
+
+
+def test_benchmark_records_phases_and_compares_commits(tmp_path, capsys):
+    saida = tmp_path / "resultados.csv"
+
+    assert main(["--tamanhos", "60x4", "--engines", "flow", "--repeticoes", "2", "--saida", str(saida)]) == 0
+
+    resultados = pd.read_csv(saida)
+    # Uma linha por fase e uma de total, em cada repetição (o fluxo não tem a fase "modelo")
+    fases = ["preprocessamento", "matriz", "resolucao", "extracao", "total"]
+    assert resultados["fase"].tolist() == fases * 2
+    assert resultados.loc[resultados["fase"] == "total", "objetivo"].notna().all()
+
+    anterior = resultados.assign(commit="abc123", segundos=resultados["segundos"] * 2)
+    anterior.to_csv(saida, mode="a", header=False, index=False)
+    tabela = compare(saida, resultados["commit"].iloc[0], "abc123")
+    assert tabela["fase"].tolist() == fases
+    assert (tabela["razao"] <= 0.5).all()
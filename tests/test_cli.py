@@ -0,0 +1,69 @@
+# Unit tests for the command-line entry point
+import json
+import os
+import subprocess
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from cli import main  # noqa: E402
+
+DATA = os.path.join(os.path.dirname(__file__), "..", "data")
+ALUNOS = os.path.join(DATA, "alunos_exemplo_completo.csv")
+PROJETOS = os.path.join(DATA, "projetos_exemplo_completo.csv")
+
+
+def test_cli_writes_allocation_and_report(tmp_path, capsys):
+    saida, relatorio = tmp_path / "alocacao.csv", tmp_path / "relatorio.json"
+
+    codigo = main([ALUNOS, PROJETOS, "-o", str(saida), "-r", str(relatorio), "--engine", "flow", "--sem-cache"])
+
+    assert codigo == 0
+    alocacao = pd.read_csv(saida, keep_default_na=False)
+    assert len(alocacao) == len(pd.read_csv(ALUNOS))
+    assert ((alocacao[["Projeto 1", "Projeto 2"]] != "").sum(axis=1) == alocacao["Projetos Tentados"]).all()
+    dados = json.loads(relatorio.read_text(encoding="utf-8"))
+    assert dados["fases"][0]["nome"] == "leitura" and dados["engine"] == "flow"
+    assert f"{dados['objetivo']:.2f}" in capsys.readouterr().out
+
+    assert main(["inexistente.csv", PROJETOS, "-o", str(saida)]) == 1
+    assert "inexistente.csv" in capsys.readouterr().err
+
+
+def test_cli_does_not_import_qt_or_pulp_for_flow_engine(tmp_path):
+    src = os.path.join(os.path.dirname(__file__), "..", "src")
+    argumentos = [ALUNOS, PROJETOS, "-o", str(tmp_path / "a.csv"), "--engine", "flow", "--sem-cache"]
+    codigo = (
+        f"import sys; sys.path.insert(0, {src!r}); import cli; cli.main({argumentos!r}); "
+        "print(sorted(m for m in ('PyQt5', 'pulp', 'gui') if m in sys.modules))"
+    )
+
+    saida = subprocess.run([sys.executable, "-c", codigo], capture_output=True, text=True, check=True).stdout
+
+    assert saida.strip().splitlines()[-1] == "[]"
+
+
+def test_cli_rejects_options_that_would_be_ignored(tmp_path, capsys):
+    cenarios = tmp_path / "cenarios.json"
+    cenarios.write_text(json.dumps({"tolerancia": [0.1, 0.2]}), encoding="utf-8")
+    base = [ALUNOS, PROJETOS, "-o", str(tmp_path / "a.csv")]
+
+    for extras, mensagem in (
+        (["--cenarios", str(cenarios), "--particao", "presencial", "-r", "r.json"], "--particao, -r/--relatorio"),
+        (["--cenarios", str(cenarios), "--tolerancia", "0"], "--tolerancia"),
+        (["--comparar-particao"], "--comparar-particao exige --particao"),
+        (["--engine", "flow", "--tempo-limite", "0", "--backend", "highs"], "--backend, --tempo-limite"),
+        (["--engine", "heuristic", "--gap", "0.01", "--log-solver"], "a engine heuristic não usa --gap, --log-solver"),
+    ):
+        try:
+            main(base + extras)
+        except SystemExit as e:
+            assert e.code == 2
+        else:
+            raise AssertionError("SystemExit esperado")
+        assert mensagem in capsys.readouterr().err
+
+    # O tempo limite vale também para a engine heurística
+    assert main(base + ["--engine", "heuristic", "--tempo-limite", "0.2", "--sem-cache"]) == 0
@@ -0,0 +1,59 @@
+# Unit tests for allocation export
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from core.allocation_solver import solve_allocation  # noqa: E402
+from core.export import binary_extension, export_allocation, roster_groups  # noqa: E402
+from test_allocation import _coorte  # noqa: E402
+
+
+def test_roster_groups_match_filtering_each_project_and_course():
+    alunos, projetos = _coorte(n_alunos=40, n_projetos=5, seed=6)
+    alunos["Curso"] = np.where(np.arange(40) % 3 == 0, "Matemática", "Computação")
+    resultado = solve_allocation(alunos, projetos, engine="flow")
+
+    grupos = roster_groups(resultado)
+
+    for nome in projetos["Nome do Projeto"]:
+        esperado = np.flatnonzero((resultado["Projeto 1"] == nome) | (resultado["Projeto 2"] == nome))
+        assert grupos["projetos"][nome].tolist() == esperado.tolist()
+    assert sorted(grupos["cursos"]) == ["Computação", "Matemática"]
+    assert grupos["cursos"]["Matemática"].tolist() == list(range(0, 40, 3))
+
+
+def test_export_allocation_writes_every_roster_in_both_formats(tmp_path):
+    alunos, projetos = _coorte(n_alunos=30, n_projetos=4, seed=7)
+    projetos.loc[1, "Nome do Projeto"] = "Projeto/1"  # vira um nome de arquivo seguro
+    projetos.loc[2, "Nome do Projeto"] = "Projeto:1"  # mesmo nome de arquivo: ganha sufixo
+    resultado = solve_allocation(alunos, projetos, engine="flow")
+    progresso = []
+
+    arquivos = export_allocation(resultado, tmp_path, max_workers=3, progress=lambda f, t: progresso.append((f, t)))
+
+    ext = binary_extension()
+    nomes = {os.path.relpath(arquivo, tmp_path) for arquivo in arquivos}
+    listas = ["alocacao", "cursos/Computação", "projetos/Projeto0", "projetos/Projeto_1", "projetos/Projeto_1_2",
+              "projetos/Projeto3"]
+    assert nomes == {f"{lista}.{formato}" for lista in listas for formato in ("csv", ext)}
+    assert progresso == [(feitos, 12) for feitos in range(2, 13, 2)]  # uma chamada por lista
+
+    global_csv = pd.read_csv(tmp_path / "alocacao.csv", keep_default_na=False)
+    assert len(global_csv) == len(resultado)
+    lista = pd.read_csv(tmp_path / "projetos" / "Projeto_1_2.csv", keep_default_na=False)
+    assert ((lista["Projeto 1"] == "Projeto:1") | (lista["Projeto 2"] == "Projeto:1")).all()
+    binario = tmp_path / "projetos" / f"Projeto_1_2.{ext}"
+    recarregado = pd.read_parquet(binario) if ext == "parquet" else pd.read_pickle(binario)
+    assert recarregado["RA"].tolist() == lista["RA"].tolist()
+
+    try:
+        export_allocation(resultado, tmp_path, formatos=("xlsx",))
+    except ValueError as e:
+        assert "xlsx" in str(e)
+    else:
+        raise AssertionError("ValueError esperado")
@@ -0,0 +1,62 @@
+# Unit tests for the feasibility pre-check
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from core.allocation_solver import solve_allocation  # noqa: E402
+from core.feasibility import InfeasibleAllocationError, check_feasibility  # noqa: E402
+from core.report import RunReport  # noqa: E402
+from test_allocation import _coorte  # noqa: E402
+
+
+def _tipos(conflitos):
+    return [conflito.tipo for conflito in conflitos]
+
+
+def test_check_feasibility_lists_conflicting_students_and_projects():
+    tentados = np.array([1, 1, 2, 1, 1, 1])
+    nomes_alunos, nomes_projetos = [f"a{i}" for i in range(6)], ["P0", "P1", "P2"]
+
+    assert check_feasibility(tentados, (np.array([0]), np.array([1])), 1.5, 3.5, nomes_alunos, nomes_projetos) == []
+
+    # a0 tem P0 fixado duas vezes, a3 tem P1 e P2 mas tenta um; P0 fica com 4 pré-alocações e o máximo é 2
+    fixados = np.array([0, 0, 1, 5, 3, 3]), np.array([0, 0, 0, 0, 1, 2])
+    conflitos = check_feasibility(tentados, fixados, 1.5, 2.5, nomes_alunos, nomes_projetos)
+
+    # As pré-alocações forçam ao menos 4 + 2 + 2 alocações, mais do que as 7 tentadas
+    assert _tipos(conflitos) == ["fixado_repetido", "fixados_demais", "projeto_sobrecarregado", "demanda_total"]
+    assert conflitos[0].alunos == ["a0"]
+    assert conflitos[1].alunos == ["a0", "a3"]
+    assert conflitos[2].projetos == ["P0"] and conflitos[2].alunos == ["a0", "a1", "a5"]
+    assert "P0 (4)" in conflitos[2].mensagem
+
+    # Janela sem inteiro, demanda maior do que cabe nos projetos e alunos que tentam projetos demais
+    vazio = np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    assert _tipos(check_feasibility(tentados, vazio, 2.2, 2.8, nomes_alunos, nomes_projetos)) == ["janela_vazia"]
+    assert _tipos(check_feasibility(tentados, vazio, 0.0, 2.0, nomes_alunos, nomes_projetos)) == ["demanda_total"]
+    assert _tipos(check_feasibility(tentados * 2, vazio, 0.0, 9.0, nomes_alunos, nomes_projetos)) == [
+        "tentados_demais"
+    ]
+
+
+def test_solve_allocation_rejects_conflicts_before_building_the_matrix():
+    alunos, projetos = _coorte(n_alunos=20, n_projetos=4, seed=2)
+    alunos.loc[:9, "Projeto 1"] = "Projeto0"
+    alunos.loc[:9, "Projetos Tentados"] = 1
+    relatorio = RunReport()
+
+    try:
+        solve_allocation(alunos, projetos, report=relatorio)
+    except InfeasibleAllocationError as e:
+        assert _tipos(e.conflitos)[0] == "projeto_sobrecarregado"
+        assert "Projeto0 (10)" in str(e)
+        assert e.conflitos[0].alunos == list(range(10))
+    else:
+        raise AssertionError("InfeasibleAllocationError esperado")
+
+    assert [fase["nome"] for fase in relatorio.fases] == ["preprocessamento"]
+    assert relatorio.dados["conflitos"][0]["projetos"] == ["Projeto0"]
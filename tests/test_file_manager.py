@@ -0,0 +1,148 @@
+# Unit tests for file handling
+import os
+import sqlite3
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from utils.config import NIVEL_MAXIMO  # noqa: E402
+from utils.file_manager import (  # noqa: E402
+    ESQUEMA_ALUNOS, SessionStore, integer_ranges, load_alunos_csv, load_projetos_csv
+)
+
+DATA = os.path.join(os.path.dirname(__file__), "..", "data")
+
+
+def test_typed_loader_matches_plain_read_with_compact_dtypes():
+    caminho = os.path.join(DATA, "alunos_exemplo_completo.csv")
+    bruto = pd.read_csv(caminho)
+
+    alunos = load_alunos_csv(caminho, chunksize=64, cache_dir=None)
+
+    assert list(alunos.columns) == list(bruto.columns)
+    assert alunos["RA"].dtype == np.int64
+    assert isinstance(alunos["Curso"].dtype, pd.CategoricalDtype)
+    assert list(alunos["Pode Comparecer"].cat.categories) == ["Sim", "Não"]
+    habilidades = alunos.columns[5:]
+    assert (alunos[habilidades].dtypes == np.uint8).all()
+    assert (alunos[habilidades].to_numpy() == bruto[habilidades].to_numpy()).all()
+    assert alunos.memory_usage(deep=True).sum() < bruto.memory_usage(deep=True).sum() / 3
+
+    # As telas de edição usam as mesmas faixas da importação
+    limites = integer_ranges(alunos.columns, ESQUEMA_ALUNOS)
+    assert limites["RA"] == ("int64", 0, None)
+    assert limites["Projetos Tentados"] == ("uint8", 0, 2)
+    assert all(limites[coluna] == ("uint8", 0, NIVEL_MAXIMO) for coluna in habilidades)
+    assert set(limites) == {"RA", "Projetos Tentados", *habilidades}
+
+    projetos = load_projetos_csv(os.path.join(DATA, "projetos_exemplo_completo.csv"), cache_dir=None)
+    assert (projetos[projetos.columns[3:]].dtypes == np.uint8).all()
+
+
+def test_typed_loader_reports_errors_by_file_line(tmp_path):
+    alunos = pd.read_csv(os.path.join(DATA, "alunos_exemplo_completo.csv")).head(40).astype(object)
+    alunos.loc[3, "Python"] = 9
+    alunos.loc[25, "Pode Comparecer"] = "Talvez"
+    alunos.loc[30, "RA"] = alunos.loc[31, "RA"]
+    caminho = tmp_path / "alunos.csv"
+    alunos.to_csv(caminho, index=False)
+
+    try:
+        load_alunos_csv(caminho, chunksize=16, cache_dir=tmp_path / "cache")
+    except ValueError as e:
+        mensagem = str(e)
+    else:
+        raise AssertionError("ValueError esperado")
+
+    assert "4 erro(s)" in mensagem
+    assert "Linha 5, coluna 'Python'" in mensagem
+    assert "Linha 27, coluna 'Pode Comparecer'" in mensagem
+    assert "Linha 32, coluna 'RA'" in mensagem and "Linha 33, coluna 'RA'" in mensagem
+
+    sem_coluna = tmp_path / "sem_ra.csv"
+    alunos.drop(columns="RA").to_csv(sem_coluna, index=False)
+    try:
+        load_alunos_csv(sem_coluna, cache_dir=None)
+    except ValueError as e:
+        assert "RA" in str(e)
+    else:
+        raise AssertionError("ValueError esperado")
+
+    # Arquivos com erro não entram no cache
+    assert not (tmp_path / "cache").exists() or not os.listdir(tmp_path / "cache")
+
+
+def test_cache_reuses_parsed_file_until_content_changes(tmp_path):
+    caminho = tmp_path / "alunos.csv"
+    pd.read_csv(os.path.join(DATA, "alunos_exemplo_completo.csv")).to_csv(caminho, index=False)
+    cache = tmp_path / "cache"
+
+    lido = load_alunos_csv(caminho, cache_dir=cache)
+    mapeado = load_alunos_csv(caminho, cache_dir=cache)
+
+    assert len(os.listdir(cache)) == 1
+    assert mapeado.equals(lido)
+    assert (mapeado.dtypes == lido.dtypes).all()
+
+    # Editar o DataFrame carregado do cache não altera o cache
+    mapeado.iat[0, 5] = 0 if lido.iat[0, 5] else 1
+    assert load_alunos_csv(caminho, cache_dir=cache).iat[0, 5] == lido.iat[0, 5]
+
+    alterado = pd.read_csv(caminho)
+    alterado.loc[0, "Python"] = 0 if alterado.loc[0, "Python"] else 1
+    alterado.to_csv(caminho, index=False)
+    assert load_alunos_csv(caminho, cache_dir=cache).at[0, "Python"] == alterado.loc[0, "Python"]
+    assert len(os.listdir(cache)) == 2
+
+
+def test_session_store_applies_cell_edits_on_reload(tmp_path):
+    caminho = str(tmp_path / "sessao.sqlite3")
+    alunos = load_alunos_csv(os.path.join(DATA, "alunos_exemplo_completo.csv"), cache_dir=None)
+    alunos.attrs["objetivo"] = 10.0
+
+    with SessionStore(caminho) as sessao:
+        sessao.save_table("alunos_data", alunos)
+        sessao.save_cells("alunos_data", "Projetos Tentados", [3, 4], np.array([2, 0], dtype=np.uint8))
+        sessao.save_cells("alunos_data", "Curso", [5], ["Física"])
+        sessao.save_cells("alunos_data", "Curso", [5], ["Matemática"])  # a mesma célula só é regravada
+        sessao.record_run("alunos_info", alunos)
+
+        # Tabela de verdade, com colunas tipadas, e não um DataFrame serializado
+        tipos = dict(
+            sessao.conexao.execute("SELECT name, type FROM pragma_table_info('sessao_alunos_data')").fetchall()
+        )
+        assert tipos["linha"] == "INTEGER" and tipos["c1"] == "INTEGER" and tipos["c2"] == "TEXT"
+        assert sessao.conexao.execute(
+            "SELECT c3 FROM sessao_alunos_data WHERE linha = 4"
+        ).fetchone() == (0,)
+        assert sessao.columns("alunos_data") == list(alunos.columns)
+
+    with SessionStore(caminho) as sessao:
+        recarregado = sessao.load_table("alunos_data")
+        assert sessao.tables() == ["alunos_data", "alunos_info"]
+        assert sessao.load_table("projetos_data") is None
+        assert sessao.runs()["objetivo"].tolist() == [10.0]
+
+        assert recarregado["Projetos Tentados"].dtype == np.uint8
+        assert recarregado["Projetos Tentados"].iloc[3:5].tolist() == [2, 0]
+        assert recarregado["Curso"].iloc[5] == "Matemática"
+        assert isinstance(recarregado["Curso"].dtype, pd.CategoricalDtype)
+        assert recarregado.attrs["objetivo"] == 10.0
+        intocadas = np.r_[0:3, 6:len(alunos)]
+        pd.testing.assert_frame_equal(recarregado.iloc[intocadas], alunos.iloc[intocadas], check_categorical=False)
+
+        try:
+            sessao.save_cells("alunos_data", "Projeto 1", [0], ["Projeto A"])
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("a coluna não existe na tabela salva")
+
+    # Um banco no formato anterior (DataFrames em pickle) é recriado, sem carregar nada dele
+    with sqlite3.connect(caminho) as conexao:
+        conexao.execute("PRAGMA user_version = 1")
+    with SessionStore(caminho) as sessao:
+        assert sessao.tables() == [] and len(sessao.runs()) == 1
@@ -0,0 +1,81 @@
+# Unit tests for partitioned allocation
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from core.allocation_solver import solve_allocation  # noqa: E402
+from core.partition import RESTRICAO_PARTICAO, solve_partitioned  # noqa: E402
+from test_allocation import _coorte  # noqa: E402
+
+
+def _coorte_presencial(seed=4):
+    alunos, projetos = _coorte(n_alunos=24, n_projetos=6, seed=seed)
+    alunos["Pode Comparecer"] = np.where(np.arange(24) % 3 == 0, "Não", "Sim")
+    projetos["Presencial"] = ["Não", "Sim", "Sim", "Não", "Sim", "Sim"]
+    return alunos, projetos
+
+
+def test_partitioned_solve_merges_independent_groups():
+    alunos, projetos = _coorte_presencial()
+
+    resultado, atribuicao = solve_partitioned(
+        alunos, projetos, "presencial", engine="flow", return_assignment=True, comparar=True, max_workers=2
+    )
+
+    assert (atribuicao.sum(axis=1) == alunos["Projetos Tentados"].to_numpy()).all()
+    grupo_aluno = alunos["Pode Comparecer"].to_numpy()[:, None]
+    grupo_projeto = projetos["Presencial"].to_numpy()[None, :]
+    assert not (atribuicao & (grupo_aluno != grupo_projeto)).any()
+
+    objetivo = 0.0
+    for grupo, detalhe in zip(("Não", "Sim"), resultado.attrs["particoes"]):
+        parte = solve_allocation(
+            alunos[alunos["Pode Comparecer"] == grupo], projetos[projetos["Presencial"] == grupo], engine="flow"
+        )
+        assert detalhe["grupo"] == grupo
+        assert abs(detalhe["objetivo"] - parte.attrs["objetivo"]) < 1e-6
+        assert (resultado.loc[parte.index, "Projeto 1"] == parte["Projeto 1"]).all()
+        objetivo += parte.attrs["objetivo"]
+
+    assert abs(resultado.attrs["objetivo"] - objetivo) < 1e-6
+    monolitico = solve_allocation(alunos, projetos, engine="flow").attrs["objetivo"]
+    assert abs(resultado.attrs["objetivo_monolitico"] - monolitico) < 1e-6
+    assert resultado.attrs["perda_particao"] >= -1e-6
+
+    # Pela solve_allocation e em um único processo o resultado é o mesmo, e a restrição fica registrada
+    # mesmo sem comparar com a alocação inteira
+    direto = solve_allocation(alunos, projetos, engine="flow", particao="presencial")
+    assert direto.attrs["objetivo"] == resultado.attrs["objetivo"]
+    assert direto.attrs["particao"] == "presencial ('Pode Comparecer' = 'Presencial')"
+    assert direto.attrs["relatorio"]["restricao_particao"] == RESTRICAO_PARTICAO
+
+
+def test_partition_rejects_inconsistent_groups():
+    alunos, projetos = _coorte_presencial()
+
+    # Um único grupo: a alocação é resolvida inteira
+    alunos_unicos, projetos_unicos = _coorte(n_alunos=12, n_projetos=4, seed=1)
+    unico = solve_allocation(alunos_unicos, projetos_unicos, engine="flow", particao="presencial")
+    assert "particoes" not in unico.attrs
+    assert unico.attrs["restricao_particao"] == RESTRICAO_PARTICAO
+
+    alunos_fixados = alunos.copy()
+    alunos_fixados.loc[0, "Projeto 1"] = "Projeto1"  # aluno remoto em projeto presencial
+    sem_remotos = projetos.assign(Presencial="Sim")
+    for args, trecho in (
+        ((alunos_fixados, projetos, "presencial"), "outro grupo"),
+        ((alunos, sem_remotos, "presencial"), "Nenhum projeto"),
+        ((alunos, projetos, "turno"), "turno"),
+        ((alunos, projetos, "auto"), "Use uma de: presencial, curso"),  # a partição nunca é escolhida sozinha
+        ((alunos, projetos.drop(columns="Presencial"), "presencial"), "Presencial"),
+    ):
+        try:
+            solve_partitioned(*args, engine="flow")
+        except ValueError as e:
+            assert trecho in str(e)
+        else:
+            raise AssertionError("ValueError esperado")
@@ -0,0 +1,57 @@
+# Unit tests for scenario sweeps
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from core.allocation_solver import solve_allocation  # noqa: E402
+from core.scenarios import run_scenarios, scenario_grid  # noqa: E402
+from test_allocation import _coorte  # noqa: E402
+
+
+def test_scenario_grid_is_cartesian_and_checks_names():
+    grade = scenario_grid(tolerancia=[0.1, 0.3], fixar=[True, False])
+
+    assert grade == [
+        {"tolerancia": 0.1, "fixar": True},
+        {"tolerancia": 0.1, "fixar": False},
+        {"tolerancia": 0.3, "fixar": True},
+        {"tolerancia": 0.3, "fixar": False},
+    ]
+    try:
+        scenario_grid(margem=[0.1])
+    except ValueError as e:
+        assert "margem" in str(e)
+    else:
+        raise AssertionError("ValueError esperado")
+
+
+def test_run_scenarios_matches_single_runs_and_reports_infeasible_ones():
+    alunos, projetos = _coorte(n_alunos=30, n_projetos=4, seed=9)
+    alunos.loc[0, "Projeto 1"] = "Projeto3"
+    cenarios = scenario_grid(tolerancia=[0.0, 0.3], metrica=["dot", "coverage"]) + [{"fixar": False}]
+
+    tabela = run_scenarios(alunos, projetos, cenarios, max_workers=2)
+
+    assert len(tabela) == 5
+    assert list(tabela.columns[:4]) == ["tolerancia", "metrica", "pesos", "fixar"]
+    for _, linha in tabela.iterrows():
+        try:
+            esperado = solve_allocation(
+                alunos,
+                projetos,
+                engine="flow",
+                tolerancia=linha["tolerancia"],
+                metric=linha["metrica"],
+                fixar=linha["fixar"],
+            )
+        except ValueError:
+            assert linha["erro"]
+            continue
+        assert linha["erro"] == ""
+        assert abs(linha["objetivo"] - esperado.attrs["objetivo"]) < 1e-6
+        assert linha["carga_min"] <= linha["carga_max"]
+
+    # Tolerância zero com média fracionária de alunos por projeto não tem solução
+    assert (tabela.loc[tabela["tolerancia"] == 0.0, "erro"] != "").all()
@@ -1 +1,129 @@
-# Unit tests for similarity logic
\ No newline at end of file
+# Unit tests for similarity logic
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from core.compatibility import CompatibilityMatrix  # noqa: E402
+from core.similarity import compute_similarity  # noqa: E402
+
+
+def _coorte(n_alunos=30, n_projetos=5, n_habilidades=6, seed=0):
+    rng = np.random.default_rng(seed)
+    habilidades = [f"H{k}" for k in range(n_habilidades)]
+    alunos = pd.DataFrame({
+        "Nome do Aluno": [f"Aluno{i}" for i in range(n_alunos)],
+        "RA": np.arange(n_alunos),
+        "Curso": "Computação",
+        "Projetos Tentados": 1,
+        "Pode Comparecer": "Sim",
+    })
+    alunos[habilidades] = rng.integers(0, 6, (n_alunos, n_habilidades)).astype(np.uint8)
+    projetos = pd.DataFrame({
+        "Codigo do Projeto": [f"C{j}" for j in range(n_projetos)],
+        "Nome do Projeto": [f"Projeto{j}" for j in range(n_projetos)],
+        "Presencial": "Sim",
+    })
+    projetos[habilidades] = rng.integers(0, 6, (n_projetos, n_habilidades)).astype(np.uint8)
+    return alunos, projetos, habilidades
+
+
+def test_compatibility_aligns_skills_by_name():
+    alunos, projetos, habilidades = _coorte()
+    esperado = alunos[habilidades].to_numpy(np.int64) @ projetos[habilidades].to_numpy(np.int64).T
+
+    # Ordem diferente nos projetos e uma habilidade extra só nos alunos
+    embaralhado = projetos[list(projetos.columns[:3]) + habilidades[::-1]]
+    alunos["Extra"] = np.uint8(5)
+
+    assert (CompatibilityMatrix().refresh(alunos, embaralhado) == esperado).all()
+
+    try:
+        CompatibilityMatrix().refresh(alunos.drop(columns="H2"), projetos)
+    except ValueError as e:
+        assert "H2" in str(e)
+    else:
+        raise AssertionError("ValueError esperado")
+
+
+def test_compatibility_refresh_updates_only_edited_rows_and_columns():
+    alunos, projetos, habilidades = _coorte()
+    cache = CompatibilityMatrix()
+    cache.refresh(alunos, projetos)
+
+    cache.refresh(alunos, projetos)
+    assert [len(k) for k in cache.ultima_atualizacao] == [0, 0]
+
+    alunos.loc[7, "H1"] = 0 if alunos.loc[7, "H1"] else 5
+    projetos.loc[2, "H4"] = 0 if projetos.loc[2, "H4"] else 5
+    matriz = cache.refresh(alunos, projetos)
+
+    linhas, colunas = cache.ultima_atualizacao
+    assert linhas.tolist() == [7] and colunas.tolist() == [2]
+    assert (matriz == alunos[habilidades].to_numpy(np.int64) @ projetos[habilidades].to_numpy(np.int64).T).all()
+
+    cache.refresh(alunos.head(10), projetos)
+    assert cache.ultima_atualizacao is None
+
+
+def test_metrics_match_pairwise_definitions_in_blocks():
+    rng = np.random.default_rng(4)
+    alunos = rng.integers(0, 6, (37, 8)).astype(np.uint8)
+    projetos = rng.integers(0, 6, (9, 8)).astype(np.uint8)
+    alunos[3] = 0
+    projetos[2] = 0
+    pesos = rng.random(8).astype(np.float32)
+
+    a, b = alunos.astype(np.float64), projetos.astype(np.float64)
+    norma = lambda m: np.where(np.linalg.norm(m, axis=1, keepdims=True) > 0, np.linalg.norm(m, axis=1, keepdims=True), 1)
+    minimos = np.minimum(a[:, None, :], b[None, :, :]).sum(axis=2)
+    pedido = b.sum(axis=1)
+    esperados = {
+        "dot": a @ b.T,
+        "weighted": a @ (b * pesos).T,
+        "cosine": (a / norma(a)) @ (b / norma(b)).T,
+        "coverage": np.where(pedido > 0, minimos / np.where(pedido > 0, pedido, 1), 1.0),
+    }
+
+    for metrica, esperado in esperados.items():
+        # memoria_max pequena força vários blocos de alunos
+        obtido = compute_similarity(alunos, projetos, metrica, pesos, memoria_max=512)
+        assert obtido.dtype == np.float32
+        assert np.allclose(obtido, esperado, atol=1e-5), metrica
+
+
+def test_coverage_penalizes_missing_levels():
+    projeto = np.array([[4, 0, 2]])
+    alunos = np.array([
+        [4, 0, 2],  # atende tudo
+        [5, 5, 5],  # sobra nível, não ganha mais
+        [1, 5, 2],  # falta 3 níveis na primeira habilidade
+        [3, 0, 2],  # falta 1 nível
+    ])
+
+    cobertura = compute_similarity(alunos, projeto, "coverage")[:, 0]
+
+    assert cobertura[0] == cobertura[1] == 1.0
+    assert cobertura[2] < cobertura[3] < 1.0
+    assert np.isclose(cobertura[2], 3 / 6)
+
+
+def test_solver_accepts_metric_by_name():
+    from core.allocation_solver import solve_allocation
+
+    alunos, projetos, _ = _coorte(n_alunos=24, n_projetos=4)
+    cache = CompatibilityMatrix()
+
+    resultado = solve_allocation(alunos, projetos, engine="flow", compatibility=cache, metric="coverage")
+
+    assert resultado.attrs["metrica"] == "coverage"
+    assert cache.metrica == "coverage" and cache.matriz.max() <= 1.0
+    try:
+        solve_allocation(alunos, projetos, engine="flow", metric="jaccard")
+    except ValueError as e:
+        assert "jaccard" in str(e)
+    else:
+        raise AssertionError("ValueError esperado")